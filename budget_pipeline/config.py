@@ -31,6 +31,17 @@ SOURCES = {
     }
 }
 
+# Download settings: files are fetched concurrently and streamed to disk in chunks.
+# The read timeout applies per chunk (a stalled transfer fails), not to the whole file.
+DOWNLOAD_MAX_WORKERS = int(os.getenv("PIPELINE_DOWNLOAD_WORKERS", "4"))
+DOWNLOAD_CONNECT_TIMEOUT = float(os.getenv("PIPELINE_DOWNLOAD_CONNECT_TIMEOUT", "10"))
+DOWNLOAD_READ_TIMEOUT = float(os.getenv("PIPELINE_DOWNLOAD_READ_TIMEOUT", "60"))
+DOWNLOAD_CHUNK_SIZE = 64 * 1024     # also the most an interrupted transfer loses before resuming
+
+# Incremental runs: validators and content hashes of the last run, and cached cleaned tables
+MANIFEST_PATH = os.path.join(DATA_DIR, "manifest.json")
+CLEANED_DIR = os.path.join(DATA_DIR, "cleaned")
+
 # Column Mapping Keywords for Defensive Parsing
 # We look for these keywords in column names to verify/standardize them
 COLUMN_MAPPINGS = {
@@ -94,20 +94,9 @@ def clean_receipts_data(file_path):
     df['financial_year'] = '2024-25'
     return df
 
-def process_all_files(file_map):
-    """
-    Process all downloaded files.
-    file_map: dict of {key: file_path} from fetcher
-    """
-    data = {}
-    
-    if 'expenditure_ministry' in file_map:
-        data['expenditure'] = clean_expenditure_data(file_map['expenditure_ministry'])
-        
-    if 'budget_summary' in file_map:
-        data['summary'] = clean_summary_data(file_map['budget_summary'])
-        
-    if 'receipts' in file_map:
-        data['receipts'] = clean_receipts_data(file_map['receipts'])
-        
-    return data
+# Source key (config.SOURCES) -> (cleaned dataset name, parser)
+CLEANERS = {
+    'expenditure_ministry': ('expenditure', clean_expenditure_data),
+    'budget_summary': ('summary', clean_summary_data),
+    'receipts': ('receipts', clean_receipts_data),
+}
@@ -1,46 +1,212 @@
 import os
+import re
+import json
+import hashlib
+import time
 import requests
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple, Optional
 from .. import config
+from lib.services.http_client import http_get
 
 logger = logging.getLogger(__name__)
 
-def download_file(url: str, filename: str) -> str:
+_CONTENT_RANGE = re.compile(r"^\s*bytes\s+(\d+)-(\d+)/(\d+|\*)\s*$", re.IGNORECASE)
+
+class DownloadResult(NamedTuple):
+    path: str
+    bytes: int            # size of the finished file
+    transferred: int      # bytes received in this run (less than `bytes` when resumed)
+    resumed_from: int     # offset a Range request continued from (0 = full download)
+    seconds: float
+    sha256: str = ""
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    not_modified: bool = False   # upstream answered 304: the local file is current
+
+    @property
+    def throughput(self) -> float:
+        """Bytes per second received in this run"""
+        return self.transferred / self.seconds if self.seconds > 0 else 0.0
+
+def _read_validators(meta_path: str) -> dict:
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def range_continues(header: Optional[str], offset: int) -> bool:
+    """True when a 'bytes <start>-<end>/<total>' Content-Range runs from `offset` to the end of the file"""
+    match = _CONTENT_RANGE.match(header or "")
+    if not match or int(match.group(1)) != offset:
+        return False
+    return match.group(3) == "*" or int(match.group(2)) + 1 == int(match.group(3))
+
+def file_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def stream_download(url: str, file_path: str, chunk_size: int = None,
+                    timeout: tuple = None, previous: Optional[dict] = None) -> DownloadResult:
+    """
+    Streams a URL to `<file_path>.part` chunk by chunk and renames it into place when complete.
+
+    A `.part` file left by an interrupted run is resumed with a Range request. If-Range
+    carries the validator of the original response, so a file that changed upstream in
+    the meantime is downloaded again from the start instead of being spliced.
+
+    `previous` is the manifest record of the last download ({"etag", "last_modified",
+    "sha256"}). While the local file still has that hash, its validators are sent as
+    If-None-Match / If-Modified-Since and a 304 skips the transfer.
+    """
+    chunk_size = chunk_size or config.DOWNLOAD_CHUNK_SIZE
+    timeout = timeout or (config.DOWNLOAD_CONNECT_TIMEOUT, config.DOWNLOAD_READ_TIMEOUT)
+    part_path = file_path + ".part"
+    meta_path = part_path + ".json"
+
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    validators = _read_validators(meta_path) if offset else {}
+    # Byte ranges and Content-Length only line up with what is written for the identity encoding
+    headers = {"Accept-Encoding": "identity"}
+    if offset and (validators.get("etag") or validators.get("last_modified")):
+        headers["Range"] = f"bytes={offset}-"
+        headers["If-Range"] = validators.get("etag") or validators["last_modified"]
+    else:
+        offset = 0
+        if previous and os.path.exists(file_path) and file_sha256(file_path) == previous.get("sha256"):
+            if previous.get("etag"):
+                headers["If-None-Match"] = previous["etag"]
+            if previous.get("last_modified"):
+                headers["If-Modified-Since"] = previous["last_modified"]
+
+    started = time.perf_counter()
+    # verify=False often needed for gov.in sites due to cert issues
+    with http_get(url, timeout=timeout, headers=headers, stream=True, verify=False) as response:
+        if response.status_code == 304:
+            return DownloadResult(file_path, os.path.getsize(file_path), 0, 0, time.perf_counter() - started,
+                                  previous["sha256"], response.headers.get("ETag") or previous.get("etag"),
+                                  response.headers.get("Last-Modified") or previous.get("last_modified"),
+                                  not_modified=True)
+        bad_range = response.status_code == 206 and not range_continues(response.headers.get("Content-Range"), offset)
+        if bad_range and not offset:
+            raise requests.exceptions.RequestException(
+                f"Unrequested partial content from {url}: {response.headers.get('Content-Range')}")
+        if response.status_code == 416 or bad_range:
+            # 416: the range starts at or past the end. A 206 for any other range than the rest
+            # of the file can't be appended either. The partial file is unusable: start over
+            logger.warning(f"Range request for {url} at byte {offset} answered with "
+                           f"{response.status_code} {response.headers.get('Content-Range')}, restarting")
+            os.remove(part_path)
+            if os.path.exists(meta_path):
+                os.remove(meta_path)
+            return stream_download(url, file_path, chunk_size, timeout, previous)
+        response.raise_for_status()
+
+        digest = hashlib.sha256()
+        if response.status_code == 206:
+            mode = "ab"
+            with open(part_path, "rb") as f:
+                for block in iter(lambda: f.read(chunk_size), b""):
+                    digest.update(block)
+            validators = {**validators, "etag": response.headers.get("ETag") or validators.get("etag")}
+        else:
+            # 200: no range support, or the file changed (If-Range mismatch) - restart
+            mode, offset = "wb", 0
+            validators = {"url": url,
+                          "etag": response.headers.get("ETag"),
+                          "last_modified": response.headers.get("Last-Modified")}
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump(validators, f)
+
+        expected = response.headers.get("Content-Length")
+        transferred = 0
+        with open(part_path, mode) as f:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                f.write(chunk)
+                digest.update(chunk)
+                transferred += len(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+
+    if expected is not None and transferred != int(expected):
+        # Keep the .part file: the next run resumes from here
+        raise requests.exceptions.ChunkedEncodingError(
+            f"Incomplete download of {url}: {transferred} of {expected} bytes")
+
+    os.replace(part_path, file_path)
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+    return DownloadResult(file_path, offset + transferred, transferred, offset, time.perf_counter() - started,
+                          digest.hexdigest(), validators.get("etag"), validators.get("last_modified"))
+
+def download_file(url: str, filename: str, previous: Optional[dict] = None) -> DownloadResult:
     """
     Downloads a file from the URL and saves it to the configured data directory.
-    
+
     Args:
         url (str): The direct URL of the file.
         filename (str): The name to save the file as.
-        
+        previous (dict): Manifest record of the last download, for a conditional request.
+
     Returns:
-        str: The full path to the downloaded file.
+        DownloadResult: Path, size, throughput, content hash and upstream validators.
     """
     try:
-        response = requests.get(url, verify=False)  # verify=False often needed for gov.in sites due to cert issues
-        response.raise_for_status()
-        
         file_path = os.path.join(config.DATA_DIR, filename)
-        
-        with open(file_path, 'wb') as f:
-            f.write(response.content)
-            
-        logger.info(f"Successfully downloaded {filename} from {url}")
-        return file_path
-        
+        result = stream_download(url, file_path, previous=previous)
+
+        if result.not_modified:
+            logger.info(f"{filename} not modified upstream (304), keeping the local copy")
+            return result
+        resumed = f", resumed at {result.resumed_from:,} bytes" if result.resumed_from else ""
+        logger.info(f"Successfully downloaded {filename} from {url} "
+                    f"({result.bytes:,} bytes in {result.seconds:.2f}s, "
+                    f"{result.throughput / 1e6:.2f} MB/s{resumed})")
+        return result
+
     except requests.exceptions.RequestException as e:
         logger.error(f"Failed to download {url}: {e}")
         raise e
 
-def fetch_all_data():
-    """Download all configured budget files."""
+def fetch_all_data(max_workers: Optional[int] = None, manifest=None):
+    """
+    Download all configured budget files concurrently.
+
+    With a RunManifest, each download is conditional on the previous run's validators
+    and its validators and content hash are recorded for the next run.
+    """
     results = {}
-    for key, source in config.SOURCES.items():
+    sources = list(config.SOURCES.items())
+    if not sources:
+        return results
+
+    def fetch(item):
+        key, source = item
         logger.info(f"Fetching {key}...")
-        try:
-            path = download_file(source["url"], source["filename"])
-            results[key] = path
-        except Exception as e:
-            logger.warning(f"Could not fetch {key}: {e}")
-            
+        previous = manifest.source(key) if manifest else None
+        if previous and previous.get("url") != source["url"]:
+            previous = None     # the source moved: the old validators don't apply
+        return download_file(source["url"], source["filename"], previous)
+
+    started = time.perf_counter()
+    workers = min(max_workers or config.DOWNLOAD_MAX_WORKERS, len(sources))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pipeline-download") as pool:
+        futures = {key: pool.submit(fetch, (key, source)) for key, source in sources}
+        for key, future in futures.items():
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.warning(f"Could not fetch {key}: {e}")
+                continue
+            results[key] = result.path
+            if manifest is not None:
+                manifest.record_source(key, url=config.SOURCES[key]["url"], file=result.path, bytes=result.bytes,
+                                       sha256=result.sha256, etag=result.etag, last_modified=result.last_modified)
+
+    logger.info(f"Fetched {len(results)}/{len(sources)} files in {time.perf_counter() - started:.2f}s")
     return results
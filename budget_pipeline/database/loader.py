@@ -4,9 +4,10 @@ import logging
 
 logger = logging.getLogger(__name__)
 
-def load_expenditure(df: pd.DataFrame):
+def load_expenditure(df: pd.DataFrame) -> bool:
+    """Replace one financial year's expenditure rows; True when the rows were committed"""
     if df.empty:
-        return
+        return False
         
     db = SessionLocal()
     try:
@@ -27,16 +28,25 @@ def load_expenditure(df: pd.DataFrame):
         db.add_all(objects)
         db.commit()
         logger.info(f"Loaded {len(objects)} expenditure records.")
+        return True
     except Exception as e:
         logger.error(f"Error loading expenditure: {e}")
         db.rollback()
+        return False
     finally:
         db.close()
 
-def load_data_dict(data_dict):
-    """Orchestrate loading of all available dataframes."""
-    if 'expenditure' in data_dict:
-        load_expenditure(data_dict['expenditure'])
-    
-    # Add loaders for summary/receipts as parsers mature
-    logger.info("Data loading complete.")
+# Cleaned dataset name -> (loader, model whose rows it writes)
+# Add loaders for summary/receipts as parsers mature
+LOADERS = {
+    'expenditure': (load_expenditure, Expenditure),
+}
+
+def row_count(name: str, financial_year: str) -> int:
+    """Rows a dataset currently has in the database for one financial year"""
+    _, model = LOADERS[name]
+    db = SessionLocal()
+    try:
+        return db.query(model).filter(model.financial_year == financial_year).count()
+    finally:
+        db.close()
@@ -3,6 +3,8 @@ import logging
 import uvicorn
 import sys
 import os
+import time
+import pandas as pd
 
 # Ensure package is in path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -11,6 +13,7 @@ from budget_pipeline import config
 from budget_pipeline.data_fetch import fetcher
 from budget_pipeline.data_clean import cleaner
 from budget_pipeline.database import models, loader
+from budget_pipeline.manifest import RunManifest, frame_hash
 
 # Setup Logging
 logging.basicConfig(
@@ -23,8 +26,63 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def run_pipeline():
+def clean_changed_files(files, manifest):
+    """
+    Clean each downloaded file whose content hash changed since it was last cleaned.
+    Returns {name: (output hash, loader of the cleaned DataFrame)}; unchanged tables are
+    read back from the cleaned cache only if the load stage needs them.
+    """
+    os.makedirs(config.CLEANED_DIR, exist_ok=True)
+    outputs = {}
+    for key, (name, clean) in cleaner.CLEANERS.items():
+        if key not in files:
+            continue
+        source_hash = manifest.source(key)["sha256"]
+        cache_path = os.path.join(config.CLEANED_DIR, f"{name}.pkl")
+        record = manifest.unchanged("clean", name, source_hash)
+        if record and (record["output"] is None or os.path.exists(cache_path)):
+            logger.info(f"Skipping clean of {name}: {key} unchanged")
+            if record["output"] is not None:
+                outputs[name] = (record["output"], lambda path=cache_path: pd.read_pickle(path))
+            continue
+        
+        df = clean(files[key])
+        if df.empty:
+            # Nothing parsed (and nothing to load): don't parse the same bytes again next run
+            manifest.record_stage("clean", name, source_hash, output=None, rows=0)
+            continue
+        df.to_pickle(cache_path)
+        output_hash = frame_hash(df)
+        manifest.record_stage("clean", name, source_hash, output=output_hash, rows=len(df))
+        outputs[name] = (output_hash, lambda df=df: df)
+    return outputs
+
+def load_changed_tables(outputs, manifest):
+    """Load each cleaned table whose hash changed, or whose rows are missing from the database"""
+    for name, (load, _) in loader.LOADERS.items():
+        if name not in outputs:
+            continue
+        output_hash, read = outputs[name]
+        record = manifest.unchanged("load", name, output_hash)
+        if record and loader.row_count(name, record["financial_year"]) == record["rows"]:
+            logger.info(f"Skipping load of {name}: cleaned data unchanged")
+            continue
+        
+        df = read()
+        if load(df):
+            manifest.record_stage("load", name, output_hash, rows=len(df),
+                                  financial_year=str(df['financial_year'].iloc[0]))
+        else:
+            manifest.forget_stage("load", name)
+
+def run_pipeline(full: bool = False):
+    """
+    Fetch -> clean -> load, skipping each stage whose inputs are unchanged since the last
+    run (see manifest.py). full=True ignores the manifest and redoes every stage.
+    """
     logger.info("Starting Budget Data Pipeline...")
+    started = time.perf_counter()
+    manifest = RunManifest(config.MANIFEST_PATH) if full else RunManifest.load(config.MANIFEST_PATH)
     
     # 1. Initialize DB
     logger.info("Initializing Database...")
@@ -34,7 +92,8 @@ def run_pipeline():
     logger.info("Fetching Data from Official Sources...")
     # NOTE: In a real scenario, this might fail without internet or valid URLs.
     # In 'dry-run' or 'demo' mode, we might want to skip or warn.
-    files = fetcher.fetch_all_data()
+    files = fetcher.fetch_all_data(manifest=manifest)
+    manifest.save()
     
     if not files:
         logger.warning("No files downloaded. Pipeline cannot proceed with cleanup.")
@@ -42,13 +101,15 @@ def run_pipeline():
 
     # 3. Clean Data
     logger.info("Cleaning and Parsing Data...")
-    cleaned_data = cleaner.process_all_files(files)
+    outputs = clean_changed_files(files, manifest)
+    manifest.save()
     
     # 4. Load into DB
     logger.info("Loading Data into Database...")
-    loader.load_data_dict(cleaned_data)
+    load_changed_tables(outputs, manifest)
+    manifest.save()
     
-    logger.info("Pipeline Completed Successfully.")
+    logger.info(f"Pipeline Completed Successfully in {time.perf_counter() - started:.2f}s.")
 
 def run_server(host="127.0.0.1", port=8000):
     logger.info(f"Starting API Server at http://{host}:{port}")
@@ -58,11 +119,12 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="India Union Budget Data Pipeline")
     parser.add_argument("--pipeline", action="store_true", help="Run the data fetch/clean/load pipeline")
     parser.add_argument("--server", action="store_true", help="Start the FastAPI REST server")
+    parser.add_argument("--full", action="store_true", help="With --pipeline: ignore the run manifest and redo every stage")
     
     args = parser.parse_args()
     
     if args.pipeline:
-        run_pipeline()
+        run_pipeline(full=args.full)
     elif args.server:
         run_server()
     else:
@@ -0,0 +1,86 @@
+import os
+import json
+import hashlib
+import tempfile
+import threading
+import logging
+from datetime import datetime
+from typing import Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+
+def frame_hash(df: pd.DataFrame) -> str:
+    """Content hash of a DataFrame (values, index, column names and dtypes)"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([[str(c), str(t)] for c, t in df.dtypes.items()]).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return digest.hexdigest()
+
+class RunManifest:
+    """
+    What the last pipeline run fetched, cleaned and loaded.
+
+    Sources keep their upstream validators (ETag/Last-Modified) and the SHA-256 of the
+    downloaded file. Each stage output records the hash of the input it was built from,
+    so a stage is skipped when that input hash is unchanged.
+    """
+
+    def __init__(self, path: str, data: Optional[dict] = None):
+        self.path = path
+        data = data if data and data.get("version") == MANIFEST_VERSION else {}
+        self.sources = data.get("sources", {})
+        self.stages = data.get("stages", {})
+        self._lock = threading.Lock()    # sources are recorded from download threads
+
+    @classmethod
+    def load(cls, path: str) -> "RunManifest":
+        try:
+            with open(path, encoding="utf-8") as f:
+                return cls(path, json.load(f))
+        except FileNotFoundError:
+            return cls(path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable run manifest {path}: {e}")
+            return cls(path)
+
+    def source(self, key: str) -> Optional[dict]:
+        return self.sources.get(key)
+
+    def record_source(self, key: str, **fields) -> None:
+        with self._lock:
+            self.sources[key] = {**fields, "recorded_at": datetime.now().isoformat()}
+
+    def unchanged(self, stage: str, name: str, input_hash: str) -> Optional[dict]:
+        """The stage's previous record for `name` if it was built from the same input, else None"""
+        record = self.stages.get(stage, {}).get(name)
+        if record and input_hash and record.get("input") == input_hash:
+            return record
+        return None
+
+    def record_stage(self, stage: str, name: str, input_hash: str, **fields) -> None:
+        self.stages.setdefault(stage, {})[name] = {
+            "input": input_hash, **fields, "recorded_at": datetime.now().isoformat()
+        }
+
+    def forget_stage(self, stage: str, name: str) -> None:
+        self.stages.get(stage, {}).pop(name, None)
+
+    def save(self) -> None:
+        """Write atomically: a crash mid-write must not leave a manifest that skips work"""
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            payload = {"version": MANIFEST_VERSION, "sources": self.sources, "stages": self.stages}
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".manifest.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(payload, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
@@ -11,6 +11,27 @@ DATA SOURCES (Priority Order):
 FEATURES:
 - LIVE API fetching from multiple government sources
 - Intelligent caching (6 hours) to reduce API load
+- Pooled keep-alive HTTP session with conditional requests (ETag/Last-Modified)
+- Token-bucket rate limiting per client IP / API key (RateLimit-* headers, 429)
+- Dataset versions + record-level change feed (/changes?since=<version>)
+- Server-Sent Events refresh notifications (/events)
+- Immutable cache snapshots published with an atomic swap (lock-free reads, rollback)
+- Cache administration API (/admin/cache: stats, invalidate, warm, export/import)
+- Adaptive upstream timeouts from rolling per-upstream latency percentiles
+- Per-route end-to-end deadline budgets (X-Data-Fallback header when fallback is served)
+- Load shedding and brownout mode (cache/fallback only, 503 + Retry-After for low-priority routes)
+- Memory profiling admin endpoints (tracemalloc diffs, bytes per cache key and dataset)
+- Reference tables served from versioned data files with lazy load and hot reload
+- Concurrent multi-year live fetching (/budget/trend?live=true), merged into the cache in one swap
+- Speculative prefetch of the likely next cache keys from learned route transitions (budget-capped)
+- Static API snapshot export (--export-static): every route x year as gzipped JSON + ETag manifest
+- Budget reallocation simulator (/budget/simulate): vectorized scenarios, fixed totals, Monte Carlo
+- Cross-country comparison query engine (/compare/query): slices, derived ratios, rankings, memoized
+- Non-blocking structured logging: JSON lines via a queue listener, request-timing access log,
+  per-route sampling of hot-path messages (LOG_FORMAT, LOG_SAMPLE_RATES, ACCESS_LOG_ENABLED)
+- Optional traffic capture (TRAFFIC_CAPTURE_PATH) for replay with replay_traffic.py
+- Request tracing (TRACE_EXPORTER): spans for handler, cache, each upstream attempt and response
+  encoding, traceparent propagation, OTLP/JSON export to a file or collector
 - Automatic fallback to verified official data when APIs unavailable
 - Year-wise data (2022-2026) for all ministries and states
 - State budget allocations and comparisons
@@ -23,27 +44,409 @@ API BEHAVIOR:
 - Timeout: Fast failover (2-3 seconds) if APIs are slow/unavailable
 """
 
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import BackgroundTasks, Body, Depends, FastAPI, Header, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from typing import Dict, List, Optional
+from fastapi.routing import APIRoute
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import Dict, List, Optional, Sequence
+import anyio
+import argparse
+import asyncio
+import base64
+from collections.abc import Mapping
 import json
+import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 import random
 import requests
 from functools import lru_cache
+import fnmatch
+import hmac
 import logging
+import math
+import os
+import threading
+import time
+from urllib.parse import quote
 import uvicorn
 
-# Setup logging
-logging.basicConfig(level=logging.INFO)
+from lib.services.adaptive_timeout import AdaptiveTimeouts
+from lib.services.admission import AdmissionController
+from lib.services.budget_simulator import BudgetVector, shift_from_spec, simulate, summarize
+from lib.services.change_feed import ChangeFeed
+from lib.services.compare_cube import CompareCube
+from lib.services.compact_records import compact, to_plain
+from lib.services.dataset_registry import DatasetRegistry, write_dataset
+from lib.services.deadline import Deadline, DeadlineExceeded, bind, current_deadline, deadline_scope, detach
+from lib.services.event_broadcaster import EventBroadcaster
+from lib.services.http_client import http_get, retries_within
+from lib.services.memory_profiler import MemoryProfiler, deep_sizeof, process_rss_bytes
+from lib.services.prefetch import Prefetcher, TransitionModel
+from lib.services.rate_limiter import TokenBucketLimiter
+from lib.services.snapshot_store import CacheEntry, SnapshotStore, freeze
+from lib.services.static_export import render_pages, write_static_tree
+from lib.services.streaming_parsers import iter_csv_rows, iter_json_array_items
+from lib.services.structured_logging import HOT, parse_sample_rates, route_scope, setup_logging
+from lib.services.tracing import CLIENT, Tracer, exporter_from_spec
+from lib.services.traffic_capture import TrafficRecorder
+
+# Setup logging: records are queued and written by a listener thread, so a slow stderr/pipe
+# never stalls a request. Hot-path messages (cache hits, 304s) are sampled per route.
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")                     # json | text
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))       # records beyond this are dropped
+LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "0.01")         # "0.01" or "default=0.01,/budget/overview=0.1"
+ACCESS_LOG_ENABLED = os.getenv("ACCESS_LOG_ENABLED", "true").lower() != "false"
+
+log_pipeline = setup_logging(
+    level=LOG_LEVEL,
+    fmt=LOG_FORMAT,
+    sample_rates=parse_sample_rates(LOG_SAMPLE_RATES),
+    queue_size=LOG_QUEUE_SIZE
+)
 logger = logging.getLogger(__name__)
+access_logger = logging.getLogger("access")
+
+# Traffic capture: append every request's arrival time, method, path, query, status and latency
+# to a compact file that replay_traffic.py re-issues against a local instance
+TRAFFIC_CAPTURE_PATH = os.getenv("TRAFFIC_CAPTURE_PATH", "")            # empty = off
+TRAFFIC_CAPTURE_MAX_BYTES = int(os.getenv("TRAFFIC_CAPTURE_MAX_BYTES", "100000000"))
+TRAFFIC_CAPTURE_EXCLUDE = tuple(
+    p.strip() for p in os.getenv("TRAFFIC_CAPTURE_EXCLUDE", "/admin,/events,/docs,/redoc,/openapi.json").split(",")
+    if p.strip()
+)
+traffic_recorder = TrafficRecorder(TRAFFIC_CAPTURE_PATH, TRAFFIC_CAPTURE_MAX_BYTES) if TRAFFIC_CAPTURE_PATH else None
+
+# Tracing: "file:logs/traces.jsonl" or "otlp:http://localhost:4318" (empty = off, no overhead)
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "")
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "1.0"))
+# Let an incoming traceparent's sampled flag override TRACE_SAMPLE_RATE (only behind trusted callers)
+TRACE_TRUST_INCOMING = os.getenv("TRACE_TRUST_INCOMING", "false").lower() == "true"
+TRACE_SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "government-finance-api")
+tracer = Tracer(exporter_from_spec(TRACE_EXPORTER, service_name=TRACE_SERVICE_NAME),
+                sample_rate=TRACE_SAMPLE_RATE, trust_incoming=TRACE_TRUST_INCOMING)
+
+class TracedRoute(APIRoute):
+    """Route with 'handler' and 'encode response' spans when tracing is on"""
+    
+    def __init__(self, path: str, endpoint, **kwargs):
+        if tracer.enabled:
+            endpoint = tracer.endpoint(endpoint, path)
+        super().__init__(path, endpoint, **kwargs)
+    
+    def get_route_handler(self):
+        handle = super().get_route_handler()
+        return tracer.route_handler(handle) if tracer.enabled else handle
 
 app = FastAPI(
     title="Government & Finance Data API",
     description="Official Indian Government Budget Data from Government APIs",
     version="3.0.0"
 )
+app.router.route_class = TracedRoute
+
+# ==================== RATE LIMITING ====================
+
+# Token buckets: anonymous clients are keyed by IP, known API keys get their own larger bucket
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() != "false"
+RATE_LIMIT_RATE = float(os.getenv("RATE_LIMIT_RATE", "2"))          # tokens/second per IP
+RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", "60"))
+API_KEY_RATE_LIMIT_RATE = float(os.getenv("API_KEY_RATE_LIMIT_RATE", "10"))
+API_KEY_RATE_LIMIT_BURST = int(os.getenv("API_KEY_RATE_LIMIT_BURST", "300"))
+RATE_LIMIT_MAX_CLIENTS = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "10000"))
+FINANCE_API_KEYS = {k.strip() for k in os.getenv("FINANCE_API_KEYS", "").split(",") if k.strip()}
+# Reverse proxies in front of the app that append to X-Forwarded-For (1 on Render).
+# 0 = the header is client-controlled and ignored; the socket peer is the client.
+TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", "0"))
+
+RATE_LIMIT_EXEMPT = {"/", "/health", "/docs", "/redoc", "/openapi.json"}
+
+# Route costs (tokens). Routes backed by get_cached_or_fetch cost more when the cache is cold,
+# because a miss fans out to the upstream government APIs.
+DEFAULT_ROUTE_COST = 1
+CACHE_MISS_ROUTE_COST = 5
+ROUTE_COSTS = {
+    "/states/compare": 2,
+    "/budget/simulate": 3,
+}
+ROUTE_DATASETS = {
+    "/budget/overview": "budget",
+    "/budget/ministries": "budget",
+    "/budget/simulate": "budget",
+    "/revenue/summary": "revenue",
+    "/revenue/taxes": "revenue",
+    "/economy/indicators": "indicators",
+    "/states/budgets": "states",
+    "/states/top-budgets": "states",
+    "/states/highest-per-capita": "states",
+    "/states/fastest-growing": "states",
+    "/states/compare": "states",
+}
+ROUTE_DATASET_PREFIXES = [
+    ("/budget/ministry/", "budget"),
+    ("/budget/category/", "budget"),
+    ("/states/", "states"),
+]
+
+anonymous_limiter = TokenBucketLimiter(RATE_LIMIT_RATE, RATE_LIMIT_BURST, RATE_LIMIT_MAX_CLIENTS)
+api_key_limiter = TokenBucketLimiter(API_KEY_RATE_LIMIT_RATE, API_KEY_RATE_LIMIT_BURST, RATE_LIMIT_MAX_CLIENTS)
+
+def get_client_ip(request: Request) -> str:
+    """
+    Client IP: the address our trusted proxies saw, i.e. the TRUSTED_PROXY_HOPS-th X-Forwarded-For
+    entry from the right. Entries left of it are written by the client and never used (a fresh
+    value per request would otherwise get a fresh token bucket).
+    """
+    if TRUSTED_PROXY_HOPS > 0:
+        hops = [hop.strip() for hop in ",".join(request.headers.getlist("x-forwarded-for")).split(",") if hop.strip()]
+        if len(hops) >= TRUSTED_PROXY_HOPS:
+            return hops[-TRUSTED_PROXY_HOPS]
+    return request.client.host if request.client else "unknown"
+
+def route_dataset(path: str) -> Optional[str]:
+    """Cached dataset a route reads through get_cached_or_fetch, if any"""
+    if path in ROUTE_DATASETS:
+        return ROUTE_DATASETS[path]
+    for prefix, data_type in ROUTE_DATASET_PREFIXES:
+        if path.startswith(prefix):
+            return data_type
+    return None
+
+def route_cost(path: str, year: str) -> int:
+    """Token cost of a request: cache-miss routes cost more than warm ones"""
+    data_type = route_dataset(path)
+    if data_type and not is_cache_fresh(data_type, year):
+        return CACHE_MISS_ROUTE_COST
+    return ROUTE_COSTS.get(path, DEFAULT_ROUTE_COST)
+
+# Registered before CORS so that CORS stays the outermost layer and 429s remain readable by browsers
+@app.middleware("http")
+async def rate_limit_middleware(request: Request, call_next):
+    path = request.url.path
+    if not RATE_LIMIT_ENABLED or path in RATE_LIMIT_EXEMPT:
+        return await call_next(request)
+
+    api_key = request.headers.get("x-api-key")
+    if api_key and api_key in FINANCE_API_KEYS:
+        limiter, client_key = api_key_limiter, f"key:{api_key}"
+    else:
+        limiter, client_key = anonymous_limiter, f"ip:{get_client_ip(request)}"
+
+    cost = route_cost(path, request.query_params.get("year", "2026"))
+    decision = limiter.consume(client_key, cost)
+    headers = {
+        "RateLimit-Limit": str(decision.limit),
+        "RateLimit-Remaining": str(decision.remaining),
+        "RateLimit-Reset": str(decision.reset),
+        "RateLimit-Policy": f"{limiter.capacity};w={round(limiter.capacity / limiter.rate)}",
+    }
+
+    if not decision.allowed:
+        logger.warning(f"🚦 Rate limited {client_key} on {path} (cost {cost})")
+        headers["Retry-After"] = str(decision.retry_after)
+        return JSONResponse(
+            status_code=429,
+            content={"error": "Too many requests", "retry_after": decision.retry_after},
+            headers=headers
+        )
+
+    response = await call_next(request)
+    response.headers.update(headers)
+    return response
+
+# ==================== REQUEST DEADLINES ====================
+# Each request gets an end-to-end latency budget; upstream calls cap their timeouts at what is
+# left and the fallback is served as soon as it runs out (flagged with X-Data-Fallback).
+
+DATASET_ROUTE_BUDGET = float(os.getenv("DATASET_ROUTE_BUDGET", "4"))     # routes that may fetch live data
+DEFAULT_REQUEST_BUDGET = float(os.getenv("DEFAULT_REQUEST_BUDGET", "10"))
+ROUTE_LATENCY_BUDGETS = {
+    "/states/compare": 6.0,
+    "/budget/trend": 6.0,
+}
+
+def route_budget(path: str) -> float:
+    if path in ROUTE_LATENCY_BUDGETS:
+        return ROUTE_LATENCY_BUDGETS[path]
+    return DATASET_ROUTE_BUDGET if route_dataset(path) else DEFAULT_REQUEST_BUDGET
+
+@app.middleware("http")
+async def deadline_middleware(request: Request, call_next):
+    budget = route_budget(request.url.path)
+    # Callers may ask for a tighter (never a looser) budget
+    requested = request.headers.get("x-request-budget")
+    if requested:
+        try:
+            budget = min(budget, max(0.0, float(requested)))
+        except ValueError:
+            pass
+    
+    deadline = Deadline(budget)
+    with deadline_scope(deadline):
+        response = await call_next(request)
+    if deadline.fallback_reason:
+        response.headers["X-Data-Fallback"] = deadline.fallback_reason
+    return response
+
+# ==================== LOAD SHEDDING & BROWNOUT ====================
+# Under pressure (threadpool queue / latency) the server browns out: dataset routes serve cache or
+# fallback without live fetches, optional ?include= sections are dropped, low-priority routes get 503.
+
+BROWNOUT_QUEUE_DEPTH = int(os.getenv("BROWNOUT_QUEUE_DEPTH", "20"))
+BROWNOUT_LATENCY = float(os.getenv("BROWNOUT_LATENCY", "2.0"))
+BROWNOUT_RECOVER_SECONDS = float(os.getenv("BROWNOUT_RECOVER_SECONDS", "10"))
+MAX_IN_FLIGHT = int(os.getenv("MAX_IN_FLIGHT", "200"))
+
+# Never shed (long-lived streams, probes, operators)
+ADMISSION_EXEMPT_PREFIXES = ("/health", "/admin/", "/events", "/docs", "/openapi.json")
+# Shed first during brownout
+LOW_PRIORITY_PREFIXES = ("/states/compare", "/budget/trend", "/budget/simulate", "/salary/", "/export/", "/environment/")
+
+admission = AdmissionController(
+    brownout_queue_depth=BROWNOUT_QUEUE_DEPTH,
+    brownout_latency=BROWNOUT_LATENCY,
+    recover_seconds=BROWNOUT_RECOVER_SECONDS,
+    max_in_flight=MAX_IN_FLIGHT
+)
+
+def threadpool_queue_depth() -> int:
+    """Sync handlers waiting for a worker thread"""
+    return anyio.to_thread.current_default_thread_limiter().statistics().tasks_waiting
+
+@app.middleware("http")
+async def admission_middleware(request: Request, call_next):
+    path = request.url.path
+    if path.startswith(ADMISSION_EXEMPT_PREFIXES):
+        return await call_next(request)
+    
+    decision = admission.admit(path.startswith(LOW_PRIORITY_PREFIXES), threadpool_queue_depth())
+    if not decision.admitted:
+        logger.warning(f"🛑 Shed {path} ({decision.reason})")
+        return JSONResponse(
+            status_code=503,
+            content={"error": "Service overloaded, try again later", "reason": decision.reason, "retry_after": decision.retry_after},
+            headers={"Retry-After": str(decision.retry_after)}
+        )
+    
+    started = time.perf_counter()
+    latency = None
+    try:
+        response = await call_next(request)
+        latency = time.perf_counter() - started
+    finally:
+        admission.release(latency)
+    if decision.brownout:
+        response.headers["X-Service-Mode"] = "brownout"
+    return response
+
+# ==================== SPECULATIVE PREFETCH ====================
+# Sessions are predictable (overview -> ministries -> revenue -> last year's overview), so after a
+# request is served the most likely next cache keys are warmed in the background, within a budget.
+
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "true").lower() != "false"
+PREFETCH_MIN_PROBABILITY = float(os.getenv("PREFETCH_MIN_PROBABILITY", "0.2"))
+PREFETCH_MAX_KEYS = int(os.getenv("PREFETCH_MAX_KEYS", "3"))
+PREFETCH_WORKERS = int(os.getenv("PREFETCH_WORKERS", "2"))
+PREFETCH_BUDGET_SECONDS = float(os.getenv("PREFETCH_BUDGET_SECONDS", "10"))    # warm-up time per window
+PREFETCH_BUDGET_WINDOW = float(os.getenv("PREFETCH_BUDGET_WINDOW", "60"))
+PREFETCH_SESSION_TTL = float(os.getenv("PREFETCH_SESSION_TTL", "600"))
+# Year-keyed tables: ?year= comes from the client, years none of them cover are not learned or warmed
+PREFETCH_YEAR_TABLES = ("FALLBACK_BUDGET_DATA", "FALLBACK_REVENUE_DATA", "FALLBACK_STATE_BUDGETS")
+
+def prefetch_cache_key(cache_key: str) -> bool:
+    """Refresh one cache key off the request path; False when only fallback data was available"""
+    if is_entry_fresh(cache_store.get(cache_key)):
+        return True
+    data_type, year = split_cache_key(cache_key)
+    *item, _ = fetch_dataset(data_type, year, DATASET_FETCHERS[data_type])
+    return store_cache_entries([tuple(item)])[cache_key].source == "LIVE_API"
+
+# years are filled from the loaded tables on first use (see prefetch_years)
+transition_model = TransitionModel(session_ttl=PREFETCH_SESSION_TTL, years=())
+prefetcher = Prefetcher(
+    warm=prefetch_cache_key,
+    max_workers=PREFETCH_WORKERS,
+    budget_seconds=PREFETCH_BUDGET_SECONDS,
+    window_seconds=PREFETCH_BUDGET_WINDOW
+)
+
+def prefetch_route(path: str) -> str:
+    """Route as tracked by the transition model (/states/Kerala and /states/Goa are one route)"""
+    if path in ROUTE_DATASETS:
+        return path
+    for prefix, _ in ROUTE_DATASET_PREFIXES:
+        if path.startswith(prefix):
+            return prefix + "*"
+    return path
+
+def prefetch_years() -> frozenset:
+    """Years the loaded tables cover; re-read per call so a dataset reload adds or drops years"""
+    return frozenset(year for name in PREFETCH_YEAR_TABLES for year in datasets.get(name))
+
+def schedule_prefetch(client: str, path: str, year: str) -> None:
+    years = prefetch_years()
+    if years != transition_model.years:
+        transition_model.years = years
+    route = prefetch_route(path)
+    transition_model.observe(client, route, year)
+    if admission.brownout:
+        return
+    for next_route, next_year, _ in transition_model.predict(
+            route, year, limit=PREFETCH_MAX_KEYS, min_probability=PREFETCH_MIN_PROBABILITY):
+        data_type = route_dataset(next_route.rstrip("*"))
+        if data_type and not is_cache_fresh(data_type, next_year):
+            prefetcher.schedule(f"{data_type}_{next_year}")
+
+@app.middleware("http")
+async def prefetch_middleware(request: Request, call_next):
+    response = await call_next(request)
+    path = request.url.path
+    if (PREFETCH_ENABLED and request.method == "GET" and response.status_code < 400
+            and not path.startswith(ADMISSION_EXEMPT_PREFIXES)):
+        api_key = request.headers.get("x-api-key")
+        client = f"key:{api_key}" if api_key and api_key in FINANCE_API_KEYS else f"ip:{get_client_ip(request)}"
+        schedule_prefetch(client, path, request.query_params.get("year", "2026"))
+    return response
+
+@app.middleware("http")
+async def telemetry_middleware(request: Request, call_next):
+    """Outermost timing: access record, traffic capture and root trace span per request"""
+    arrived, started = time.time(), time.perf_counter()
+    path = request.url.path
+    root_span = tracer.request_span(
+        f"{request.method} {path}", request.headers.get("traceparent"),
+        **{"http.method": request.method, "http.target": request.url.path, "http.query": request.url.query or None}
+    )
+    with route_scope(path), root_span as span:
+        try:
+            response = await call_next(request)
+        except Exception:
+            status = 500
+            raise
+        else:
+            status = response.status_code
+            if span.traceparent:
+                response.headers["traceparent"] = span.traceparent
+            return response
+        finally:
+            span.set("http.status_code", status)
+            duration_ms = (time.perf_counter() - started) * 1000
+            if traffic_recorder and not path.startswith(TRAFFIC_CAPTURE_EXCLUDE):
+                traffic_recorder.record(arrived, get_client_ip(request), request.method, path,
+                                        request.url.query, status, duration_ms)
+            if ACCESS_LOG_ENABLED:
+                access_logger.info(
+                    "%s %s %d %.1fms", request.method, path, status, duration_ms,
+                    extra={
+                        "method": request.method,
+                        "path": path,
+                        "query": request.url.query,
+                        "status": status,
+                        "duration_ms": round(duration_ms, 2),
+                        "client": get_client_ip(request),
+                    }
+                )
 
 # CORS middleware
 app.add_middleware(
@@ -52,14 +455,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["RateLimit-Limit", "RateLimit-Remaining", "RateLimit-Reset", "RateLimit-Policy", "Retry-After", "X-Data-Fallback", "X-Service-Mode", "traceparent"],
 )
 
 # Error handling middleware
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
-    logger.error(f"Global exception: {type(exc).__name__}: {str(exc)}")
-    import traceback
-    traceback.print_exc()
+    logger.error(f"Global exception: {type(exc).__name__}: {str(exc)}",
+                 exc_info=(type(exc), exc, exc.__traceback__))
     return JSONResponse(
         status_code=500,
         content={"error": str(exc), "type": type(exc).__name__}
@@ -67,31 +470,111 @@ async def global_exception_handler(request: Request, exc: Exception):
 
 # ==================== API ENDPOINTS & DATA SOURCES ====================
 
-# Official Government Data APIs
-INDIA_DATA_PORTAL_BASE = "https://api.data.gov.in/resource"
-CKAN_API_BASE = "https://ckandev.indiadataportal.com/api/3"
-UNION_BUDGET_API = "https://www.indiabudget.gov.in/api"
+# Official Government Data APIs (override to point at mock_government_api.py for benchmarking)
+INDIA_BUDGET_BASE = os.getenv("INDIA_BUDGET_BASE", "https://www.indiabudget.gov.in").rstrip("/")
+INDIA_DATA_PORTAL_BASE = os.getenv("INDIA_DATA_PORTAL_BASE", "https://api.data.gov.in/resource").rstrip("/")
+CKAN_API_BASE = os.getenv("CKAN_API_BASE", "https://ckandev.indiadataportal.com/api/3").rstrip("/")
+UNION_BUDGET_API = f"{INDIA_BUDGET_BASE}/api"
 
 # API Keys (if required - can be added to environment variables)
-API_KEY = "579b464db66ec23bdd000001cdd3946e44ce4aad7209ff7b23ac571b"
+API_KEY = os.getenv("DATA_GOV_API_KEY") or "579b464db66ec23bdd000001cdd3946e44ce4aad7209ff7b23ac571b"
 
 # Cache settings
 CACHE_DURATION = timedelta(hours=6)
-last_cache_update = None
-cached_data = {
-    "budget": None,
-    "revenue": None,
-    "states": None,
-    "economic": None
-}
+CACHE_SNAPSHOT_HISTORY = 5   # previous snapshots kept for rollback
+
+# Immutable snapshots: refreshes build a frozen entry (raw data + aggregates) and publish it
+# with one reference swap, so handlers read consistent data without locks
+cache_store = SnapshotStore(history=CACHE_SNAPSHOT_HISTORY)
+
+# Concurrent upstream fetches for multi-year views (/budget/trend?live=true)
+MULTI_FETCH_MAX_PARALLEL = int(os.getenv("MULTI_FETCH_MAX_PARALLEL", "6"))
+
+# Per-key hit/miss counters and last fetch duration (served by /admin/cache)
+cache_stats: Dict[str, dict] = {}
+cache_stats_lock = threading.Lock()
+
+# Reference tables (fallback data, salary heatmap, compare tables). The Python literals in this
+# module are the bundled defaults; versioned <NAME>.zds files in DATASET_DIR override them and
+# are hot-reloaded when they change on disk (export with: --export-datasets)
+DATASET_DIR = os.getenv("DATASET_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "datasets"))
+DATASET_NAMES = (
+    "FALLBACK_BUDGET_DATA",
+    "UNION_BUDGET_TOTALS",
+    "FALLBACK_REVENUE_DATA",
+    "FALLBACK_ECONOMIC_INDICATORS",
+    "FALLBACK_STATE_BUDGETS",
+    "STATE_PRIORITIES",
+    "FALLBACK_STATE_SECTOR_ALLOCATION",
+    "FALLBACK_WELFARE_DATA",
+    "FALLBACK_STATE_TAX_DATA",
+    "SKILL_DEMAND_HEATMAP",
+    "COMPARE_GDP_SERIES",
+    "COMPARE_GDP_COMPOSITION",
+    "COMPARE_POPULATION_SERIES",
+    "COMPARE_SUMMARY_COUNTRIES",
+)
+datasets = DatasetRegistry(DATASET_DIR, builtin=lambda name: globals()[name], names=DATASET_NAMES,
+                           transform=compact)
+
+# Dataset versions + bounded record-level change log (served by /changes)
+CHANGE_LOG_MAX = 5000
+change_feed = ChangeFeed(max_changes=CHANGE_LOG_MAX)
+
+# SSE fan-out of {dataset, year, version} whenever a refresh changes a cached dataset
+SSE_MAX_CLIENTS = int(os.getenv("SSE_MAX_CLIENTS", "10000"))
+event_broadcaster = EventBroadcaster(max_subscribers=SSE_MAX_CLIENTS)
+
+# Adaptive upstream timeouts: p99 latency x 1.5 over a rolling 10 minute window, clamped.
+# The fixed per-call timeouts below are only used until an upstream has enough samples.
+UPSTREAM_TIMEOUT_PERCENTILE = float(os.getenv("UPSTREAM_TIMEOUT_PERCENTILE", "0.99"))
+UPSTREAM_TIMEOUT_MULTIPLIER = float(os.getenv("UPSTREAM_TIMEOUT_MULTIPLIER", "1.5"))
+UPSTREAM_TIMEOUT_MIN = float(os.getenv("UPSTREAM_TIMEOUT_MIN", "0.5"))
+UPSTREAM_TIMEOUT_MAX = float(os.getenv("UPSTREAM_TIMEOUT_MAX", "15"))
+UPSTREAM_DEFAULT_TIMEOUTS = {"indiabudget": 3, "datagov": 5, "ckan": 5, "ckan_resource": 5}
+upstream_timeouts = AdaptiveTimeouts(
+    percentile=UPSTREAM_TIMEOUT_PERCENTILE,
+    multiplier=UPSTREAM_TIMEOUT_MULTIPLIER,
+    min_timeout=UPSTREAM_TIMEOUT_MIN,
+    max_timeout=UPSTREAM_TIMEOUT_MAX
+)
 
 # ==================== UTILITY FUNCTIONS ====================
 
-def fetch_from_api(url: str, params: dict = None, timeout: int = 10) -> dict:
-    """Fetch data from government APIs with error handling"""
+def upstream_get(upstream: str, url: str, params: dict = None, **kwargs) -> requests.Response:
+    """
+    http_get with the upstream's adaptive timeout, capped by the request deadline.
+    Records the latency it observed; raises DeadlineExceeded once the budget is spent.
+    """
+    timeout = upstream_timeouts.timeout(upstream, UPSTREAM_DEFAULT_TIMEOUTS.get(upstream, 10))
+    deadline = current_deadline()
+    if deadline is not None:
+        timeout = deadline.cap(timeout)
+        # Only the retries the remaining budget can cover; past that, fail over to the next source
+        kwargs.setdefault("retries", retries_within(deadline.remaining(), timeout))
+    with tracer.span(f"upstream {upstream}", kind=CLIENT, **{"http.url": url, "timeout_s": round(timeout, 3)}) as span:
+        kwargs["headers"] = tracer.inject(dict(kwargs.get("headers") or {}))
+        try:
+            response = http_get(url, params=params, timeout=timeout, **kwargs)
+        except requests.exceptions.Timeout:
+            upstream_timeouts.observe_timeout(upstream, timeout)
+            raise
+        span.set("http.status_code", response.status_code)
+        span.set("not_modified", bool(getattr(response, "from_cache", False)))
+    # elapsed = time to response headers of the final attempt (the part the timeout bounds)
+    upstream_timeouts.observe(upstream, response.elapsed.total_seconds())
+    return response
+
+def fetch_from_api(url: str, params: dict = None, timeout: int = 10, upstream: str = None) -> dict:
+    """Fetch data from government APIs with error handling (pooled, conditional GET)"""
     try:
         logger.info(f"Fetching data from: {url}")
-        response = requests.get(url, params=params, timeout=timeout)
+        if upstream:
+            response = upstream_get(upstream, url, params=params)
+        else:
+            with tracer.span("upstream", kind=CLIENT, **{"http.url": url}) as span:
+                response = http_get(url, params=params, timeout=timeout, headers=tracer.inject({}))
+                span.set("http.status_code", response.status_code)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
@@ -107,31 +590,35 @@ def fetch_union_budget_data(year: str = "2025") -> dict:
     
     # Source 1: Try India Budget website API
     try:
-        india_budget_url = f"https://www.indiabudget.gov.in/budget{year}-{str(int(year)+1)[2:]}/ub{year}-{str(int(year)+1)[2:]}/ubmain.htm"
+        india_budget_url = f"{INDIA_BUDGET_BASE}/budget{year}-{str(int(year)+1)[2:]}/ub{year}-{str(int(year)+1)[2:]}/ubmain.htm"
         logger.info(f"Trying India Budget: {india_budget_url}")
-        response = requests.get(india_budget_url, timeout=3)
+        response = upstream_get("indiabudget", india_budget_url)
         if response.status_code == 200:
             logger.info("✅ Found India Budget website")
             # Parse budget data from official source
             # (Would need HTML parsing implementation)
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         logger.warning(f"India Budget API unavailable: {str(e)}")
     
     # Source 2: Try data.gov.in API
     try:
-        data_gov_url = "https://api.data.gov.in/resource/9ef84268-d588-465a-a308-a864a43d0070"
+        data_gov_url = f"{INDIA_DATA_PORTAL_BASE}/9ef84268-d588-465a-a308-a864a43d0070"
         params = {
             "api-key": API_KEY,
             "format": "json",
             "filters[financial_year]": f"{int(year)-1}-{year[2:]}"
         }
         logger.info(f"Trying data.gov.in API for year {year}")
-        data = fetch_from_api(data_gov_url, params, timeout=5)
+        data = fetch_from_api(data_gov_url, params, upstream="datagov")
         if data and data.get("records"):
             logger.info(f"✅ Got {len(data['records'])} records from data.gov.in")
             parsed = parse_datagov_budget_response(data, year)
             if parsed and len(parsed) > 5:
                 return parsed
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         logger.warning(f"data.gov.in API error: {str(e)}")
     
@@ -144,12 +631,14 @@ def fetch_union_budget_data(year: str = "2025") -> dict:
             "fq": f"organization:ministry-of-finance"
         }
         logger.info(f"Trying CKAN API for year {year}")
-        data = fetch_from_api(ckan_url, params, timeout=5)
+        data = fetch_from_api(ckan_url, params, upstream="ckan")
         if data and data.get("success") and data.get("result", {}).get("results"):
             logger.info(f"✅ Got {len(data['result']['results'])} datasets from CKAN")
             parsed = parse_ckan_budget_response(data, year)
             if parsed and len(parsed) > 5:
                 return parsed
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         logger.warning(f"CKAN API error: {str(e)}")
     
@@ -187,57 +676,140 @@ def parse_datagov_budget_response(data: dict, year: str) -> dict:
         logger.error(f"Error parsing data.gov.in response: {str(e)}")
         return None
 
+# CKAN resource downloads: bounded parallelism and a hard cap on bytes read per resource
+CKAN_MAX_PARALLEL_DOWNLOADS = 4
+CKAN_MAX_RESOURCE_BYTES = 50 * 1024 * 1024
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Column aliases for budget resources (normalized: lowercase, single spaces)
+BUDGET_COLUMN_ALIASES = {
+    "ministry": ["ministry", "ministry name", "department", "ministry/department", "demand", "particulars"],
+    "allocation": ["allocation", "budget allocation", "budget estimate", "budget estimates", "be"],
+    "spent": ["spent", "expenditure", "actual expenditure", "actuals", "actual"],
+    "category": ["category", "sector", "major head"],
+}
+
+def normalize_column(name: str) -> str:
+    return re.sub(r"[\s_]+", " ", str(name)).strip().lower()
+
+def match_budget_columns(columns) -> dict:
+    """Map our field names to the resource's column names (exact alias first, then prefix)"""
+    normalized = {normalize_column(c): c for c in columns}
+    mapping = {}
+    for field, aliases in BUDGET_COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in normalized:
+                mapping[field] = normalized[alias]
+                break
+        else:
+            # e.g. "Budget Estimates 2025-2026"
+            for norm, original in normalized.items():
+                if any(norm.startswith(alias + " ") for alias in aliases):
+                    mapping[field] = original
+                    break
+    return mapping
+
+def parse_amount(value) -> Optional[float]:
+    """Parse '1,23,456.7' / '₹ 500' style amounts; None when not numeric"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    cleaned = re.sub(r"[^\d.\-]", "", str(value))
+    try:
+        return float(cleaned)
+    except ValueError:
+        return None
+
+def build_budget_records(rows) -> dict:
+    """Build {ministry: {allocation, spent, category}} from an iterable of row dicts, one row at a time"""
+    budget_data = {}
+    mapping = None
+    for row in rows:
+        if not isinstance(row, dict):
+            continue
+        if mapping is None:
+            mapping = match_budget_columns(row.keys())
+            if "ministry" not in mapping or "allocation" not in mapping:
+                logger.warning(f"Budget resource has no ministry/allocation columns: {list(row.keys())[:10]}")
+                return {}
+        ministry = str(row.get(mapping["ministry"]) or "").strip()
+        allocation = parse_amount(row.get(mapping["allocation"]))
+        if not ministry or allocation is None or "total" in ministry.lower():
+            continue
+        spent = parse_amount(row.get(mapping["spent"])) if "spent" in mapping else None
+        budget_data[ministry] = {
+            "allocation": allocation,
+            "spent": spent or 0,
+            "category": (row.get(mapping["category"]) if "category" in mapping else None) or "Other"
+        }
+    return budget_data
+
+def _bounded_chunks(response, limit: int = CKAN_MAX_RESOURCE_BYTES):
+    """Stream response chunks, stopping once `limit` bytes were read"""
+    read = 0
+    for chunk in response.iter_content(STREAM_CHUNK_SIZE):
+        read += len(chunk)
+        if read > limit:
+            logger.warning(f"Resource exceeded {limit} bytes, truncating: {response.url}")
+            return
+        yield chunk
+
+def _bounded_lines(response, limit: int = CKAN_MAX_RESOURCE_BYTES):
+    """Split a bounded chunk stream into text lines as bytes arrive"""
+    pending = b""
+    for chunk in _bounded_chunks(response, limit):
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8-sig", errors="replace").rstrip("\r")
+    if pending:
+        yield pending.decode("utf-8-sig", errors="replace").rstrip("\r")
+
+def stream_budget_resource(resource: dict) -> dict:
+    """Download one CKAN resource and parse ministry records row by row as the body streams in"""
+    url = resource.get("url")
+    format_type = resource.get("format", "").upper()
+    logger.info(f"📥 Downloading resource: {resource.get('name')}")
+    try:
+        with upstream_get("ckan_resource", url, stream=True) as response:
+            response.raise_for_status()
+            if format_type == "CSV":
+                rows = iter_csv_rows(_bounded_lines(response))
+            else:
+                rows = iter_json_array_items(_bounded_chunks(response))
+            return build_budget_records(rows)
+    except Exception as e:
+        logger.error(f"Error downloading resource {url}: {str(e)}")
+        return {}
+
 def parse_ckan_budget_response(data: dict, year: str) -> dict:
-    """Parse CKAN API response from India Data Portal"""
+    """Parse CKAN API response from India Data Portal (resources downloaded in parallel)"""
     try:
+        resources = [
+            resource
+            for dataset in data.get("result", {}).get("results", [])
+            for resource in dataset.get("resources", [])
+            if resource.get("format", "").upper() in ["CSV", "JSON"]
+            and resource.get("url")
+            and "budget" in resource.get("name", "").lower()
+        ]
+        if not resources:
+            return None
+
         budget_data = {}
-        results = data.get("result", {}).get("results", [])
+        workers = min(CKAN_MAX_PARALLEL_DOWNLOADS, len(resources))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ckan") as pool:
+            # map() keeps resource order, so later resources win on duplicate ministries as before
+            for parsed_data in pool.map(bind(stream_budget_resource), resources):
+                budget_data.update(parsed_data)
         
-        for dataset in results:
-            resources = dataset.get("resources", [])
-            for resource in resources:
-                if resource.get("format", "").upper() in ["CSV", "JSON", "XLSX"]:
-                    resource_url = resource.get("url")
-                    if resource_url and "budget" in resource.get("name", "").lower():
-                        logger.info(f"📥 Downloading resource: {resource.get('name')}")
-                        resource_data = fetch_from_api(resource_url, timeout=5)
-                        if resource_data:
-                            parsed_data = parse_budget_resource(resource_data, resource.get("format"))
-                            if parsed_data:
-                                budget_data.update(parsed_data)
-        
-        logger.info(f"✅ Parsed {len(budget_data)} ministries from CKAN")
+        logger.info(f"✅ Parsed {len(budget_data)} ministries from CKAN ({len(resources)} resources)")
         return budget_data if len(budget_data) > 5 else None
     except Exception as e:
         logger.error(f"Error parsing CKAN response: {str(e)}")
         return None
 
-def parse_budget_resource(resource_data: any, format_type: str) -> dict:
-    """Parse budget data from downloaded resource"""
-    try:
-        budget_data = {}
-        
-        if format_type.upper() == "JSON" and isinstance(resource_data, dict):
-            # Handle JSON format
-            if "data" in resource_data:
-                for item in resource_data.get("data", []):
-                    ministry = item.get("ministry") or item.get("department")
-                    if ministry:
-                        budget_data[ministry] = {
-                            "allocation": float(item.get("allocation", 0)),
-                            "spent": float(item.get("spent", 0)),
-                            "category": item.get("category", "Other")
-                        }
-        elif format_type.upper() == "CSV":
-            # Would need CSV parsing implementation
-            logger.info("CSV parsing not yet implemented")
-        
-        return budget_data
-    except Exception as e:
-        logger.error(f"Error parsing resource: {str(e)}")
-        return {}
-
-
 def parse_union_budget_response(ckan_response: dict, year: str) -> dict:
     """Parse CKAN API response and extract budget data"""
     try:
@@ -312,66 +884,252 @@ def parse_resource_data(resource_data: any) -> dict:
     
     return {}
 
-def get_cached_or_fetch(data_type: str, year: str, fetch_func) -> dict:
-    """Get cached data or fetch new data if cache expired - LIVE API ENABLED"""
-    global last_cache_update, cached_data
-    
-    current_time = datetime.now()
+def is_entry_fresh(entry: Optional[CacheEntry]) -> bool:
+    # Fallback entries are retried against the live APIs on the next request
+    return (entry is not None and
+            entry.source == "LIVE_API" and
+            datetime.now() - entry.fetched_at <= CACHE_DURATION)
+
+def is_cache_fresh(data_type: str, year: str) -> bool:
+    """True when get_cached_or_fetch would answer from cache without an upstream fetch"""
+    return is_entry_fresh(cache_store.get(f"{data_type}_{year}"))
+
+def compute_aggregates(data_type: str, data: dict) -> dict:
+    """Precompute the views handlers serve, once per refresh instead of once per request"""
+    if data_type == "budget":
+        ministries = []
+        for ministry, item in data.items():
+            utilization = (item["spent"] / item["allocation"]) * 100 if item["allocation"] else 0
+            ministries.append({
+                "ministry": ministry,
+                "allocation": item["allocation"],
+                "spent": item["spent"],
+                "balance": item["allocation"] - item["spent"],
+                "utilization_percentage": round(utilization, 2),
+                "category": item["category"]
+            })
+        ministries.sort(key=lambda x: x["allocation"], reverse=True)
+        return {
+            "total_allocation": sum(item["allocation"] for item in data.values()),
+            "total_spent": sum(item["spent"] for item in data.values()),
+            "ministries": ministries,
+            # Read-only allocation/spent/category arrays for /budget/simulate
+            "vector": BudgetVector.from_records(data)
+        }
+    if data_type == "states":
+        states = [
+            {
+                "state": state,
+                "budget": item["budget"],
+                "per_capita_budget": item["per_capita"],
+                "population_crore": item["population_cr"],
+                "gdp_growth_rate": item["gdp_growth"],
+                "currency": "INR Crores (total), INR (per capita)"
+            }
+            for state, item in data.items()
+        ]
+        states.sort(key=lambda x: x["budget"], reverse=True)
+        return {"states": states, "total_budget": sum(s["budget"] for s in states)}
+    if data_type == "revenue":
+        return {
+            section: sum(values.values())
+            for section, values in data.items() if isinstance(values, Mapping)
+        }
+    return {}
+
+def change_logged_builder(data_type: str, year: str, frozen, aggregates, source: str,
+                          fetched_at: datetime, changed: list):
+    """Snapshot builder that logs record-level changes against the entry it replaces"""
     cache_key = f"{data_type}_{year}"
+
+    def build(previous: Optional[CacheEntry]) -> CacheEntry:
+        version = change_feed.record(cache_key, data_type, year,
+                                     previous.data if previous else None, frozen)
+        if previous is None or version != previous.version:
+            changed.append((data_type, year, version))
+        return CacheEntry(data=frozen, source=source, fetched_at=fetched_at,
+                          version=version, aggregates=aggregates)
+    return build
+
+def publish_cache_entries(builders: dict, changed: list, remove: List[str] = ()) -> Dict[str, CacheEntry]:
+    """One snapshot swap for all builders (and removals), then a refresh event per changed dataset"""
+    entries = cache_store.publish_many(builders, remove=remove)
+    for data_type, year, version in changed:
+        event_broadcaster.publish("refresh", {"dataset": data_type, "year": year, "version": version})
+    return entries
+
+def prepare_cache_data(data_type: str, data) -> tuple:
+    """(frozen data, frozen aggregates) for a dataset; raises on data the handlers couldn't serve"""
+    if not isinstance(data, Mapping):
+        raise TypeError(f"{data_type} data must be an object, not {type(data).__name__}")
+    frozen = compact(data)
+    return frozen, freeze(compute_aggregates(data_type, frozen))
+
+def publish_prepared_entries(items: List[tuple]) -> Dict[str, CacheEntry]:
+    """items: (data_type, year, frozen, aggregates, source, fetched_at) from prepare_cache_data"""
+    builders = {}
+    changed = []
+    for data_type, year, frozen, aggregates, source, fetched_at in items:
+        builders[f"{data_type}_{year}"] = change_logged_builder(
+            data_type, year, frozen, aggregates, source, fetched_at, changed)
+    return publish_cache_entries(builders, changed)
+
+def store_cache_entries(items: List[tuple]) -> Dict[str, CacheEntry]:
+    """
+    Build frozen entries off to the side and publish them together in one new snapshot,
+    logging record-level changes. items: (data_type, year, data, source, fetched_at) tuples.
+    """
+    return publish_prepared_entries([
+        (data_type, year, *prepare_cache_data(data_type, data), source, fetched_at)
+        for data_type, year, data, source, fetched_at in items
+    ])
+
+def store_cache_entry(data_type: str, year: str, data: dict, source: str, fetched_at: datetime) -> CacheEntry:
+    """Build a frozen entry off to the side and publish it in a new snapshot, logging record-level changes"""
+    return store_cache_entries([(data_type, year, data, source, fetched_at)])[f"{data_type}_{year}"]
+
+def record_cache_access(cache_key: str, hit: bool, fetch_seconds: float = None) -> None:
+    """Operational counters for /admin/cache (kept outside the immutable snapshots)"""
+    with cache_stats_lock:
+        stats = cache_stats.setdefault(cache_key, {"hits": 0, "misses": 0, "last_fetch_seconds": None})
+        stats["hits" if hit else "misses"] += 1
+        if fetch_seconds is not None:
+            stats["last_fetch_seconds"] = round(fetch_seconds, 3)
+    if hit:
+        prefetcher.record_hit(cache_key)
+
+def fetch_dataset(data_type: str, year: str, fetch_func) -> tuple:
+    """
+    Fetch LIVE data, falling back to the verified data on empty results or errors.
+    Returns (data_type, year, data, source, fetched_at, fetch_seconds); publishes nothing.
+    """
+    current_time = datetime.now()
+    started = time.perf_counter()
     
-    # Check if cache is valid for this specific data type and year
-    if (cached_data.get(cache_key) is None or
-        last_cache_update is None or 
-        current_time - last_cache_update > CACHE_DURATION):
-        
-        logger.info(f"🌐 Attempting to fetch LIVE data for {data_type} (year: {year})")
-        
+    logger.info(f"🌐 Attempting to fetch LIVE data for {data_type} (year: {year})")
+    
+    with tracer.span("fetch_dataset", data_type=data_type, year=year) as span:
         try:
             fresh_data = fetch_func(year)
             
             if fresh_data and len(fresh_data) > 0:
-                cached_data[cache_key] = {
-                    "data": fresh_data,
-                    "source": "LIVE_API",
-                    "fetched_at": current_time.isoformat()
-                }
-                last_cache_update = current_time
                 logger.info(f"✅ Successfully fetched LIVE data for {data_type}")
-                return fresh_data
+                data, source = fresh_data, "LIVE_API"
             else:
                 logger.info(f"ℹ️ API returned empty data for {data_type}, using verified fallback")
-                fallback = get_fallback_data(data_type, year)
-                cached_data[cache_key] = {
-                    "data": fallback,
-                    "source": "FALLBACK",
-                    "fetched_at": current_time.isoformat()
-                }
-                return fallback
+                data, source = get_fallback_data(data_type, year), "FALLBACK"
+        except DeadlineExceeded as e:
+            logger.warning(f"⏱️ {str(e)} while fetching {data_type}, serving verified fallback")
+            data, source = get_fallback_data(data_type, year), "FALLBACK"
         except Exception as e:
             logger.error(f"❌ API fetch failed for {data_type}: {str(e)}")
-            fallback = get_fallback_data(data_type, year)
-            cached_data[cache_key] = {
-                "data": fallback,
-                "source": "FALLBACK",
-                "fetched_at": current_time.isoformat()
-            }
-            return fallback
+            data, source = get_fallback_data(data_type, year), "FALLBACK"
+        span.set("source", source)
+    
+    return data_type, year, data, source, current_time, time.perf_counter() - started
+
+def note_fallback(entries) -> None:
+    """Flag the response (X-Data-Fallback) when any entry it uses came from fallback data"""
+    deadline = current_deadline()
+    if deadline is not None and any(entry.source == "FALLBACK" for entry in entries):
+        deadline.fallback_reason = "deadline" if deadline.expired() else "upstream"
+
+def refresh_cache_entry(data_type: str, year: str, fetch_func) -> CacheEntry:
+    """Fetch LIVE data (or fall back) and publish it, regardless of cache freshness"""
+    *item, fetch_seconds = fetch_dataset(data_type, year, fetch_func)
+    entry = store_cache_entries([tuple(item)])[f"{data_type}_{year}"]
+    record_cache_access(f"{data_type}_{year}", hit=False, fetch_seconds=fetch_seconds)
+    note_fallback([entry])
+    return entry
+
+def refresh_cache_entries(jobs: List[tuple]) -> Dict[str, CacheEntry]:
+    """
+    Fetch several (data_type, year, fetch_func) datasets concurrently and publish them in
+    one snapshot swap, so N years cost roughly one upstream round trip instead of N.
+    """
+    if not jobs:
+        return {}
+    fetch = bind(fetch_dataset)     # carry this request's deadline into the workers
+    workers = min(MULTI_FETCH_MAX_PARALLEL, len(jobs))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bulk-fetch") as pool:
+        results = list(pool.map(lambda job: fetch(*job), jobs))
     
-    logger.info(f"📦 Using cached data for {cache_key}")
-    cached_entry = cached_data[cache_key]
-    return cached_entry.get("data") if isinstance(cached_entry, dict) else cached_entry
+    entries = store_cache_entries([tuple(result[:5]) for result in results])
+    for data_type, year, _, _, _, fetch_seconds in results:
+        record_cache_access(f"{data_type}_{year}", hit=False, fetch_seconds=fetch_seconds)
+    note_fallback(entries.values())
+    return entries
+
+def get_cached_entries(keys: List[tuple], fetch_func) -> Dict[str, CacheEntry]:
+    """
+    get_cached_entry for many (data_type, year) pairs at once, keyed by cache key.
+    Every stale pair is fetched concurrently and the results land in one snapshot.
+    """
+    entries = {}
+    stale = []
+    for data_type, year in keys:
+        cache_key = f"{data_type}_{year}"
+        entry = cache_store.get(cache_key)
+        if is_entry_fresh(entry):
+            record_cache_access(cache_key, hit=True)
+            entries[cache_key] = entry
+        elif admission.brownout:
+            entries[cache_key] = serve_without_fetch(data_type, year, entry)
+        else:
+            stale.append((data_type, year, fetch_func))
+    
+    with tracer.span("get_cached_entries", keys=len(keys), stale=len(stale)):
+        entries.update(refresh_cache_entries(stale))
+    return entries
+
+def get_cached_entry(data_type: str, year: str, fetch_func) -> CacheEntry:
+    """Get the cached entry (data + aggregates), fetching new data if the cache expired - LIVE API ENABLED"""
+    cache_key = f"{data_type}_{year}"
+    with tracer.span("get_cached_or_fetch", data_type=data_type, year=year) as span:
+        entry = cache_store.get(cache_key)
+        
+        # Check if cache is valid for this specific data type and year
+        fresh = is_entry_fresh(entry)
+        span.set("cache.hit", fresh)
+        if not fresh:
+            if admission.brownout:
+                entry = serve_without_fetch(data_type, year, entry)
+            else:
+                entry = refresh_cache_entry(data_type, year, fetch_func)
+        else:
+            logger.info("📦 Using cached data for %s", cache_key, extra=HOT)
+            record_cache_access(cache_key, hit=True)
+        span.set("source", entry.source)
+        return entry
+
+def serve_without_fetch(data_type: str, year: str, entry: Optional[CacheEntry]) -> CacheEntry:
+    """Brownout path: whatever is cached (even stale), else the verified fallback - no upstream calls"""
+    if entry is None:
+        entry = store_cache_entry(data_type, year, get_fallback_data(data_type, year), "FALLBACK", datetime.now())
+    record_cache_access(f"{data_type}_{year}", hit=True)
+    deadline = current_deadline()
+    if deadline is not None and entry.source == "FALLBACK":
+        deadline.fallback_reason = "brownout"
+    return entry
+
+def get_cached_or_fetch(data_type: str, year: str, fetch_func) -> dict:
+    """Get cached data or fetch new data if cache expired - LIVE API ENABLED"""
+    return get_cached_entry(data_type, year, fetch_func).data
 
 def get_fallback_data(data_type: str, year: str) -> dict:
     """Fallback data when APIs are unavailable - Official Union Budget 2025-26 figures"""
     
     if data_type == "budget":
-        return FALLBACK_BUDGET_DATA.get(year, FALLBACK_BUDGET_DATA["2025"])
+        table = datasets.get("FALLBACK_BUDGET_DATA")
+        return table.get(year, table["2025"])
     elif data_type == "revenue":
-        return FALLBACK_REVENUE_DATA.get(year, FALLBACK_REVENUE_DATA["2025"])
+        table = datasets.get("FALLBACK_REVENUE_DATA")
+        return table.get(year, table["2025"])
     elif data_type == "states":
-        return FALLBACK_STATE_BUDGETS.get(year, FALLBACK_STATE_BUDGETS["2025"])
+        table = datasets.get("FALLBACK_STATE_BUDGETS")
+        return table.get(year, table["2025"])
     elif data_type == "indicators" or data_type == "economic":
-        return FALLBACK_ECONOMIC_INDICATORS
+        return datasets.get("FALLBACK_ECONOMIC_INDICATORS")
     
     return {}
 
@@ -694,6 +1452,79 @@ FALLBACK_STATE_BUDGETS = {
     }
 }
 
+# ==================== RESPONSE SHAPING ====================
+# Generic ?fields= / ?limit= / ?cursor= / ?include= handling applied to computed payloads,
+# so clients that only render one chart don't download the whole result.
+
+MAX_PAGE_SIZE = 500
+
+def parse_csv_param(value: Optional[str]) -> List[str]:
+    """Split a comma-separated query parameter into clean, non-empty items"""
+    if not value:
+        return []
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+def encode_cursor(offset: int) -> str:
+    return base64.urlsafe_b64encode(f"o:{offset}".encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        prefix, offset = base64.urlsafe_b64decode(padded.encode()).decode().split(":", 1)
+        if prefix != "o" or int(offset) < 0:
+            raise ValueError(cursor)
+        return int(offset)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail=f"Invalid cursor '{cursor}'")
+
+def shape_response(payload: dict, list_key: str = None, fields: Optional[str] = None,
+                   limit: Optional[int] = None, cursor: Optional[str] = None,
+                   include: Optional[str] = None, optional: tuple = ()) -> dict:
+    """
+    Apply sparse fieldsets, cursor pagination and optional sections to a response payload.
+
+    Args:
+        payload: Fully computed response dict
+        list_key: Key of the list to project/paginate (e.g. "ministries")
+        fields: Comma-separated item fields to keep (?fields=ministry,allocation)
+        limit: Page size (?limit=); enables pagination together with cursor
+        cursor: Opaque cursor from a previous page's next_cursor (?cursor=)
+        include: Comma-separated optional sections to keep (?include=details)
+        optional: Payload keys dropped unless requested via include
+    """
+    included = set(parse_csv_param(include))
+    unknown = included - set(optional)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown include '{', '.join(sorted(unknown))}'. Available: {', '.join(optional) or 'none'}")
+    if admission.brownout:
+        # Optional sections are the first thing to go under load
+        included = set()
+    shaped = {k: v for k, v in payload.items() if k not in optional or k in included}
+
+    if list_key is None:
+        return shaped
+    items = shaped[list_key]
+
+    if limit is not None or cursor is not None:
+        if limit is not None and not 1 <= limit <= MAX_PAGE_SIZE:
+            raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_PAGE_SIZE}")
+        offset = decode_cursor(cursor) if cursor else 0
+        page_size = limit or MAX_PAGE_SIZE
+        end = offset + page_size
+        shaped["next_cursor"] = encode_cursor(end) if end < len(items) else None
+        items = items[offset:end]
+
+    requested = parse_csv_param(fields)
+    if requested:
+        available = {key for item in items for key in item}
+        missing = [f for f in requested if f not in available]
+        if missing and items:
+            raise HTTPException(status_code=400, detail=f"Unknown field(s) '{', '.join(missing)}'. Available: {', '.join(sorted(available))}")
+        items = [{f: item[f] for f in requested if f in item} for item in items]
+
+    shaped[list_key] = items
+    return shaped
+
 # ==================== API ENDPOINTS ====================
 
 @app.get("/")
@@ -706,6 +1537,7 @@ def root():
             "/budget/overview",
             "/budget/ministry/{ministry_name}",
             "/budget/category/{category}",
+            "/budget/simulate",
             "/revenue/summary",
             "/revenue/taxes",
             "/economy/indicators",
@@ -718,10 +1550,10 @@ def root():
 def get_budget_overview(year: str = "2026"):
     """Get overall budget overview for a specific year - with live API fetching"""
     # Try to fetch live data from API, fallback to static data if unavailable
-    budget_data = get_cached_or_fetch("budget", year, fetch_union_budget_data)
+    aggregates = get_cached_entry("budget", year, fetch_union_budget_data).aggregates
     
-    total_allocation = sum(data["allocation"] for data in budget_data.values())
-    total_spent = sum(data["spent"] for data in budget_data.values())
+    total_allocation = aggregates["total_allocation"]
+    total_spent = aggregates["total_spent"]
     utilization = (total_spent / total_allocation) * 100
     
     return {
@@ -735,22 +1567,39 @@ def get_budget_overview(year: str = "2026"):
     }
 
 @app.get("/budget/trend")
-def get_budget_trend():
-    """Get historical revenue vs expenditure trend"""
+def get_budget_trend(live: bool = False):
+    """
+    Get historical revenue vs expenditure trend
+    
+    live=true fetches every year's budget data concurrently (cached per year) and uses the
+    LIVE_API expenditure where the upstreams have it; revenue stays on the reference tables.
+    """
     trend_data = []
+    budget_totals = datasets.get("UNION_BUDGET_TOTALS")
+    revenue_data = datasets.get("FALLBACK_REVENUE_DATA")
     
     # Iterate through years present in UNION_BUDGET_TOTALS
     # Sort years to ensure chronological order
-    years = sorted(UNION_BUDGET_TOTALS.keys())
+    years = sorted(budget_totals.keys())
+    
+    live_entries = {}
+    sources = {}
+    if live:
+        live_entries = get_cached_entries([("budget", year) for year in years], fetch_union_budget_data)
     
     for year in years:
         # Expenditure
-        expenditure = UNION_BUDGET_TOTALS[year]["total"]
+        expenditure = budget_totals[year]["total"]
+        budget_entry = live_entries.get(f"budget_{year}")
+        if budget_entry is not None:
+            sources[year] = budget_entry.source
+            if budget_entry.source == "LIVE_API":
+                expenditure = budget_entry.aggregates["total_allocation"]
         
         # Revenue (Calculate from FALLBACK_REVENUE_DATA)
         revenue = 0
-        if year in FALLBACK_REVENUE_DATA:
-            rev_data = FALLBACK_REVENUE_DATA[year]
+        if year in revenue_data:
+            rev_data = revenue_data[year]
             
             # Sum Direct Taxes
             if "Direct Taxes" in rev_data:
@@ -777,38 +1626,28 @@ def get_budget_trend():
             "expenditure": round(expenditure / 100000, 2) # Convert to Lakh Crores for Chart
         })
         
-    return {
+    response = {
         "trend": trend_data,
         "currency": "Lakh Crores INR"
     }
+    if live:
+        response["sources"] = sources
+    return response
 
 @app.get("/budget/ministries")
-def get_all_ministries(year: str = "2026"):
+def get_all_ministries(year: str = "2026", fields: Optional[str] = None,
+                       limit: Optional[int] = None, cursor: Optional[str] = None):
     """Get budget allocation for all ministries for a specific year - with live API fetching"""
     # Try to fetch live data from API, fallback to static data if unavailable
-    budget_data = get_cached_or_fetch("budget", year, fetch_union_budget_data)
+    # Precomputed per refresh, already sorted by allocation
+    ministries = get_cached_entry("budget", year, fetch_union_budget_data).aggregates["ministries"]
     
-    ministries = []
-    for ministry, data in budget_data.items():
-        utilization = (data["spent"] / data["allocation"]) * 100
-        ministries.append({
-            "ministry": ministry,
-            "allocation": data["allocation"],
-            "spent": data["spent"],
-            "balance": data["allocation"] - data["spent"],
-            "utilization_percentage": round(utilization, 2),
-            "category": data["category"]
-        })
-    
-    # Sort by allocation
-    ministries.sort(key=lambda x: x["allocation"], reverse=True)
-    
-    return {
+    return shape_response({
         "financial_year": f"{int(year)-1}-{year[2:]}",
         "total_ministries": len(ministries),
         "ministries": ministries,
         "data_source": "Live API + Official Fallback Data"
-    }
+    }, "ministries", fields=fields, limit=limit, cursor=cursor)
 
 @app.get("/budget/ministry/{ministry_name}")
 def get_ministry_budget(ministry_name: str, year: str = "2026"):
@@ -869,21 +1708,107 @@ def get_budget_by_category(category: str, year: str = "2026"):
         "data_source": "Live API + Official Fallback Data"
     }
 
+# ==================== BUDGET SIMULATION ====================
+# "What if Defence gets +10%": scenarios run as one NumPy pass over the year's ministry vector,
+# which is built once per cache refresh. Size limits keep a single request's latency bounded.
+
+SIMULATE_MAX_SCENARIOS = int(os.getenv("SIMULATE_MAX_SCENARIOS", "50"))
+SIMULATE_MAX_SAMPLES = int(os.getenv("SIMULATE_MAX_SAMPLES", "10000"))
+SIMULATE_MAX_CELLS = int(os.getenv("SIMULATE_MAX_CELLS", "1000000"))     # scenarios x samples x ministries
+
+def run_budget_simulation(year: str, scenarios: List[tuple], fixed_total: bool,
+                          samples: int, sd: float, seed: Optional[int]) -> dict:
+    """scenarios: (name, [shift spec, ...]) pairs"""
+    if not scenarios:
+        raise HTTPException(status_code=400, detail="At least one scenario with shifts is required")
+    if len(scenarios) > SIMULATE_MAX_SCENARIOS:
+        raise HTTPException(status_code=400, detail=f"At most {SIMULATE_MAX_SCENARIOS} scenarios per request")
+    if not 0 <= samples <= SIMULATE_MAX_SAMPLES:
+        raise HTTPException(status_code=400, detail=f"samples must be between 0 and {SIMULATE_MAX_SAMPLES}")
+    if not math.isfinite(sd):
+        raise HTTPException(status_code=400, detail="sd must be a finite number")
+    
+    entry = get_cached_entry("budget", year, fetch_union_budget_data)
+    vector = entry.aggregates["vector"]
+    started = time.perf_counter()
+    try:
+        shifts = [[shift_from_spec(spec) for spec in specs] for _, specs in scenarios]
+        result = simulate(vector, shifts, fixed_total=fixed_total, samples=samples,
+                          default_sd=sd, seed=seed, max_cells=SIMULATE_MAX_CELLS)
+        summary = summarize(vector, result, [name for name, _ in scenarios], samples=samples)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return {
+        "financial_year": f"{int(year)-1}-{year[2:]}",
+        "fixed_total": fixed_total,
+        "monte_carlo": {"samples": samples, "default_sd": sd, "seed": seed} if samples else None,
+        "currency": "INR Crores",
+        "scenarios": summary,
+        "compute_ms": round((time.perf_counter() - started) * 1000, 2),
+        "data_source": entry.source
+    }
+
+@app.get("/budget/simulate")
+def simulate_budget(shift: List[str] = Query(..., description="e.g. Defence:+10%, Railways:-5000, category:Healthcare:+5%±2"),
+                    year: str = "2026", fixed_total: bool = True, samples: int = 0,
+                    sd: float = 0.0, seed: Optional[int] = None):
+    """
+    Reallocate one year's budget: ?shift=Defence:+10%&shift=category:Healthcare:-5000
+    
+    With fixed_total (default) the net change is taken proportionally from the ministries that
+    were not shifted. samples>0 runs a Monte Carlo sensitivity analysis (sd per shift via ±,
+    or the sd parameter) and returns p5/p50/p95 bands.
+    """
+    return run_budget_simulation(year, [("scenario", shift)], fixed_total, samples, sd, seed)
+
+@app.post("/budget/simulate")
+def simulate_budget_batch(payload: dict = Body(..., examples=[{
+    "year": "2026",
+    "fixed_total": True,
+    "scenarios": [
+        {"name": "Defence +10%", "shifts": ["Defence:+10%"]},
+        {"name": "Health push", "shifts": [{"category": "Healthcare", "percent": 15, "sd": 3}]}
+    ],
+    "samples": 0
+}])):
+    """Batch of named scenarios (optionally each with Monte Carlo samples) in one vectorized run"""
+    scenarios = payload.get("scenarios")
+    if not isinstance(scenarios, list):
+        raise HTTPException(status_code=400, detail="'scenarios' must be a list of {name, shifts}")
+    parsed = []
+    for i, scenario in enumerate(scenarios):
+        if not isinstance(scenario, dict) or not isinstance(scenario.get("shifts"), list):
+            raise HTTPException(status_code=400, detail=f"Scenario {i} needs a 'shifts' list")
+        parsed.append((str(scenario.get("name") or f"scenario_{i + 1}"), scenario["shifts"]))
+    try:
+        samples = int(payload.get("samples", 0))
+        sd = float(payload.get("sd", 0.0))
+        seed = int(payload["seed"]) if payload.get("seed") is not None else None
+    except (TypeError, ValueError, OverflowError):
+        raise HTTPException(status_code=400, detail="samples, sd and seed must be numbers")
+    fixed_total = payload.get("fixed_total", True)
+    if not isinstance(fixed_total, bool):
+        # bool("false") is True: only accept real JSON booleans
+        raise HTTPException(status_code=400, detail="'fixed_total' must be true or false")
+    return run_budget_simulation(str(payload.get("year", "2026")), parsed, fixed_total, samples, sd, seed)
+
 @app.get("/revenue/summary")
-def get_revenue_summary(year: str = "2026"):
+def get_revenue_summary(year: str = "2026", include: Optional[str] = None):
     """Get overall revenue summary for a specific year - with live API fetching"""
     # Try to fetch live data from API, fallback to static data if unavailable
-    revenue_data = get_cached_or_fetch("revenue", year, fetch_union_budget_data)
+    entry = get_cached_entry("revenue", year, fetch_union_budget_data)
+    revenue_data, totals = entry.data, entry.aggregates
     
-    total_direct = sum(revenue_data["Direct Taxes"].values())
-    total_indirect = sum(revenue_data["Indirect Taxes"].values())
-    total_non_tax = sum(revenue_data["Non-Tax Revenue"].values())
-    total_capital = sum(revenue_data["Capital Receipts"].values())
+    total_direct = totals["Direct Taxes"]
+    total_indirect = totals["Indirect Taxes"]
+    total_non_tax = totals["Non-Tax Revenue"]
+    total_capital = totals["Capital Receipts"]
     
     total_revenue = total_direct + total_indirect + total_non_tax
     total_receipts = total_revenue + total_capital
     
-    return {
+    return shape_response({
         "financial_year": f"{int(year)-1}-{year[2:]}",
         "total_revenue": total_revenue,
         "total_receipts": total_receipts,
@@ -899,7 +1824,7 @@ def get_revenue_summary(year: str = "2026"):
         },
         "details": revenue_data,
         "data_source": "Live API + Official Fallback Data"
-    }
+    }, include=include, optional=("details",))
 
 @app.get("/revenue/taxes")
 def get_tax_details(year: str = "2026"):
@@ -938,33 +1863,22 @@ def get_economic_indicators(year: str = "2026"):
     }
 
 @app.get("/states/budgets")
-def get_all_state_budgets(year: str = "2026"):
+def get_all_state_budgets(year: str = "2026", fields: Optional[str] = None,
+                          limit: Optional[int] = None, cursor: Optional[str] = None):
     """Get budget allocations for all states and union territories for a specific year - with live API fetching"""
     # Try to fetch live data from API, fallback to static data if unavailable
-    state_budgets = get_cached_or_fetch("states", year, fetch_union_budget_data)
-    
-    states = []
-    for state, data in state_budgets.items():
-        states.append({
-            "state": state,
-            "budget": data["budget"],
-            "per_capita_budget": data["per_capita"],
-            "population_crore": data["population_cr"],
-            "gdp_growth_rate": data["gdp_growth"],
-            "currency": "INR Crores (total), INR (per capita)"
-        })
-    
-    states.sort(key=lambda x: x["budget"], reverse=True)
+    # Precomputed per refresh, already sorted by budget
+    aggregates = get_cached_entry("states", year, fetch_union_budget_data).aggregates
+    states = aggregates["states"]
+    total_budget = aggregates["total_budget"]
     
-    total_budget = sum(s["budget"] for s in states)
-    
-    return {
+    return shape_response({
         "financial_year": f"{int(year)-1}-{year[2:]}",
         "total_states_uts": len(states),
         "total_combined_budget": total_budget,
         "states": states,
         "data_source": "Live API + Official Fallback Data"
-    }
+    }, "states", fields=fields, limit=limit, cursor=cursor)
 
 # State-specific Sector Priorities (Creative Data)
 STATE_PRIORITIES = {
@@ -990,7 +1904,7 @@ def generate_state_allocation(state_name: str, total_budget_cr: float) -> List[d
     }
     
     # Apply state specific overrides
-    for key, overrides in STATE_PRIORITIES.items():
+    for key, overrides in datasets.get("STATE_PRIORITIES").items():
         if key.lower() in state_name.lower():
             base.update(overrides)
             # Adjust 'Others' to ensure 100%
@@ -1035,7 +1949,7 @@ def get_state_budget(state_name: str, year: str = "2026"):
         
         if not state_budgets:
             # Emergency fallback if everything fails
-            state_budgets = FALLBACK_STATE_BUDGETS.get(year, FALLBACK_STATE_BUDGETS["2025"])
+            state_budgets = get_fallback_data("states", year)
 
         matched_data = None
         matched_name = state
@@ -1069,9 +1983,7 @@ def get_state_budget(state_name: str, year: str = "2026"):
         
         raise HTTPException(status_code=404, detail=f"State/UT '{state}' not found. Available states: {', '.join(list(state_budgets.keys())[:5])}...")
     except Exception as e:
-        logger.error(f"Error in get_state_budget: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.error(f"Error in get_state_budget: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 # State-wise Sector Allocation (Average spending pattern %) - for Pie Chart
@@ -1113,7 +2025,7 @@ def get_state_gst_collection():
     # In a real scenario, this would filter based on year
     return {
         "status": "success",
-        "data": FALLBACK_STATE_TAX_DATA,
+        "data": datasets.get("FALLBACK_STATE_TAX_DATA"),
         "year": "2025-26",
         "unit": "Thousand Crores ₹"
     }
@@ -1123,7 +2035,7 @@ def get_welfare_spending():
     """Get Welfare Spending Trend Data"""
     return {
         "status": "success",
-        "data": FALLBACK_WELFARE_DATA,
+        "data": datasets.get("FALLBACK_WELFARE_DATA"),
         "unit": "Crores ₹"
     }
 
@@ -1132,7 +2044,7 @@ def get_state_sector_allocation():
     """Get average sector-wise budget allocation for States"""
     return {
          "status": "success",
-        "data": FALLBACK_STATE_SECTOR_ALLOCATION,
+        "data": datasets.get("FALLBACK_STATE_SECTOR_ALLOCATION"),
         "description": "Average spending pattern of major Indian states"
     }
 
@@ -1262,15 +2174,309 @@ def compare_states(states: str, year: str = "2026"):
         "comparison": comparison
     }
 
+@app.get("/changes")
+def get_changes(since: int = 0, dataset: Optional[str] = None, limit: int = 1000):
+    """
+    Record-level changes to cached datasets after version `since`.
+    Poll with the returned next_since; when reset is true the log no longer reaches back
+    that far and the client should refetch its datasets in full.
+    """
+    if limit < 1 or limit > 5000:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 5000")
+    result = change_feed.since(since, dataset=dataset, limit=limit)
+    result["datasets"] = dict(change_feed.dataset_versions)
+    return result
+
+@app.get("/events")
+async def stream_events(request: Request):
+    """
+    Server-Sent Events stream of data refreshes: event 'refresh' with {dataset, year, version}.
+    Clients refetch only the datasets named in an event instead of polling every endpoint.
+    """
+    if event_broadcaster.is_full():
+        raise HTTPException(status_code=503, detail="Too many event stream clients, retry later")
+    return StreamingResponse(
+        event_broadcaster.stream(
+            request.headers.get("last-event-id"),
+            hello={"version": change_feed.version, "datasets": dict(change_feed.dataset_versions)}
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/health")
 def health_check():
     """Health check endpoint"""
     return {
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
-        "service": "Government & Finance Data API"
+        "service": "Government & Finance Data API",
+        "admission": admission.status()
+    }
+
+# ==================== CACHE ADMINISTRATION ====================
+# Authenticated with the X-Admin-Key header; disabled unless ADMIN_API_KEY is set.
+
+ADMIN_API_KEY = os.getenv("ADMIN_API_KEY", "")
+
+# Fetcher used to (re)build each cached dataset type
+DATASET_FETCHERS = {
+    "budget": fetch_union_budget_data,
+    "revenue": fetch_union_budget_data,
+    "states": fetch_union_budget_data,
+    "indicators": fetch_union_budget_data,
+}
+
+def require_admin(x_admin_key: Optional[str] = Header(None)):
+    if not ADMIN_API_KEY:
+        raise HTTPException(status_code=503, detail="Admin API disabled: set ADMIN_API_KEY")
+    if not x_admin_key or not hmac.compare_digest(x_admin_key, ADMIN_API_KEY):
+        raise HTTPException(status_code=401, detail="Invalid or missing X-Admin-Key")
+
+def split_cache_key(cache_key: str) -> tuple:
+    """'budget_2026' -> ('budget', '2026'), validating the dataset type"""
+    data_type, _, year = cache_key.rpartition("_")
+    if data_type not in DATASET_FETCHERS or not year.isdigit():
+        raise HTTPException(status_code=400, detail=f"Invalid cache key '{cache_key}'. Expected <{'|'.join(DATASET_FETCHERS)}>_<year>")
+    return data_type, year
+
+def warm_cache_keys(keys: List[str]) -> dict:
+    """Force a concurrent refresh of the keys; returns {key: source}"""
+    jobs = []
+    for key in keys:
+        data_type, year = split_cache_key(key)
+        jobs.append((data_type, year, DATASET_FETCHERS[data_type]))
+    entries = refresh_cache_entries(jobs)
+    return {key: entries[key].source for key in keys}
+
+@app.get("/admin/cache", dependencies=[Depends(require_admin)])
+def list_cache_entries():
+    """Every cached key with size, source, age, hit count and last fetch duration"""
+    now = datetime.now()
+    snapshot = cache_store.current
+    with cache_stats_lock:
+        stats = {key: dict(value) for key, value in cache_stats.items()}
+    
+    entries = []
+    for key, entry in sorted(snapshot.entries.items()):
+        key_stats = stats.get(key, {})
+        entries.append({
+            "key": key,
+            "source": entry.source,
+            "version": entry.version,
+            "records": len(entry.data),
+            # default=dict materializes compact record tables/views
+            "size_bytes": len(json.dumps(entry.data, separators=(",", ":"), default=dict)),
+            "fetched_at": entry.fetched_at.isoformat(),
+            "age_seconds": round((now - entry.fetched_at).total_seconds(), 1),
+            "fresh": is_entry_fresh(entry),
+            "hits": key_stats.get("hits", 0),
+            "misses": key_stats.get("misses", 0),
+            "last_fetch_seconds": key_stats.get("last_fetch_seconds")
+        })
+    
+    return {
+        "generation": snapshot.generation,
+        "total_keys": len(entries),
+        "entries": entries,
+        "history": cache_store.history()
+    }
+
+@app.post("/admin/cache/invalidate", dependencies=[Depends(require_admin)])
+def invalidate_cache(pattern: str):
+    """Drop every key matching a glob (e.g. budget_*, *_2026); the next request refetches"""
+    keys = [key for key in cache_store.current.entries if fnmatch.fnmatchcase(key, pattern)]
+    removed = cache_store.remove(keys)
+    logger.info(f"🧹 Invalidated {removed} cache keys matching '{pattern}'")
+    return {"pattern": pattern, "invalidated": keys}
+
+@app.post("/admin/cache/warm", dependencies=[Depends(require_admin)])
+def warm_cache(keys: str, background_tasks: BackgroundTasks, background: bool = False):
+    """Force-refresh comma-separated keys (budget_2026,states_2025), synchronously or in the background"""
+    key_list = parse_csv_param(keys)
+    for key in key_list:
+        split_cache_key(key)
+    
+    if background:
+        # Runs after the response in the request's context: detach it from the request deadline and span
+        background_tasks.add_task(detach(warm_cache_keys), key_list)
+        return {"status": "scheduled", "keys": key_list}
+    return {"status": "warmed", "results": warm_cache_keys(key_list)}
+
+@app.get("/admin/cache/export", dependencies=[Depends(require_admin)])
+def export_cache():
+    """Dump the current snapshot ({key: {data, source, fetched_at, version}}) for backup or transfer"""
+    snapshot = cache_store.current
+    return {
+        "generation": snapshot.generation,
+        "exported_at": datetime.now().isoformat(),
+        "entries": {key: entry.as_dict() for key, entry in snapshot.entries.items()}
+    }
+
+@app.post("/admin/cache/import", dependencies=[Depends(require_admin)])
+def import_cache(payload: dict = Body(...)):
+    """Load entries produced by /admin/cache/export (versions and change log are re-stamped)"""
+    entries = payload.get("entries")
+    if not isinstance(entries, dict):
+        raise HTTPException(status_code=400, detail="Body must be an export document with an 'entries' object")
+    
+    items = []
+    for key, item in entries.items():
+        data_type, year = split_cache_key(key)
+        try:
+            # Built (and so validated) before anything is published
+            frozen, aggregates = prepare_cache_data(data_type, item["data"])
+            items.append((data_type, year, frozen, aggregates, item.get("source", "FALLBACK"),
+                          datetime.fromisoformat(item["fetched_at"])))
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            raise HTTPException(status_code=400, detail=f"Invalid entry '{key}': {type(e).__name__}: {str(e)}")
+    
+    # Published in one swap: an import is never half-applied
+    imported = list(publish_prepared_entries(items)) if items else []
+    logger.info(f"📥 Imported {len(imported)} cache entries")
+    return {"imported": imported}
+
+@app.post("/admin/cache/rollback", dependencies=[Depends(require_admin)])
+def rollback_cache(steps: int = 1):
+    """Restore the cache as it was `steps` publishes ago (changes go through the change feed)"""
+    try:
+        target = cache_store.previous(steps)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # One swap for the whole restore: per-key publishes would push the target out of the
+    # history and let readers see a half-restored mix
+    current = cache_store.current.entries
+    builders = {}
+    changed = []
+    for key, entry in target.entries.items():
+        if current.get(key) is not entry:
+            data_type, year = split_cache_key(key)
+            builders[key] = change_logged_builder(data_type, year, entry.data, entry.aggregates,
+                                                  entry.source, entry.fetched_at, changed)
+    removed = [key for key in current if key not in target.entries]
+    if builders or removed:
+        publish_cache_entries(builders, changed, remove=removed)
+    return {"rolled_back_to": target.generation, "restored": list(builders), "removed": removed}
+
+@app.get("/admin/upstreams", dependencies=[Depends(require_admin)])
+def upstream_latency():
+    """Observed latency percentiles and the current adaptive timeout per upstream"""
+    return {
+        "percentile": UPSTREAM_TIMEOUT_PERCENTILE,
+        "multiplier": UPSTREAM_TIMEOUT_MULTIPLIER,
+        "clamp": [UPSTREAM_TIMEOUT_MIN, UPSTREAM_TIMEOUT_MAX],
+        "upstreams": upstream_timeouts.snapshot(UPSTREAM_DEFAULT_TIMEOUTS)
+    }
+
+@app.get("/admin/prefetch", dependencies=[Depends(require_admin)])
+def prefetch_status():
+    """Learned route transitions and background warm-up counters (budget use, useful hits)"""
+    return {
+        "enabled": PREFETCH_ENABLED,
+        "min_probability": PREFETCH_MIN_PROBABILITY,
+        "max_keys": PREFETCH_MAX_KEYS,
+        "prefetcher": prefetcher.status(),
+        "transitions": transition_model.snapshot()
+    }
+
+@app.get("/admin/logging", dependencies=[Depends(require_admin)])
+def logging_status():
+    """Log queue depth, records dropped on overflow and hot-path sample rates"""
+    return {
+        "level": LOG_LEVEL,
+        "format": LOG_FORMAT,
+        "access_log": ACCESS_LOG_ENABLED,
+        **log_pipeline.status(),
+        "traffic_capture": traffic_recorder.status() if traffic_recorder else None
+    }
+
+@app.get("/admin/tracing", dependencies=[Depends(require_admin)])
+def tracing_status():
+    """Trace sampling and exporter counters (exported, dropped on overflow, failed exports)"""
+    return tracer.status()
+
+@app.get("/admin/datasets", dependencies=[Depends(require_admin)])
+def dataset_status():
+    """Where each reference table is served from (file or builtin) and its version"""
+    return {"directory": DATASET_DIR, "datasets": datasets.status()}
+
+@app.post("/admin/datasets/reload", dependencies=[Depends(require_admin)])
+def reload_datasets(name: Optional[str] = None):
+    """Re-check data files now instead of waiting for the next poll"""
+    if name and name not in DATASET_NAMES:
+        raise HTTPException(status_code=404, detail=f"Unknown dataset '{name}'")
+    datasets.reload(name)
+    for dataset in ([name] if name else DATASET_NAMES):
+        datasets.get(dataset)
+    return {"directory": DATASET_DIR, "datasets": datasets.status()}
+
+# ==================== MEMORY PROFILING ====================
+
+memory_profiler = MemoryProfiler()
+
+def dataset_tables() -> Dict[str, object]:
+    """Reference tables (FALLBACK_*, UNION_BUDGET_TOTALS, ...) as currently served"""
+    return {name: datasets.get(name) for name in DATASET_NAMES}
+
+@app.get("/admin/memory", dependencies=[Depends(require_admin)])
+def memory_overview():
+    """Worker RSS plus the deep size of every cache key and every fallback/static dataset"""
+    # One seen-set per section: objects shared between keys are attributed to the first one
+    seen = set()
+    cache_sizes = {
+        key: deep_sizeof(entry, seen)
+        for key, entry in sorted(cache_store.current.entries.items())
+    }
+    seen = set()
+    dataset_sizes = dict(sorted(
+        ((name, deep_sizeof(value, seen)) for name, value in dataset_tables().items()),
+        key=lambda item: item[1], reverse=True
+    ))
+    # Raw datasets as stored (compact record tables) vs. the same data as plain dicts
+    entries = list(cache_store.current.entries.values())
+    data_bytes = deep_sizeof([entry.data for entry in entries])
+    plain_bytes = deep_sizeof([to_plain(entry.data) for entry in entries])
+    return {
+        "pid": os.getpid(),
+        "process": process_rss_bytes(),
+        "tracemalloc": memory_profiler.status(),
+        "cache": {
+            "total_bytes": sum(cache_sizes.values()),
+            "data_bytes": data_bytes,
+            "data_plain_dict_bytes": plain_bytes,
+            "history_snapshots": len(cache_store.history()),
+            "keys": cache_sizes
+        },
+        "datasets": {
+            "total_bytes": sum(dataset_sizes.values()),
+            "tables": dataset_sizes
+        }
     }
 
+@app.post("/admin/memory/tracemalloc/start", dependencies=[Depends(require_admin)])
+def start_tracemalloc(frames: int = 1):
+    """Start tracing allocations (costs CPU and memory while on; stop it when done)"""
+    if not 1 <= frames <= 25:
+        raise HTTPException(status_code=400, detail="frames must be between 1 and 25")
+    memory_profiler.start(frames)
+    return memory_profiler.status()
+
+@app.post("/admin/memory/tracemalloc/stop", dependencies=[Depends(require_admin)])
+def stop_tracemalloc():
+    memory_profiler.stop()
+    return memory_profiler.status()
+
+@app.get("/admin/memory/snapshot", dependencies=[Depends(require_admin)])
+def memory_snapshot(limit: int = 20, group_by: str = "lineno"):
+    """Top allocation sites, and growth since the previous snapshot call (leak hunting)"""
+    try:
+        return memory_profiler.snapshot(limit=max(1, min(limit, 200)), group_by=group_by)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
 # ==================== CITIZEN ECONOMY ENDPOINTS ====================
 
 @app.get("/economy/stats")
@@ -1598,60 +2804,62 @@ def get_sector_wise_salary_by_state():
         "source": "Ministry of Labour & Employment 2024-25"
     }
 
+SKILL_DEMAND_HEATMAP = [
+    # Healthcare Sector
+    { "sector": "Healthcare", "skill": "Neurosurgeon", "demand": "High", "salary_min": 25, "salary_max": 80, "demand_score": 85, "color": "#ef4444" },
+    { "sector": "Healthcare", "skill": "Cardiologist", "demand": "Very High", "salary_min": 22, "salary_max": 75, "demand_score": 92, "color": "#dc2626" },
+    { "sector": "Healthcare", "skill": "Radiologist", "demand": "High", "salary_min": 18, "salary_max": 55, "demand_score": 88, "color": "#ef4444" },
+    { "sector": "Healthcare", "skill": "General Physician", "demand": "Moderate", "salary_min": 8, "salary_max": 25, "demand_score": 70, "color": "#f87171" },
+    { "sector": "Healthcare", "skill": "Nurse (Staff)", "demand": "Very High", "salary_min": 3, "salary_max": 8, "demand_score": 95, "color": "#dc2626" },
+    
+    # IT & Tech Sector
+    { "sector": "IT & Tech", "skill": "Machine Learning Engineer", "demand": "Very High", "salary_min": 20, "salary_max": 55, "demand_score": 98, "color": "#dc2626" },
+    { "sector": "IT & Tech", "skill": "Cloud Architect (AWS/Azure)", "demand": "Very High", "salary_min": 18, "salary_max": 45, "demand_score": 96, "color": "#dc2626" },
+    { "sector": "IT & Tech", "skill": "Full Stack Developer", "demand": "High", "salary_min": 12, "salary_max": 35, "demand_score": 90, "color": "#ef4444" },
+    { "sector": "IT & Tech", "skill": "Data Engineer", "demand": "High", "salary_min": 15, "salary_max": 40, "demand_score": 89, "color": "#ef4444" },
+    { "sector": "IT & Tech", "skill": "Cybersecurity Analyst", "demand": "High", "salary_min": 10, "salary_max": 30, "demand_score": 87, "color": "#ef4444" },
+    { "sector": "IT & Tech", "skill": "DevOps Engineer", "demand": "High", "salary_min": 12, "salary_max": 32, "demand_score": 86, "color": "#ef4444" },
+    { "sector": "IT & Tech", "skill": "UI/UX Designer", "demand": "Moderate", "salary_min": 6, "salary_max": 20, "demand_score": 72, "color": "#f87171" },
+    
+    # Manufacturing Sector
+    { "sector": "Manufacturing", "skill": "Industrial Automation Engineer", "demand": "High", "salary_min": 10, "salary_max": 25, "demand_score": 83, "color": "#ef4444" },
+    { "sector": "Manufacturing", "skill": "Production Manager", "demand": "Moderate", "salary_min": 8, "salary_max": 20, "demand_score": 75, "color": "#f87171" },
+    { "sector": "Manufacturing", "skill": "Quality Control Engineer", "demand": "Moderate", "salary_min": 6, "salary_max": 15, "demand_score": 68, "color": "#f87171" },
+    { "sector": "Manufacturing", "skill": "Supply Chain Manager", "demand": "High", "salary_min": 9, "salary_max": 22, "demand_score": 80, "color": "#ef4444" },
+    
+    # Finance Sector
+    { "sector": "Finance", "skill": "Investment Banker", "demand": "Moderate", "salary_min": 15, "salary_max": 60, "demand_score": 74, "color": "#f87171" },
+    { "sector": "Finance", "skill": "Financial Analyst", "demand": "High", "salary_min": 8, "salary_max": 25, "demand_score": 82, "color": "#ef4444" },
+    { "sector": "Finance", "skill": "Chartered Accountant", "demand": "High", "salary_min": 10, "salary_max": 35, "demand_score": 85, "color": "#ef4444" },
+    { "sector": "Finance", "skill": "Risk Manager", "demand": "Moderate", "salary_min": 9, "salary_max": 22, "demand_score": 71, "color": "#f87171" },
+    
+    # Education Sector
+    { "sector": "Education", "skill": "University Professor", "demand": "Moderate", "salary_min": 8, "salary_max": 25, "demand_score": 65, "color": "#fca5a5" },
+    { "sector": "Education", "skill": "School Principal", "demand": "Moderate", "salary_min": 7, "salary_max": 18, "demand_score": 62, "color": "#fca5a5" },
+    { "sector": "Education", "skill": "Primary Teacher", "demand": "High", "salary_min": 3, "salary_max": 10, "demand_score": 78, "color": "#f87171" },
+    { "sector": "Education", "skill": "Educational Counselor", "demand": "Low", "salary_min": 4, "salary_max": 12, "demand_score": 55, "color": "#fecaca" },
+    
+    # Agriculture Sector
+    { "sector": "Agriculture", "skill": "Agricultural Scientist", "demand": "Moderate", "salary_min": 6, "salary_max": 18, "demand_score": 60, "color": "#fca5a5" },
+    { "sector": "Agriculture", "skill": "Farm Manager", "demand": "Moderate", "salary_min": 4, "salary_max": 12, "demand_score": 58, "color": "#fca5a5" },
+    { "sector": "Agriculture", "skill": "Agritech Specialist", "demand": "High", "salary_min": 8, "salary_max": 20, "demand_score": 76, "color": "#f87171" },
+    
+    # Construction Sector
+    { "sector": "Construction", "skill": "Civil Engineer", "demand": "High", "salary_min": 6, "salary_max": 18, "demand_score": 81, "color": "#ef4444" },
+    { "sector": "Construction", "skill": "Architect", "demand": "Moderate", "salary_min": 7, "salary_max": 22, "demand_score": 70, "color": "#f87171" },
+    { "sector": "Construction", "skill": "Site Manager", "demand": "High", "salary_min": 5, "salary_max": 15, "demand_score": 79, "color": "#f87171" },
+    
+    # Retail Sector
+    { "sector": "Retail", "skill": "Store Manager", "demand": "Moderate", "salary_min": 4, "salary_max": 10, "demand_score": 66, "color": "#fca5a5" },
+    { "sector": "Retail", "skill": "E-commerce Manager", "demand": "High", "salary_min": 7, "salary_max": 18, "demand_score": 84, "color": "#ef4444" },
+    { "sector": "Retail", "skill": "Supply Chain Analyst", "demand": "Moderate", "salary_min": 5, "salary_max": 14, "demand_score": 69, "color": "#f87171" }
+]
+
 @app.get("/salary/skill-demand-heatmap")
 def get_skill_demand_heatmap():
     """Skill Demand vs. Salary Heatmap Across All Sectors"""
     return {
-        "data": [
-            # Healthcare Sector
-            { "sector": "Healthcare", "skill": "Neurosurgeon", "demand": "High", "salary_min": 25, "salary_max": 80, "demand_score": 85, "color": "#ef4444" },
-            { "sector": "Healthcare", "skill": "Cardiologist", "demand": "Very High", "salary_min": 22, "salary_max": 75, "demand_score": 92, "color": "#dc2626" },
-            { "sector": "Healthcare", "skill": "Radiologist", "demand": "High", "salary_min": 18, "salary_max": 55, "demand_score": 88, "color": "#ef4444" },
-            { "sector": "Healthcare", "skill": "General Physician", "demand": "Moderate", "salary_min": 8, "salary_max": 25, "demand_score": 70, "color": "#f87171" },
-            { "sector": "Healthcare", "skill": "Nurse (Staff)", "demand": "Very High", "salary_min": 3, "salary_max": 8, "demand_score": 95, "color": "#dc2626" },
-            
-            # IT & Tech Sector
-            { "sector": "IT & Tech", "skill": "Machine Learning Engineer", "demand": "Very High", "salary_min": 20, "salary_max": 55, "demand_score": 98, "color": "#dc2626" },
-            { "sector": "IT & Tech", "skill": "Cloud Architect (AWS/Azure)", "demand": "Very High", "salary_min": 18, "salary_max": 45, "demand_score": 96, "color": "#dc2626" },
-            { "sector": "IT & Tech", "skill": "Full Stack Developer", "demand": "High", "salary_min": 12, "salary_max": 35, "demand_score": 90, "color": "#ef4444" },
-            { "sector": "IT & Tech", "skill": "Data Engineer", "demand": "High", "salary_min": 15, "salary_max": 40, "demand_score": 89, "color": "#ef4444" },
-            { "sector": "IT & Tech", "skill": "Cybersecurity Analyst", "demand": "High", "salary_min": 10, "salary_max": 30, "demand_score": 87, "color": "#ef4444" },
-            { "sector": "IT & Tech", "skill": "DevOps Engineer", "demand": "High", "salary_min": 12, "salary_max": 32, "demand_score": 86, "color": "#ef4444" },
-            { "sector": "IT & Tech", "skill": "UI/UX Designer", "demand": "Moderate", "salary_min": 6, "salary_max": 20, "demand_score": 72, "color": "#f87171" },
-            
-            # Manufacturing Sector
-            { "sector": "Manufacturing", "skill": "Industrial Automation Engineer", "demand": "High", "salary_min": 10, "salary_max": 25, "demand_score": 83, "color": "#ef4444" },
-            { "sector": "Manufacturing", "skill": "Production Manager", "demand": "Moderate", "salary_min": 8, "salary_max": 20, "demand_score": 75, "color": "#f87171" },
-            { "sector": "Manufacturing", "skill": "Quality Control Engineer", "demand": "Moderate", "salary_min": 6, "salary_max": 15, "demand_score": 68, "color": "#f87171" },
-            { "sector": "Manufacturing", "skill": "Supply Chain Manager", "demand": "High", "salary_min": 9, "salary_max": 22, "demand_score": 80, "color": "#ef4444" },
-            
-            # Finance Sector
-            { "sector": "Finance", "skill": "Investment Banker", "demand": "Moderate", "salary_min": 15, "salary_max": 60, "demand_score": 74, "color": "#f87171" },
-            { "sector": "Finance", "skill": "Financial Analyst", "demand": "High", "salary_min": 8, "salary_max": 25, "demand_score": 82, "color": "#ef4444" },
-            { "sector": "Finance", "skill": "Chartered Accountant", "demand": "High", "salary_min": 10, "salary_max": 35, "demand_score": 85, "color": "#ef4444" },
-            { "sector": "Finance", "skill": "Risk Manager", "demand": "Moderate", "salary_min": 9, "salary_max": 22, "demand_score": 71, "color": "#f87171" },
-            
-            # Education Sector
-            { "sector": "Education", "skill": "University Professor", "demand": "Moderate", "salary_min": 8, "salary_max": 25, "demand_score": 65, "color": "#fca5a5" },
-            { "sector": "Education", "skill": "School Principal", "demand": "Moderate", "salary_min": 7, "salary_max": 18, "demand_score": 62, "color": "#fca5a5" },
-            { "sector": "Education", "skill": "Primary Teacher", "demand": "High", "salary_min": 3, "salary_max": 10, "demand_score": 78, "color": "#f87171" },
-            { "sector": "Education", "skill": "Educational Counselor", "demand": "Low", "salary_min": 4, "salary_max": 12, "demand_score": 55, "color": "#fecaca" },
-            
-            # Agriculture Sector
-            { "sector": "Agriculture", "skill": "Agricultural Scientist", "demand": "Moderate", "salary_min": 6, "salary_max": 18, "demand_score": 60, "color": "#fca5a5" },
-            { "sector": "Agriculture", "skill": "Farm Manager", "demand": "Moderate", "salary_min": 4, "salary_max": 12, "demand_score": 58, "color": "#fca5a5" },
-            { "sector": "Agriculture", "skill": "Agritech Specialist", "demand": "High", "salary_min": 8, "salary_max": 20, "demand_score": 76, "color": "#f87171" },
-            
-            # Construction Sector
-            { "sector": "Construction", "skill": "Civil Engineer", "demand": "High", "salary_min": 6, "salary_max": 18, "demand_score": 81, "color": "#ef4444" },
-            { "sector": "Construction", "skill": "Architect", "demand": "Moderate", "salary_min": 7, "salary_max": 22, "demand_score": 70, "color": "#f87171" },
-            { "sector": "Construction", "skill": "Site Manager", "demand": "High", "salary_min": 5, "salary_max": 15, "demand_score": 79, "color": "#f87171" },
-            
-            # Retail Sector
-            { "sector": "Retail", "skill": "Store Manager", "demand": "Moderate", "salary_min": 4, "salary_max": 10, "demand_score": 66, "color": "#fca5a5" },
-            { "sector": "Retail", "skill": "E-commerce Manager", "demand": "High", "salary_min": 7, "salary_max": 18, "demand_score": 84, "color": "#ef4444" },
-            { "sector": "Retail", "skill": "Supply Chain Analyst", "demand": "Moderate", "salary_min": 5, "salary_max": 14, "demand_score": 69, "color": "#f87171" }
-        ],
+        "data": datasets.get("SKILL_DEMAND_HEATMAP"),
         "sectors": ["Healthcare", "IT & Tech", "Manufacturing", "Finance", "Education", "Agriculture", "Construction", "Retail"],
         "demand_levels": {
             "Very High": { "score_range": "90-100", "color": "#dc2626" },
@@ -1931,23 +3139,25 @@ def get_waste_generation_vs_recycling():
 # COMPARISON DATA ENDPOINTS
 # ============================================
 
+COMPARE_GDP_SERIES = {
+    "India": [2.62, 2.67, 3.18, 3.39, 3.73, 4.11, 4.58],
+    "USA": [20.93, 22.99, 25.46, 26.85, 27.97, 28.78, 29.65],
+    "China": [14.72, 17.73, 17.96, 17.89, 18.54, 19.37, 20.18],
+    "Japan": [5.04, 4.94, 4.23, 4.21, 4.19, 4.28, 4.35],
+    "Germany": [3.85, 4.22, 4.07, 4.12, 4.45, 4.59, 4.72],
+    "UK": [2.76, 3.11, 3.07, 3.34, 3.50, 3.64, 3.79],
+    "France": [2.63, 2.95, 2.78, 2.92, 3.05, 3.18, 3.29],
+    "Brazil": [1.44, 1.60, 1.92, 2.13, 2.33, 2.48, 2.61],
+    "Russia": [1.48, 1.77, 2.24, 2.06, 2.24, 2.45, 2.58],
+    "Canada": [1.64, 2.02, 2.14, 2.14, 2.24, 2.35, 2.47],
+    "Australia": [1.32, 1.54, 1.68, 1.69, 1.78, 1.87, 1.95],
+    "South Korea": [1.63, 1.81, 1.67, 1.71, 1.76, 1.84, 1.93]
+}
+
 @app.get("/compare/gdp")
 async def get_gdp_comparison():
     """Get GDP comparison data for multiple countries (2020-2026)"""
-    countries_data = {
-        "India": [2.62, 2.67, 3.18, 3.39, 3.73, 4.11, 4.58],
-        "USA": [20.93, 22.99, 25.46, 26.85, 27.97, 28.78, 29.65],
-        "China": [14.72, 17.73, 17.96, 17.89, 18.54, 19.37, 20.18],
-        "Japan": [5.04, 4.94, 4.23, 4.21, 4.19, 4.28, 4.35],
-        "Germany": [3.85, 4.22, 4.07, 4.12, 4.45, 4.59, 4.72],
-        "UK": [2.76, 3.11, 3.07, 3.34, 3.50, 3.64, 3.79],
-        "France": [2.63, 2.95, 2.78, 2.92, 3.05, 3.18, 3.29],
-        "Brazil": [1.44, 1.60, 1.92, 2.13, 2.33, 2.48, 2.61],
-        "Russia": [1.48, 1.77, 2.24, 2.06, 2.24, 2.45, 2.58],
-        "Canada": [1.64, 2.02, 2.14, 2.14, 2.24, 2.35, 2.47],
-        "Australia": [1.32, 1.54, 1.68, 1.69, 1.78, 1.87, 1.95],
-        "South Korea": [1.63, 1.81, 1.67, 1.71, 1.76, 1.84, 1.93]
-    }
+    countries_data = datasets.get("COMPARE_GDP_SERIES")
     
     years = [2020, 2021, 2022, 2023, 2024, 2025, 2026]
     
@@ -1959,93 +3169,99 @@ async def get_gdp_comparison():
         "source": "IMF World Economic Outlook 2024-2026"
     }
 
+COMPARE_GDP_COMPOSITION = {
+    "India": {
+        "agriculture": 17.8,
+        "industry": 25.9,
+        "services": 56.3
+    },
+    "USA": {
+        "agriculture": 0.9,
+        "industry": 18.2,
+        "services": 80.9
+    },
+    "China": {
+        "agriculture": 7.3,
+        "industry": 39.5,
+        "services": 53.2
+    },
+    "Japan": {
+        "agriculture": 1.1,
+        "industry": 29.7,
+        "services": 69.2
+    },
+    "Germany": {
+        "agriculture": 0.7,
+        "industry": 27.6,
+        "services": 71.7
+    },
+    "UK": {
+        "agriculture": 0.6,
+        "industry": 17.8,
+        "services": 81.6
+    },
+    "France": {
+        "agriculture": 1.6,
+        "industry": 17.6,
+        "services": 80.8
+    },
+    "Brazil": {
+        "agriculture": 6.6,
+        "industry": 20.7,
+        "services": 72.7
+    },
+    "Russia": {
+        "agriculture": 4.7,
+        "industry": 32.4,
+        "services": 62.9
+    },
+    "Canada": {
+        "agriculture": 1.8,
+        "industry": 26.2,
+        "services": 72.0
+    },
+    "Australia": {
+        "agriculture": 2.4,
+        "industry": 25.6,
+        "services": 72.0
+    },
+    "South Korea": {
+        "agriculture": 2.0,
+        "industry": 33.6,
+        "services": 64.4
+    }
+}
+
 @app.get("/compare/gdp-composition")
 async def get_gdp_composition():
     """Get GDP composition by sector for selected countries"""
     return {
-        "India": {
-            "agriculture": 17.8,
-            "industry": 25.9,
-            "services": 56.3
-        },
-        "USA": {
-            "agriculture": 0.9,
-            "industry": 18.2,
-            "services": 80.9
-        },
-        "China": {
-            "agriculture": 7.3,
-            "industry": 39.5,
-            "services": 53.2
-        },
-        "Japan": {
-            "agriculture": 1.1,
-            "industry": 29.7,
-            "services": 69.2
-        },
-        "Germany": {
-            "agriculture": 0.7,
-            "industry": 27.6,
-            "services": 71.7
-        },
-        "UK": {
-            "agriculture": 0.6,
-            "industry": 17.8,
-            "services": 81.6
-        },
-        "France": {
-            "agriculture": 1.6,
-            "industry": 17.6,
-            "services": 80.8
-        },
-        "Brazil": {
-            "agriculture": 6.6,
-            "industry": 20.7,
-            "services": 72.7
-        },
-        "Russia": {
-            "agriculture": 4.7,
-            "industry": 32.4,
-            "services": 62.9
-        },
-        "Canada": {
-            "agriculture": 1.8,
-            "industry": 26.2,
-            "services": 72.0
-        },
-        "Australia": {
-            "agriculture": 2.4,
-            "industry": 25.6,
-            "services": 72.0
-        },
-        "South Korea": {
-            "agriculture": 2.0,
-            "industry": 33.6,
-            "services": 64.4
-        },
+        **datasets.get("COMPARE_GDP_COMPOSITION"),
         "year": 2025,
         "unit": "Percentage of GDP",
         "updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         "source": "World Bank National Accounts Data 2025"
     }
 
+COMPARE_POPULATION_SERIES = {
+    "India": [1.380, 1.393, 1.406, 1.420, 1.433, 1.446, 1.459],
+    "USA": [0.331, 0.332, 0.333, 0.335, 0.336, 0.338, 0.340],
+    "China": [1.411, 1.413, 1.412, 1.410, 1.408, 1.405, 1.402],
+    "Japan": [0.126, 0.126, 0.125, 0.124, 0.123, 0.123, 0.122],
+    "Germany": [0.083, 0.084, 0.084, 0.084, 0.085, 0.085, 0.085],
+    "UK": [0.068, 0.068, 0.068, 0.069, 0.069, 0.070, 0.070],
+    "France": [0.065, 0.065, 0.066, 0.066, 0.067, 0.067, 0.068],
+    "Brazil": [0.212, 0.214, 0.215, 0.216, 0.217, 0.218, 0.219],
+    "Russia": [0.146, 0.146, 0.145, 0.144, 0.144, 0.143, 0.143],
+    "Canada": [0.038, 0.038, 0.039, 0.039, 0.040, 0.041, 0.041],
+    "Australia": [0.026, 0.026, 0.026, 0.027, 0.027, 0.027, 0.028],
+    "South Korea": [0.052, 0.052, 0.052, 0.051, 0.051, 0.051, 0.051]
+}
+
 @app.get("/compare/population")
 async def get_population_trend():
     """Get population trend data for multiple countries (2020-2026)"""
-    countries_data = {
-        "India": [1.380, 1.393, 1.406, 1.420, 1.433, 1.446, 1.459],
-        "USA": [0.331, 0.332, 0.333, 0.335, 0.336, 0.338, 0.340],
-        "China": [1.411, 1.413, 1.412, 1.410, 1.408, 1.405, 1.402],
-        "Japan": [0.126, 0.126, 0.125, 0.124, 0.123, 0.123, 0.122],
-        "Germany": [0.083, 0.084, 0.084, 0.084, 0.085, 0.085, 0.085],
-        "UK": [0.068, 0.068, 0.068, 0.069, 0.069, 0.070, 0.070],
-        "France": [0.065, 0.065, 0.066, 0.066, 0.067, 0.067, 0.068],
-        "Brazil": [0.212, 0.214, 0.215, 0.216, 0.217, 0.218, 0.219],
-        "Russia": [0.146, 0.146, 0.145, 0.144, 0.144, 0.143, 0.143],
-        "Canada": [0.038, 0.038, 0.039, 0.039, 0.040, 0.041, 0.041],
-        "Australia": [0.026, 0.026, 0.026, 0.027, 0.027, 0.027, 0.028],
-        "South Korea": [0.052, 0.052, 0.052, 0.051, 0.051, 0.051, 0.051]
-    }
+    countries_data = datasets.get("COMPARE_POPULATION_SERIES")
     
     years = [2020, 2021, 2022, 2023, 2024, 2025, 2026]
     
@@ -2057,144 +3273,146 @@ async def get_population_trend():
         "source": "UN World Population Prospects 2024-2026"
     }
 
+COMPARE_SUMMARY_COUNTRIES = {
+    "India": {
+        "gdp_2026": 4.58,
+        "gdp_growth_2026": 6.8,
+        "population_2026": 1.459,
+        "gdp_per_capita_2026": 3139,
+        "unemployment_rate": 7.3,
+        "inflation_rate": 4.8,
+        "life_expectancy": 70.4,
+        "literacy_rate": 77.7,
+        "co2_emissions": 2.7
+    },
+    "USA": {
+        "gdp_2026": 29.65,
+        "gdp_growth_2026": 2.3,
+        "population_2026": 0.340,
+        "gdp_per_capita_2026": 87206,
+        "unemployment_rate": 3.9,
+        "inflation_rate": 2.4,
+        "life_expectancy": 78.9,
+        "literacy_rate": 99.0,
+        "co2_emissions": 14.5
+    },
+    "China": {
+        "gdp_2026": 20.18,
+        "gdp_growth_2026": 4.2,
+        "population_2026": 1.402,
+        "gdp_per_capita_2026": 14394,
+        "unemployment_rate": 5.1,
+        "inflation_rate": 1.8,
+        "life_expectancy": 77.5,
+        "literacy_rate": 97.0,
+        "co2_emissions": 10.7
+    },
+    "Japan": {
+        "gdp_2026": 4.35,
+        "gdp_growth_2026": 1.6,
+        "population_2026": 0.122,
+        "gdp_per_capita_2026": 35656,
+        "unemployment_rate": 2.6,
+        "inflation_rate": 2.2,
+        "life_expectancy": 84.6,
+        "literacy_rate": 99.0,
+        "co2_emissions": 8.9
+    },
+    "Germany": {
+        "gdp_2026": 4.72,
+        "gdp_growth_2026": 2.8,
+        "population_2026": 0.085,
+        "gdp_per_capita_2026": 55529,
+        "unemployment_rate": 3.2,
+        "inflation_rate": 2.6,
+        "life_expectancy": 81.3,
+        "literacy_rate": 99.0,
+        "co2_emissions": 8.1
+    },
+    "UK": {
+        "gdp_2026": 3.79,
+        "gdp_growth_2026": 4.1,
+        "population_2026": 0.070,
+        "gdp_per_capita_2026": 54143,
+        "unemployment_rate": 4.1,
+        "inflation_rate": 2.9,
+        "life_expectancy": 81.4,
+        "literacy_rate": 99.0,
+        "co2_emissions": 5.2
+    },
+    "France": {
+        "gdp_2026": 3.29,
+        "gdp_growth_2026": 3.5,
+        "population_2026": 0.068,
+        "gdp_per_capita_2026": 48382,
+        "unemployment_rate": 7.4,
+        "inflation_rate": 2.5,
+        "life_expectancy": 82.7,
+        "literacy_rate": 99.0,
+        "co2_emissions": 4.3
+    },
+    "Brazil": {
+        "gdp_2026": 2.61,
+        "gdp_growth_2026": 5.2,
+        "population_2026": 0.219,
+        "gdp_per_capita_2026": 11918,
+        "unemployment_rate": 8.9,
+        "inflation_rate": 4.1,
+        "life_expectancy": 76.2,
+        "literacy_rate": 93.2,
+        "co2_emissions": 2.3
+    },
+    "Russia": {
+        "gdp_2026": 2.58,
+        "gdp_growth_2026": 5.3,
+        "population_2026": 0.143,
+        "gdp_per_capita_2026": 18042,
+        "unemployment_rate": 4.4,
+        "inflation_rate": 5.7,
+        "life_expectancy": 72.6,
+        "literacy_rate": 99.7,
+        "co2_emissions": 11.9
+    },
+    "Canada": {
+        "gdp_2026": 2.47,
+        "gdp_growth_2026": 5.1,
+        "population_2026": 0.041,
+        "gdp_per_capita_2026": 60244,
+        "unemployment_rate": 5.7,
+        "inflation_rate": 2.7,
+        "life_expectancy": 82.7,
+        "literacy_rate": 99.0,
+        "co2_emissions": 15.4
+    },
+    "Australia": {
+        "gdp_2026": 1.95,
+        "gdp_growth_2026": 4.3,
+        "population_2026": 0.028,
+        "gdp_per_capita_2026": 69643,
+        "unemployment_rate": 3.8,
+        "inflation_rate": 3.1,
+        "life_expectancy": 83.4,
+        "literacy_rate": 99.0,
+        "co2_emissions": 15.3
+    },
+    "South Korea": {
+        "gdp_2026": 1.93,
+        "gdp_growth_2026": 4.9,
+        "population_2026": 0.051,
+        "gdp_per_capita_2026": 37843,
+        "unemployment_rate": 2.9,
+        "inflation_rate": 2.1,
+        "life_expectancy": 83.6,
+        "literacy_rate": 98.8,
+        "co2_emissions": 11.6
+    }
+}
+
 @app.get("/compare/summary")
 async def get_comparison_summary():
     """Get comprehensive summary data for all countries"""
     return {
-        "countries": {
-            "India": {
-                "gdp_2026": 4.58,
-                "gdp_growth_2026": 6.8,
-                "population_2026": 1.459,
-                "gdp_per_capita_2026": 3139,
-                "unemployment_rate": 7.3,
-                "inflation_rate": 4.8,
-                "life_expectancy": 70.4,
-                "literacy_rate": 77.7,
-                "co2_emissions": 2.7
-            },
-            "USA": {
-                "gdp_2026": 29.65,
-                "gdp_growth_2026": 2.3,
-                "population_2026": 0.340,
-                "gdp_per_capita_2026": 87206,
-                "unemployment_rate": 3.9,
-                "inflation_rate": 2.4,
-                "life_expectancy": 78.9,
-                "literacy_rate": 99.0,
-                "co2_emissions": 14.5
-            },
-            "China": {
-                "gdp_2026": 20.18,
-                "gdp_growth_2026": 4.2,
-                "population_2026": 1.402,
-                "gdp_per_capita_2026": 14394,
-                "unemployment_rate": 5.1,
-                "inflation_rate": 1.8,
-                "life_expectancy": 77.5,
-                "literacy_rate": 97.0,
-                "co2_emissions": 10.7
-            },
-            "Japan": {
-                "gdp_2026": 4.35,
-                "gdp_growth_2026": 1.6,
-                "population_2026": 0.122,
-                "gdp_per_capita_2026": 35656,
-                "unemployment_rate": 2.6,
-                "inflation_rate": 2.2,
-                "life_expectancy": 84.6,
-                "literacy_rate": 99.0,
-                "co2_emissions": 8.9
-            },
-            "Germany": {
-                "gdp_2026": 4.72,
-                "gdp_growth_2026": 2.8,
-                "population_2026": 0.085,
-                "gdp_per_capita_2026": 55529,
-                "unemployment_rate": 3.2,
-                "inflation_rate": 2.6,
-                "life_expectancy": 81.3,
-                "literacy_rate": 99.0,
-                "co2_emissions": 8.1
-            },
-            "UK": {
-                "gdp_2026": 3.79,
-                "gdp_growth_2026": 4.1,
-                "population_2026": 0.070,
-                "gdp_per_capita_2026": 54143,
-                "unemployment_rate": 4.1,
-                "inflation_rate": 2.9,
-                "life_expectancy": 81.4,
-                "literacy_rate": 99.0,
-                "co2_emissions": 5.2
-            },
-            "France": {
-                "gdp_2026": 3.29,
-                "gdp_growth_2026": 3.5,
-                "population_2026": 0.068,
-                "gdp_per_capita_2026": 48382,
-                "unemployment_rate": 7.4,
-                "inflation_rate": 2.5,
-                "life_expectancy": 82.7,
-                "literacy_rate": 99.0,
-                "co2_emissions": 4.3
-            },
-            "Brazil": {
-                "gdp_2026": 2.61,
-                "gdp_growth_2026": 5.2,
-                "population_2026": 0.219,
-                "gdp_per_capita_2026": 11918,
-                "unemployment_rate": 8.9,
-                "inflation_rate": 4.1,
-                "life_expectancy": 76.2,
-                "literacy_rate": 93.2,
-                "co2_emissions": 2.3
-            },
-            "Russia": {
-                "gdp_2026": 2.58,
-                "gdp_growth_2026": 5.3,
-                "population_2026": 0.143,
-                "gdp_per_capita_2026": 18042,
-                "unemployment_rate": 4.4,
-                "inflation_rate": 5.7,
-                "life_expectancy": 72.6,
-                "literacy_rate": 99.7,
-                "co2_emissions": 11.9
-            },
-            "Canada": {
-                "gdp_2026": 2.47,
-                "gdp_growth_2026": 5.1,
-                "population_2026": 0.041,
-                "gdp_per_capita_2026": 60244,
-                "unemployment_rate": 5.7,
-                "inflation_rate": 2.7,
-                "life_expectancy": 82.7,
-                "literacy_rate": 99.0,
-                "co2_emissions": 15.4
-            },
-            "Australia": {
-                "gdp_2026": 1.95,
-                "gdp_growth_2026": 4.3,
-                "population_2026": 0.028,
-                "gdp_per_capita_2026": 69643,
-                "unemployment_rate": 3.8,
-                "inflation_rate": 3.1,
-                "life_expectancy": 83.4,
-                "literacy_rate": 99.0,
-                "co2_emissions": 15.3
-            },
-            "South Korea": {
-                "gdp_2026": 1.93,
-                "gdp_growth_2026": 4.9,
-                "population_2026": 0.051,
-                "gdp_per_capita_2026": 37843,
-                "unemployment_rate": 2.9,
-                "inflation_rate": 2.1,
-                "life_expectancy": 83.6,
-                "literacy_rate": 98.8,
-                "co2_emissions": 11.6
-            }
-        },
+        "countries": datasets.get("COMPARE_SUMMARY_COUNTRIES"),
         "units": {
             "gdp": "Trillion USD",
             "gdp_growth": "Percentage",
@@ -2211,14 +3429,183 @@ async def get_comparison_summary():
         "source": "IMF, World Bank, UN Data 2024-2026"
     }
 
+# ==================== COMPARISON QUERY ENGINE ====================
+# The compare tables loaded into one year x country x metric array (derived ratios and rankings
+# precomputed), so clients ask for slices instead of recomputing per capita/growth/ranks themselves.
+
+COMPARE_YEARS = [2020, 2021, 2022, 2023, 2024, 2025, 2026]
+COMPARE_QUERY_MEMO_SIZE = int(os.getenv("COMPARE_QUERY_MEMO_SIZE", "256"))
+COMPARE_SNAPSHOT_UNITS = {
+    "real_gdp_growth": "% YoY (real)",
+    "unemployment_rate": "Percentage",
+    "inflation_rate": "Percentage",
+    "life_expectancy": "Years",
+    "literacy_rate": "Percentage",
+    "co2_emissions": "Metric Tons per capita",
+}
+COMPARE_COMPOSITION_UNITS = {
+    "agriculture_share": "Percentage of GDP",
+    "industry_share": "Percentage of GDP",
+    "services_share": "Percentage of GDP",
+}
+
+# (source tables, cube): rebuilt when the dataset registry hot-reloads one of the tables
+compare_cube_state: Optional[tuple] = None
+
+def compare_cube() -> CompareCube:
+    global compare_cube_state
+    tables = tuple(datasets.get(name) for name in (
+        "COMPARE_GDP_SERIES", "COMPARE_POPULATION_SERIES", "COMPARE_SUMMARY_COUNTRIES", "COMPARE_GDP_COMPOSITION"))
+    state = compare_cube_state
+    if state is not None and all(a is b for a, b in zip(state[0], tables)):
+        return state[1]
+    
+    gdp, population, summary, composition = tables
+    snapshot_2026 = {
+        country: {
+            "real_gdp_growth": row.get("gdp_growth_2026"),
+            **{metric: row.get(metric) for metric in COMPARE_SNAPSHOT_UNITS if metric in row}
+        }
+        for country, row in summary.items()
+    }
+    snapshot_2025 = {
+        country: {f"{sector}_share": value for sector, value in row.items()}
+        for country, row in composition.items()
+    }
+    cube = CompareCube.build(
+        COMPARE_YEARS,
+        {"gdp": (gdp, "Trillion USD"), "population": (population, "Billion")},
+        snapshots={2026: (snapshot_2026, COMPARE_SNAPSHOT_UNITS), 2025: (snapshot_2025, COMPARE_COMPOSITION_UNITS)},
+        memo_size=COMPARE_QUERY_MEMO_SIZE
+    )
+    compare_cube_state = (tables, cube)
+    return cube
+
+def parse_year_param(value: Optional[str], available: Sequence[int]) -> List[int]:
+    """'2022,2024' or '2020-2023' (or a mix) -> [years]; ranges must lie within `available`"""
+    first, last = min(available), max(available)
+    years = []
+    for item in parse_csv_param(value):
+        start, dash, end = item.partition("-")
+        if not start.isdigit() or (dash and not end.isdigit()) or (dash and int(start) > int(end)):
+            raise HTTPException(status_code=400, detail=f"Invalid year '{item}'. Use 2024, 2020-2024 or a comma-separated list")
+        if dash:
+            # Check the ends before expanding: '0-30000000' must not build a 30M-item list
+            if int(start) < first or int(end) > last:
+                raise HTTPException(status_code=400, detail=f"Year range '{item}' is outside the available years {first}-{last}")
+            years.extend(range(int(start), int(end) + 1))
+        else:
+            years.append(int(start))
+    return years
+
+@app.get("/compare/query")
+def query_comparison(countries: Optional[str] = None, metrics: Optional[str] = None,
+                     years: Optional[str] = None, sort: Optional[str] = None):
+    """
+    Slice the comparison cube: ?countries=India,China&metrics=gdp,gdp_per_capita&years=2022-2026&sort=-gdp
+    
+    Every selector defaults to all. Derived metrics: gdp_per_capita, gdp_growth, population_growth,
+    gdp_share. Each value comes with its rank (1 = highest) among all countries for that year;
+    sort orders countries by a metric in the last selected year ('-' prefix for descending).
+    """
+    cube = compare_cube()
+    try:
+        result = cube.query(tuple(parse_csv_param(countries)), tuple(parse_csv_param(metrics)),
+                            tuple(parse_year_param(years, cube.years)), sort or None)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        **result,
+        "updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "source": "IMF, World Bank, UN Data 2024-2026"
+    }
+
+# ==================== STATIC API EXPORT ====================
+# Between refreshes most routes are static: render every route x year to gzipped JSON files in a
+# tree that mirrors the URL space (plus manifest.json with ETags) for the frontend/CDN to serve.
+
+STATIC_EXPORT_DIR = os.getenv("STATIC_EXPORT_DIR", "public/static-api")
+STATIC_EXPORT_EXCLUDE = ("/admin/", "/changes", "/events", "/health", "/docs", "/redoc", "/openapi.json")
+
+# Values rendered for path parameters, from the dataset each route reads for that year
+STATIC_PATH_PARAMS = {
+    "ministry_name": lambda year: list(get_cached_or_fetch("budget", year, fetch_union_budget_data)),
+    "category": lambda year: sorted({item["category"] for item in
+                                     get_cached_or_fetch("budget", year, fetch_union_budget_data).values()}),
+    "state_name": lambda year: list(get_cached_or_fetch("states", year, fetch_union_budget_data)),
+}
+
+def static_export_urls(years: List[str]) -> List[str]:
+    """Every GET route with its default parameters, and once per year where it takes ?year="""
+    urls = []
+    for route in app.routes:
+        if (not isinstance(route, APIRoute) or "GET" not in route.methods
+                or route.path.startswith(STATIC_EXPORT_EXCLUDE)):
+            continue
+        query_params = {param.name: param for param in route.dependant.query_params}
+        if any(param.field_info.is_required() for param in query_params.values()):
+            continue        # e.g. /states/compare?states=... has no canonical page
+        path_params = [param.name for param in route.dependant.path_params]
+        if any(name not in STATIC_PATH_PARAMS for name in path_params):
+            continue
+        
+        for year in [None] + (years if "year" in query_params else []):
+            paths = [route.path]
+            for name in path_params:
+                values = STATIC_PATH_PARAMS[name](year or "2026")
+                paths = [path.replace(f"{{{name}}}", quote(str(value), safe="")) for path in paths for value in values]
+            urls.extend(path if year is None else f"{path}?year={year}" for path in paths)
+    return urls
+
+def export_static_api(directory: str, years: List[str], prune: bool = True) -> dict:
+    """Render the URL space through the app (rate limiting and prefetch off) and write the tree"""
+    global RATE_LIMIT_ENABLED, PREFETCH_ENABLED
+    RATE_LIMIT_ENABLED = PREFETCH_ENABLED = False
+    pages = asyncio.run(render_pages(app, static_export_urls(years), seed_random=True))
+    return write_static_tree(directory, pages, prune=prune)
+
+def export_datasets(directory: str) -> None:
+    """Write every reference table to <directory>/<NAME>.zds (version bumped only on change)"""
+    for name in DATASET_NAMES:
+        info = write_dataset(directory, name, globals()[name])
+        state = "unchanged" if info["unchanged"] else f"{info['bytes']:,} bytes"
+        print(f"  {name:<36} v{info['version']}  {state}")
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Government & Finance Data Server")
+    parser.add_argument("--export-datasets", nargs="?", const=DATASET_DIR, metavar="DIR",
+                        help=f"Write the bundled reference tables as data files (default: {DATASET_DIR}) and exit")
+    parser.add_argument("--export-static", nargs="?", const=STATIC_EXPORT_DIR, metavar="DIR",
+                        help=f"Render every route x year to gzipped JSON + manifest (default: {STATIC_EXPORT_DIR}) and exit")
+    parser.add_argument("--years", help="Comma-separated years to re-render with --export-static (default: all budget years)")
+    args = parser.parse_args()
+    
+    if args.export_datasets:
+        print(f"Exporting reference datasets to {args.export_datasets}")
+        export_datasets(args.export_datasets)
+        raise SystemExit(0)
+    
+    if args.export_static:
+        years = args.years.split(",") if args.years else sorted(datasets.get("UNION_BUDGET_TOTALS"))
+        print(f"Rendering static API snapshot to {args.export_static} (years: {', '.join(years)})")
+        # A partial render (--years) keeps the other years' pages
+        manifest = export_static_api(args.export_static, years, prune=not args.years)
+        stats = manifest["stats"]
+        print(f"  {stats['pages']} pages: {stats['written']} written, {stats['unchanged']} unchanged, "
+              f"{stats['removed']} removed ({stats['bytes']:,} bytes -> {stats['compressed_bytes']:,} gzipped)")
+        for item in manifest["skipped"]:
+            print(f"  skipped {item['url']} (HTTP {item['status']})")
+        raise SystemExit(0)
+    
     print("=" * 80)
     print("Starting Government & Finance Data Server")
     print("=" * 80)
     print("Listening on: http://localhost:8002")
     print("API Documentation: http://localhost:8002/docs")
     print("=" * 80)
-    uvicorn.run(app, host="0.0.0.0", port=8002, log_level="info")
+    # log_config=None keeps uvicorn's loggers on the queue pipeline; our access log replaces its own
+    uvicorn.run(app, host="0.0.0.0", port=8002, log_level=LOG_LEVEL.lower(), log_config=None,
+                access_log=not ACCESS_LOG_ENABLED)
 
 
 
@@ -0,0 +1,160 @@
+"""
+Adaptive Upstream Timeouts
+Per-upstream timeouts derived from a rolling latency histogram
+
+FEATURES:
+- Log-spaced latency buckets, so recording a sample is O(1) and memory is fixed
+- Rolling window made of time slices; whole slices expire instead of single samples
+- timeout = percentile latency x multiplier, clamped to [min_timeout, max_timeout]
+- Falls back to the caller's fixed timeout until enough samples have been seen
+- Timed-out requests are censored samples: their latency is only known to exceed the
+  timeout they hit, so they are ranked in the bucket above it. Repeated timeouts push the
+  percentile (and the timeout) up until max_timeout caps it; they are also counted separately
+
+Usage:
+    timeouts = AdaptiveTimeouts(percentile=0.99, multiplier=1.5, min_timeout=0.5, max_timeout=15)
+    timeout = timeouts.timeout("datagov", default=5)
+    ...
+    timeouts.observe("datagov", response.elapsed.total_seconds())
+    timeouts.observe_timeout("datagov", timeout)     # on requests.exceptions.Timeout
+"""
+
+import bisect
+import math
+import threading
+import time
+from typing import Dict, List, Optional
+
+# Bucket upper bounds: 1ms .. ~120s, each ~10% wider than the previous
+BUCKET_GROWTH = 1.1
+BUCKET_BOUNDS: List[float] = [0.001 * BUCKET_GROWTH ** i for i in range(int(math.log(120000, BUCKET_GROWTH)) + 1)]
+
+
+class LatencyHistogram:
+    """Rolling latency histogram over `slices` time slices of `slice_seconds` each"""
+
+    def __init__(self, slices: int = 10, slice_seconds: float = 60.0):
+        self.slice_seconds = slice_seconds
+        # Each slice: [slice_id, counts per bucket, timed-out requests]
+        self._slices: List[list] = [[-1, [0] * (len(BUCKET_BOUNDS) + 1), 0] for _ in range(slices)]
+
+    def _slice(self, now: float) -> list:
+        slice_id = int(now // self.slice_seconds)
+        current = self._slices[slice_id % len(self._slices)]
+        if current[0] != slice_id:
+            current[0] = slice_id
+            current[1] = [0] * (len(BUCKET_BOUNDS) + 1)
+            current[2] = 0
+        return current
+
+    def record(self, seconds: float, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        self._slice(now)[1][bisect.bisect_left(BUCKET_BOUNDS, seconds)] += 1
+
+    def record_timeout(self, timeout: float, now: Optional[float] = None) -> None:
+        """A request that hit `timeout`: its latency is only known to be larger, so rank it one bucket above"""
+        current = self._slice(time.monotonic() if now is None else now)
+        current[1][min(bisect.bisect_left(BUCKET_BOUNDS, timeout) + 1, len(BUCKET_BOUNDS))] += 1
+        current[2] += 1
+
+    def timeouts(self, now: Optional[float] = None) -> int:
+        now = time.monotonic() if now is None else now
+        oldest = int(now // self.slice_seconds) - len(self._slices) + 1
+        return sum(timed_out for slice_id, _, timed_out in self._slices if slice_id >= oldest)
+
+    def _counts(self, now: float) -> List[int]:
+        oldest = int(now // self.slice_seconds) - len(self._slices) + 1
+        totals = [0] * (len(BUCKET_BOUNDS) + 1)
+        for slice_id, counts, _ in self._slices:
+            if slice_id >= oldest:
+                for i, count in enumerate(counts):
+                    if count:
+                        totals[i] += count
+        return totals
+
+    def count(self, now: Optional[float] = None) -> int:
+        return sum(self._counts(time.monotonic() if now is None else now))
+
+    def percentile(self, q: float, now: Optional[float] = None) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th sample (None when empty)"""
+        counts = self._counts(time.monotonic() if now is None else now)
+        total = sum(counts)
+        if not total:
+            return None
+        rank = max(1, math.ceil(q * total))
+        seen = 0
+        for i, count in enumerate(counts):
+            seen += count
+            if seen >= rank:
+                return BUCKET_BOUNDS[min(i, len(BUCKET_BOUNDS) - 1)]
+        return BUCKET_BOUNDS[-1]
+
+
+class AdaptiveTimeouts:
+    """Thread-safe per-upstream histograms and the timeouts derived from them"""
+
+    def __init__(self, percentile: float = 0.99, multiplier: float = 1.5,
+                 min_timeout: float = 0.5, max_timeout: float = 15.0,
+                 min_samples: int = 20, slices: int = 10, slice_seconds: float = 60.0):
+        """
+        Args:
+            percentile: Latency percentile the timeout is based on (0-1)
+            multiplier: Headroom applied to that percentile
+            min_timeout / max_timeout: Clamp for the derived timeout (seconds)
+            min_samples: Samples needed in the window before the default is overridden
+            slices / slice_seconds: Rolling window = slices x slice_seconds
+        """
+        self.percentile = percentile
+        self.multiplier = multiplier
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.min_samples = min_samples
+        self._slices = slices
+        self._slice_seconds = slice_seconds
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def _histogram(self, upstream: str) -> LatencyHistogram:
+        histogram = self._histograms.get(upstream)
+        if histogram is None:
+            histogram = self._histograms[upstream] = LatencyHistogram(self._slices, self._slice_seconds)
+        return histogram
+
+    def observe(self, upstream: str, seconds: float) -> None:
+        """Record one completed request's latency"""
+        with self._lock:
+            self._histogram(upstream).record(seconds)
+
+    def observe_timeout(self, upstream: str, timeout: float) -> None:
+        """Record a request that gave up after `timeout` seconds"""
+        with self._lock:
+            self._histogram(upstream).record_timeout(timeout)
+
+    def timeout(self, upstream: str, default: float) -> float:
+        """Timeout for the next request to `upstream`"""
+        with self._lock:
+            histogram = self._histograms.get(upstream)
+            if histogram is None or histogram.count() < self.min_samples:
+                return default
+            observed = histogram.percentile(self.percentile)
+        return round(min(self.max_timeout, max(self.min_timeout, observed * self.multiplier)), 3)
+
+    def snapshot(self, defaults: Optional[Dict[str, float]] = None) -> Dict[str, dict]:
+        """Per-upstream sample count, p50/p90/p99 and current timeout"""
+        defaults = defaults or {}
+        with self._lock:
+            upstreams = sorted(set(self._histograms) | set(defaults))
+            stats = {}
+            for name in upstreams:
+                histogram = self._histograms.get(name)
+                stats[name] = {
+                    "samples": histogram.count() if histogram else 0,
+                    "timeouts": histogram.timeouts() if histogram else 0,
+                    **{
+                        f"p{int(q * 100)}": round(histogram.percentile(q), 4) if histogram and histogram.count() else None
+                        for q in (0.5, 0.9, 0.99)
+                    }
+                }
+        for name, values in stats.items():
+            values["timeout"] = self.timeout(name, defaults.get(name, self.max_timeout))
+        return stats
@@ -0,0 +1,134 @@
+"""
+Admission Control & Brownout
+Keeps the finance server responsive when traffic spikes or upstreams stall
+
+FEATURES:
+- Watches threadpool queue depth, requests in flight and a latency EWMA
+- Enters brownout under pressure: callers serve cache/fallback only, skip optional
+  work, and low-priority routes are shed with 503 + Retry-After
+- Hard in-flight ceiling sheds everything (except exempt routes) before the pool saturates
+- Hysteresis: leaves brownout only after pressure has stayed low for recover_seconds
+
+Usage:
+    controller = AdmissionController(brownout_queue_depth=20, brownout_latency=2.0)
+    decision = controller.admit(low_priority=True, queue_depth=waiting)
+    if not decision.admitted:
+        ...  # 503 with Retry-After: decision.retry_after
+    try:
+        ...
+    finally:
+        controller.release(latency_seconds)
+"""
+
+import logging
+import math
+import threading
+import time
+from typing import NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionDecision(NamedTuple):
+    admitted: bool
+    brownout: bool
+    retry_after: int      # seconds (0 when admitted)
+    reason: Optional[str] = None
+
+
+class AdmissionController:
+    """Thread-safe overload detector with a normal/brownout state machine"""
+
+    def __init__(self, brownout_queue_depth: int = 20, brownout_latency: float = 2.0,
+                 recover_queue_depth: int = 5, recover_latency: float = 0.5,
+                 recover_seconds: float = 10.0, max_in_flight: int = 200,
+                 latency_alpha: float = 0.2):
+        """
+        Args:
+            brownout_queue_depth: Waiting threadpool tasks that trigger brownout
+            brownout_latency: Latency EWMA (seconds) that triggers brownout
+            recover_queue_depth / recover_latency: Both must be at or below these to recover
+            recover_seconds: How long pressure must stay low before leaving brownout
+            max_in_flight: Requests in flight beyond which everything non-exempt is shed
+            latency_alpha: EWMA smoothing factor (higher reacts faster)
+        """
+        self.brownout_queue_depth = brownout_queue_depth
+        self.brownout_latency = brownout_latency
+        self.recover_queue_depth = recover_queue_depth
+        self.recover_latency = recover_latency
+        self.recover_seconds = recover_seconds
+        self.max_in_flight = max_in_flight
+        self.latency_alpha = latency_alpha
+
+        self.in_flight = 0
+        self.queue_depth = 0
+        self.latency_ewma = 0.0
+        self.brownout = False
+        self.brownout_since: Optional[float] = None
+        self.brownouts = 0
+        self.shed = 0
+        self._last_pressure = 0.0
+        self._lock = threading.Lock()
+
+    def _under_pressure(self) -> bool:
+        return (self.queue_depth >= self.brownout_queue_depth
+                or self.latency_ewma >= self.brownout_latency
+                or self.in_flight >= self.max_in_flight)
+
+    def _update_state(self, now: float) -> None:
+        if self._under_pressure():
+            self._last_pressure = now
+            if not self.brownout:
+                self.brownout = True
+                self.brownout_since = now
+                self.brownouts += 1
+                logger.warning(f"🟠 Entering brownout (queue={self.queue_depth}, in_flight={self.in_flight}, "
+                               f"latency_ewma={self.latency_ewma:.2f}s)")
+        elif (self.brownout
+              and self.queue_depth <= self.recover_queue_depth
+              and self.latency_ewma <= self.recover_latency
+              and now - self._last_pressure >= self.recover_seconds):
+            self.brownout = False
+            self.brownout_since = None
+            logger.info("🟢 Leaving brownout, pressure is back to normal")
+
+    def _retry_after(self) -> int:
+        return max(1, math.ceil(self.recover_seconds))
+
+    def admit(self, low_priority: bool = False, queue_depth: int = 0) -> AdmissionDecision:
+        """Decide whether to start a request; admitted requests must call release()"""
+        now = time.monotonic()
+        with self._lock:
+            self.queue_depth = queue_depth
+            self._update_state(now)
+            if self.in_flight >= self.max_in_flight:
+                self.shed += 1
+                return AdmissionDecision(False, self.brownout, self._retry_after(), "overloaded")
+            if self.brownout and low_priority:
+                self.shed += 1
+                return AdmissionDecision(False, True, self._retry_after(), "brownout")
+            self.in_flight += 1
+            return AdmissionDecision(True, self.brownout, 0)
+
+    def release(self, latency_seconds: Optional[float] = None) -> None:
+        """Finish an admitted request; pass None to leave the latency EWMA untouched"""
+        now = time.monotonic()
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+            if latency_seconds is not None:
+                self.latency_ewma += self.latency_alpha * (latency_seconds - self.latency_ewma)
+            self._update_state(now)
+
+    def status(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            self._update_state(now)
+            return {
+                "mode": "brownout" if self.brownout else "normal",
+                "brownout_seconds": round(now - self.brownout_since, 1) if self.brownout_since else 0,
+                "in_flight": self.in_flight,
+                "queue_depth": self.queue_depth,
+                "latency_ewma": round(self.latency_ewma, 4),
+                "brownouts": self.brownouts,
+                "shed": self.shed
+            }
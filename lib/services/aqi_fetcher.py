@@ -8,6 +8,11 @@ import requests
 from typing import Dict, List, Optional
 from datetime import datetime
 
+try:
+    from lib.services.http_client import http_get
+except ImportError:  # running as a script from lib/services
+    from http_client import http_get
+
 # OGD API Configuration
 OGD_API_BASE = "https://api.data.gov.in/resource"
 RESOURCE_ID = "3b01bcb8-0b14-4abf-b6f2-c1bfd384ba69"
@@ -138,7 +143,7 @@ def fetch_realtime_aqi(
     
     try:
         print(f"Fetching AQI data from OGD API...")
-        response = requests.get(url, params=params, timeout=10)
+        response = http_get(url, params=params, timeout=10)
         response.raise_for_status()
         
         data = response.json()
@@ -0,0 +1,267 @@
+"""
+Budget Reallocation Simulator
+Vectorized "what if" scenarios over one year's ministry allocation vector (NumPy)
+
+FEATURES:
+- Percentage or absolute shifts per ministry or per category ("Defence:+10%", "category:Healthcare:-5000")
+- Fixed-total mode: the net change is absorbed proportionally by the ministries no shift touched
+- Recomputes totals, category shares and utilization (spent / new allocation)
+- Batches: S scenarios x K Monte Carlo samples x N ministries are evaluated as one array pass;
+  sensitivity runs draw each shift's value from N(value, sd) and report percentile bands
+- A cell budget (S x K x N) bounds memory and latency per request
+
+Usage:
+    vector = BudgetVector.from_records(budget_data)
+    result = simulate(vector, [[parse_shift("Defence:+10%")]], fixed_total=True)
+    result = simulate(vector, [[parse_shift("Defence:+10%±3")]], samples=1000, seed=7)
+    scenarios = summarize(vector, result, ["Defence +10%"], samples=1000)
+"""
+
+import math
+from typing import List, Mapping, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+PERCENTILES = (5, 50, 95)
+
+
+class Shift(NamedTuple):
+    target: str             # ministry or category name
+    by_category: bool
+    percent: bool           # True: value is a percentage, False: absolute INR Crores
+    value: float
+    sd: Optional[float] = None   # Monte Carlo spread, same unit as value (None: request default)
+
+
+def parse_shift(text: str) -> Shift:
+    """'Defence:+10%', 'Railways:-5000', 'category:Healthcare:+5%±2' -> Shift"""
+    target, _, amount = text.strip().rpartition(":")
+    if not target or not amount:
+        raise ValueError(f"Invalid shift '{text}'. Expected <ministry>:<+/-value>[%][±sd] "
+                         f"or category:<name>:<+/-value>[%][±sd]")
+    by_category = target.lower().startswith("category:")
+    if by_category:
+        target = target.split(":", 1)[1]
+    amount, _, sd = amount.replace("+/-", "±").partition("±")
+    percent = amount.strip().endswith("%")
+    try:
+        value = float(amount.strip().rstrip("%"))
+        spread = float(sd.strip().rstrip("%")) if sd.strip() else None
+    except ValueError:
+        raise ValueError(f"Invalid shift value in '{text}'")
+    return _finite(Shift(target.strip(), by_category, percent, value, spread), f"'{text}'")
+
+
+def shift_from_spec(spec) -> Shift:
+    """A shift string, or {"ministry"|"category": name, "percent"|"amount": value, "sd": spread}"""
+    if isinstance(spec, str):
+        return parse_shift(spec)
+    if not isinstance(spec, Mapping):
+        raise ValueError(f"Invalid shift {spec!r}")
+    by_category = "category" in spec
+    target = spec.get("category") if by_category else spec.get("ministry")
+    percent = "percent" in spec
+    value = spec.get("percent") if percent else spec.get("amount")
+    if not target or value is None:
+        raise ValueError(f"Invalid shift {spec!r}: needs ministry or category, and percent or amount")
+    try:
+        shift = Shift(str(target), by_category, percent, float(value),
+                      float(spec["sd"]) if spec.get("sd") is not None else None)
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError(f"Invalid shift value in {spec!r}")
+    return _finite(shift, repr(spec))
+
+
+def _finite(shift: Shift, source: str) -> Shift:
+    # float() accepts 'nan' and 'inf', which would poison every total they touch
+    if not math.isfinite(shift.value) or (shift.sd is not None and not math.isfinite(shift.sd)):
+        raise ValueError(f"Invalid shift value in {source}: must be a finite number")
+    return shift
+
+
+class BudgetVector:
+    """Read-only arrays for one year's ministries: allocation, spent and category index"""
+
+    __slots__ = ("names", "allocation", "spent", "categories", "category_of", "_lookup")
+
+    def __init__(self, names: Sequence[str], allocation, spent, categories: Sequence[str], category_of):
+        self.names = tuple(names)
+        self.allocation = np.asarray(allocation, dtype=np.float64)
+        self.spent = np.asarray(spent, dtype=np.float64)
+        self.categories = tuple(categories)
+        self.category_of = np.asarray(category_of, dtype=np.intp)
+        for array in (self.allocation, self.spent, self.category_of):
+            array.setflags(write=False)
+        self._lookup = {name.lower(): i for i, name in enumerate(self.names)}
+
+    @classmethod
+    def from_records(cls, records: Mapping) -> "BudgetVector":
+        """{ministry: {"allocation", "spent", "category"}} -> BudgetVector"""
+        names = list(records)
+        categories = sorted({str(records[name].get("category", "Other")) for name in names})
+        category_index = {category: i for i, category in enumerate(categories)}
+        return cls(
+            names,
+            [float(records[name]["allocation"] or 0) for name in names],
+            [float(records[name].get("spent") or 0) for name in names],
+            categories,
+            [category_index[str(records[name].get("category", "Other"))] for name in names],
+        )
+
+    @property
+    def total(self) -> float:
+        return float(self.allocation.sum())
+
+    def mask(self, shift: Shift) -> np.ndarray:
+        """Boolean ministry mask for a shift's target (case-insensitive, '-' or '_' for spaces)"""
+        wanted = shift.target.replace("-", " ").replace("_", " ").lower()
+        if shift.by_category:
+            matches = [i for i, category in enumerate(self.categories) if category.lower() == wanted]
+            if not matches:
+                raise ValueError(f"Unknown category '{shift.target}'. Available: {', '.join(self.categories)}")
+            return self.category_of == matches[0]
+        index = self._lookup.get(shift.target.lower(), self._lookup.get(wanted))
+        if index is None:
+            raise ValueError(f"Unknown ministry '{shift.target}'")
+        mask = np.zeros(len(self.names), dtype=bool)
+        mask[index] = True
+        return mask
+
+    def category_totals(self, allocation: np.ndarray) -> np.ndarray:
+        """Sum the last axis per category: (..., N) -> (..., C)"""
+        onehot = np.zeros((len(self.names), len(self.categories)))
+        onehot[np.arange(len(self.names)), self.category_of] = 1.0
+        return allocation @ onehot
+
+
+def simulate(vector: BudgetVector, scenarios: List[List[Shift]], fixed_total: bool = True,
+             samples: int = 0, default_sd: float = 0.0, seed: Optional[int] = None,
+             max_cells: int = 1_000_000) -> dict:
+    """
+    Evaluate every scenario (and every Monte Carlo sample) in one vectorized pass.
+
+    Returns arrays shaped (S, K, N) for allocations and (S, K) / (S, K, C) for totals and
+    category shares, where K is 1 without sampling. Raises ValueError on unknown targets
+    or when the request exceeds max_cells.
+    """
+    S, K, N = len(scenarios), max(samples, 1), len(vector.names)
+    if S == 0:
+        raise ValueError("No scenarios given")
+    if S * K * N > max_cells:
+        raise ValueError(f"Simulation too large: {S} scenarios x {K} samples x {N} ministries "
+                         f"exceeds {max_cells:,} cells")
+    rng = np.random.default_rng(seed)
+
+    factor = np.ones((S, K, N))
+    added = np.zeros((S, K, N))
+    touched = np.zeros((S, N), dtype=bool)
+    for s, shifts in enumerate(scenarios):
+        for shift in shifts:
+            mask = vector.mask(shift)
+            touched[s] |= mask
+            sd = default_sd if shift.sd is None else shift.sd
+            values = np.full(K, shift.value)
+            if samples and sd:
+                values = values + sd * rng.standard_normal(K)
+            if shift.percent:
+                factor[s][:, mask] *= (1.0 + values / 100.0)[:, None]
+            else:
+                # An absolute amount on a category is split by the ministries' current weights
+                weights = vector.allocation[mask]
+                weights = weights / weights.sum() if weights.sum() else np.full(mask.sum(), 1.0 / mask.sum())
+                added[s][:, mask] += values[:, None] * weights
+
+    allocation = np.clip(vector.allocation * factor + added, 0.0, None)
+    feasible = np.ones((S, K), dtype=bool)
+
+    if fixed_total:
+        untouched = ~touched[:, None, :]                          # (S, 1, N)
+        free = np.where(untouched, allocation, 0.0).sum(axis=-1)  # (S, K)
+        excess = allocation.sum(axis=-1) - vector.total
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scale = np.where(free > 0, (free - excess) / free, 1.0)
+        allocation = np.where(untouched, allocation * np.clip(scale, 0.0, None)[..., None], allocation)
+        # An increase bigger than everything else combined (or nothing left to scale) can't hold the total
+        feasible = np.isclose(allocation.sum(axis=-1), vector.total, rtol=1e-9)
+
+    totals = allocation.sum(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        utilization = np.where(allocation > 0, vector.spent / allocation * 100.0, np.nan)
+        shares = vector.category_totals(allocation) / totals[..., None] * 100.0
+
+    return {
+        "allocation": allocation,
+        "total": totals,
+        "utilization": utilization,
+        "category_share": shares,
+        "feasible": feasible,
+        "touched": touched,
+    }
+
+
+def _round(value: float, digits: int = 2) -> Optional[float]:
+    return None if not np.isfinite(value) else round(float(value), digits)
+
+
+def summarize(vector: BudgetVector, result: dict, names: Sequence[str], samples: int = 0) -> List[dict]:
+    """JSON-ready per-scenario results: point values, or percentile bands for Monte Carlo runs"""
+    base_shares = vector.category_totals(vector.allocation) / vector.total * 100.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        base_utilization = np.where(vector.allocation > 0, vector.spent / vector.allocation * 100.0, np.nan)
+
+    output = []
+    for s, name in enumerate(names):
+        allocation = result["allocation"][s]          # (K, N)
+        scenario = {
+            "name": name,
+            "total_allocation": _round(result["total"][s].mean()),
+            "base_total_allocation": _round(vector.total),
+        }
+        if samples:
+            bands = np.percentile(allocation, PERCENTILES, axis=0)                    # (P, N)
+            share_bands = np.percentile(result["category_share"][s], PERCENTILES, axis=0)
+            scenario["samples"] = samples
+            scenario["feasible_ratio"] = _round(result["feasible"][s].mean(), 4)
+            scenario["ministries"] = [
+                {
+                    "ministry": ministry,
+                    "base_allocation": _round(vector.allocation[i]),
+                    **{f"p{p}": _round(bands[j, i]) for j, p in enumerate(PERCENTILES)},
+                }
+                for i, ministry in enumerate(vector.names)
+            ]
+            scenario["category_shares"] = [
+                {
+                    "category": category,
+                    "base_share": _round(base_shares[c]),
+                    **{f"p{p}": _round(share_bands[j, c]) for j, p in enumerate(PERCENTILES)},
+                }
+                for c, category in enumerate(vector.categories)
+            ]
+        else:
+            allocation = allocation[0]
+            scenario["feasible"] = bool(result["feasible"][s, 0])
+            scenario["ministries"] = [
+                {
+                    "ministry": ministry,
+                    "base_allocation": _round(vector.allocation[i]),
+                    "allocation": _round(allocation[i]),
+                    "change": _round(allocation[i] - vector.allocation[i]),
+                    "change_percentage": _round((allocation[i] / vector.allocation[i] - 1) * 100)
+                    if vector.allocation[i] else None,
+                    "utilization_percentage": _round(result["utilization"][s, 0, i]),
+                    "base_utilization_percentage": _round(base_utilization[i]),
+                    "shifted": bool(result["touched"][s, i]),
+                }
+                for i, ministry in enumerate(vector.names)
+            ]
+            scenario["category_shares"] = [
+                {
+                    "category": category,
+                    "base_share": _round(base_shares[c]),
+                    "share": _round(result["category_share"][s, 0, c]),
+                }
+                for c, category in enumerate(vector.categories)
+            ]
+        output.append(scenario)
+    return output
@@ -0,0 +1,127 @@
+"""
+Dataset Version Counter & Change Feed
+Record-level diffs between cache refreshes, so pollers can fetch only what changed
+
+FEATURES:
+- One monotonically increasing version shared by all datasets
+- A dataset's version only moves when a refresh actually changed its records
+- Bounded in-memory log of record-level changes (added / removed / changed)
+- since=<version> queries report when the log no longer reaches back that far
+
+Usage:
+    feed = ChangeFeed(max_changes=5000)
+    version = feed.record("budget_2026", "budget", "2026", old_data, new_data)
+    result = feed.since(42)
+"""
+
+import threading
+from collections import deque
+from collections.abc import Mapping
+from datetime import datetime
+from typing import Dict, List, Optional
+
+
+def diff_records(old: Optional[dict], new: Optional[dict]) -> List[dict]:
+    """
+    Compare two {record_key: record} dicts.
+
+    Records that are mappings are compared field by field; any other value is compared
+    as a whole. Returns a list of {"op", "key", ...} change dicts.
+    """
+    old = old or {}
+    new = new or {}
+    changes = []
+
+    for key, value in new.items():
+        if key not in old:
+            changes.append({"op": "added", "key": key, "value": value})
+            continue
+        previous = old[key]
+        if previous == value:
+            continue
+        if isinstance(previous, Mapping) and isinstance(value, Mapping):
+            fields = {
+                field: [previous.get(field), value.get(field)]
+                for field in previous.keys() | value.keys()
+                if previous.get(field) != value.get(field)
+            }
+            changes.append({"op": "changed", "key": key, "fields": fields})
+        else:
+            changes.append({"op": "changed", "key": key, "before": previous, "after": value})
+
+    for key in old.keys() - new.keys():
+        changes.append({"op": "removed", "key": key})
+
+    return changes
+
+
+class ChangeFeed:
+    """Thread-safe version counter plus a bounded log of record-level changes"""
+
+    def __init__(self, max_changes: int = 5000):
+        self.version = 0
+        self.dataset_versions: Dict[str, int] = {}
+        self._log: deque = deque(maxlen=max_changes)
+        # Highest version that has fallen out of the bounded log
+        self._truncated_through = 0
+        self._lock = threading.Lock()
+
+    def record(self, cache_key: str, dataset: str, year: str,
+               old: Optional[dict], new: Optional[dict]) -> int:
+        """
+        Log the differences between two versions of a dataset.
+
+        Returns the dataset's version after the refresh (unchanged if nothing differed).
+        """
+        changes = diff_records(old, new)
+
+        with self._lock:
+            first_load = cache_key not in self.dataset_versions
+            if not first_load and not changes:
+                return self.dataset_versions[cache_key]
+
+            self.version += 1
+            self.dataset_versions[cache_key] = self.version
+            timestamp = datetime.now().isoformat()
+            if first_load:
+                # A first load is a single event; clients fetch the dataset itself
+                changes = [{"op": "loaded", "records": len(new or {})}]
+            for change in changes:
+                if len(self._log) == self._log.maxlen:
+                    self._truncated_through = self._log[0]["version"]
+                self._log.append({
+                    "version": self.version,
+                    "dataset": dataset,
+                    "year": year,
+                    "timestamp": timestamp,
+                    **change
+                })
+            return self.version
+
+    def since(self, version: int, dataset: Optional[str] = None, limit: int = 1000) -> dict:
+        """Changes newer than `version`, oldest first"""
+        with self._lock:
+            entries = [
+                c for c in self._log
+                if c["version"] > version and (dataset is None or c["dataset"] == dataset)
+            ]
+            current = self.version
+            # The log can't answer for versions that were already evicted
+            reset = version < self._truncated_through
+
+        matched = len(entries)
+        if matched > limit:
+            # Cut on a version boundary so resuming from next_since never skips entries
+            cut_version = entries[limit]["version"]
+            page = [c for c in entries if c["version"] < cut_version]
+            entries = page or [c for c in entries if c["version"] == cut_version]
+        has_more = len(entries) < matched
+
+        return {
+            "since": version,
+            "current_version": current,
+            "reset": reset,
+            "has_more": has_more,
+            "next_since": entries[-1]["version"] if has_more else current,
+            "changes": entries
+        }
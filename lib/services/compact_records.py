@@ -0,0 +1,144 @@
+"""
+Compact Record Tables
+Struct-of-arrays storage for {key: {field: value}} tables held in the cache
+
+A budget/state table is a few dozen small dicts that all repeat the same keys
+("allocation", "spent", "category", ...). RecordTable stores one tuple of keys,
+one schema, and one column per field instead: numeric columns are packed into
+array('q')/array('d') and string columns are interned, so repeated categories
+share one object. Records are materialized as lightweight read-only views only
+when accessed, and become plain dicts only when the response is serialized.
+
+FEATURES:
+- RecordTable / RecordView are read-only Mappings (table["Defence"]["spent"], .items(), .get())
+- Equality, len, iteration and `in` behave like the dicts they replace
+- compact() is a drop-in for freeze(): uniform tables become RecordTables, the rest is frozen
+
+Usage:
+    data = compact({"Defence": {"allocation": 621541, "spent": 590464, "category": "Defence"}, ...})
+    data["Defence"]["allocation"]       # 621541
+    json.dumps(data, default=dict)      # plain JSON
+"""
+
+import sys
+from array import array
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Tuple
+
+from lib.services.snapshot_store import FrozenDict, freeze
+
+# Field-name tuples are shared between every table with the same schema
+_schemas: Dict[Tuple[str, ...], Dict[str, int]] = {}
+
+
+def _schema(fields: Tuple[str, ...]) -> Dict[str, int]:
+    schema = _schemas.get(fields)
+    if schema is None:
+        schema = _schemas[fields] = {sys.intern(f): i for i, f in enumerate(fields)}
+    return schema
+
+
+def _column(values: list):
+    """Pack a column as tightly as its values allow"""
+    if values and all(type(v) is int for v in values):
+        try:
+            return array("q", values)
+        except OverflowError:
+            pass
+    if values and all(type(v) is float for v in values):
+        return array("d", values)
+    return tuple(sys.intern(v) if type(v) is str else v for v in values)
+
+
+class RecordView(Mapping):
+    """One row of a RecordTable, read through to the table's columns"""
+
+    __slots__ = ("_table", "_row")
+
+    def __init__(self, table: "RecordTable", row: int):
+        self._table = table
+        self._row = row
+
+    def __getitem__(self, field: str) -> Any:
+        return self._table._columns[self._table._schema[field]][self._row]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._table._schema)
+
+    def __len__(self) -> int:
+        return len(self._table._schema)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class RecordTable(Mapping):
+    """Read-only {key: record} mapping stored column-wise"""
+
+    __slots__ = ("_keys", "_index", "_schema", "_columns")
+
+    def __init__(self, records: Mapping):
+        first = next(iter(records.values()))
+        fields = tuple(first.keys())
+        self._keys = tuple(sys.intern(k) if type(k) is str else k for k in records.keys())
+        self._index = {key: row for row, key in enumerate(self._keys)}
+        self._schema = _schema(fields)
+        self._columns = tuple(_column([record[f] for record in records.values()]) for f in fields)
+
+    def __getitem__(self, key) -> RecordView:
+        return RecordView(self, self._index[key])
+
+    def __contains__(self, key) -> bool:
+        return key in self._index
+
+    def __iter__(self) -> Iterator:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __repr__(self) -> str:
+        return f"RecordTable({len(self._keys)} records x {len(self._schema)} fields)"
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+def is_record_table(value: Any) -> bool:
+    """A dict of 2+ dict records with identical keys and scalar values"""
+    if not isinstance(value, Mapping) or len(value) < 2:
+        return False
+    records = list(value.values())
+    if not all(isinstance(r, Mapping) for r in records):
+        return False
+    fields = tuple(records[0].keys())
+    # Same fields in the same order, so serialized records keep their key order
+    return all(
+        tuple(r.keys()) == fields and not any(isinstance(v, (Mapping, list, tuple)) for v in r.values())
+        for r in records
+    )
+
+
+def compact(value: Any) -> Any:
+    """freeze() plus struct-of-arrays storage for uniform record tables"""
+    if isinstance(value, RecordTable):
+        return value
+    if is_record_table(value):
+        return RecordTable(value)
+    if isinstance(value, Mapping):
+        return FrozenDict((k, compact(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(compact(v) for v in value)
+    return freeze(value)
+
+
+def to_plain(value: Any) -> Any:
+    """The JSON-ready equivalent (dicts and lists) of a compacted/frozen value"""
+    if isinstance(value, Mapping):
+        return {k: to_plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, array)):
+        return [to_plain(v) for v in value]
+    return value
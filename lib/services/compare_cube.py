@@ -0,0 +1,181 @@
+"""
+Cross-Country Comparison Cube
+year x country x metric array with derived ratios and rankings precomputed, queried by slice
+
+FEATURES:
+- One float array (NaN = not available) built from the compare series/snapshot tables
+- Derived metrics computed once at build: GDP per capita, YoY GDP and population growth,
+  share of the compared countries' GDP
+- Rankings (1 = highest) per year and metric across all countries, precomputed
+- query() slices countries x metrics x years, sorts by any metric, and memoizes results
+  (LRU) so popular dashboard queries are answered without touching the array
+
+Usage:
+    cube = CompareCube.build(years, gdp_series, population_series, snapshots={2026: summary})
+    result = cube.query(("India", "China"), ("gdp_per_capita",), (2024, 2025, 2026), "-gdp_per_capita")
+"""
+
+from functools import lru_cache
+from typing import Dict, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+DERIVED_UNITS = {
+    "gdp_per_capita": "USD",
+    "gdp_growth": "% YoY (nominal USD)",
+    "population_growth": "% YoY",
+    "gdp_share": "% of compared countries' GDP",
+}
+
+
+def _rank_descending(values: np.ndarray) -> np.ndarray:
+    """Ranks along axis 1 (countries), 1 = largest; NaN stays NaN"""
+    filled = np.where(np.isnan(values), -np.inf, values)
+    order = np.argsort(-filled, axis=1, kind="stable")
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(1, values.shape[1] + 1)[None, :, None], axis=1)
+    return np.where(np.isnan(values), np.nan, ranks.astype(np.float64))
+
+
+def _unknown(kind: str, unknown: Sequence[str], available: Sequence[str], shown: int = 10) -> ValueError:
+    """ValueError naming at most `shown` of the unknown values (selectors come from the client)"""
+    listed = ", ".join(unknown[:shown]) + (f" (+{len(unknown) - shown} more)" if len(unknown) > shown else "")
+    return ValueError(f"Unknown {kind} '{listed}'. Available: {', '.join(available)}")
+
+
+class CompareCube:
+    """Immutable comparison array; build a new cube when the source tables change"""
+
+    def __init__(self, years: Sequence[int], countries: Sequence[str], metrics: Sequence[str],
+                 values: np.ndarray, units: Mapping[str, str], memo_size: int = 256):
+        self.years = tuple(years)
+        self.countries = tuple(countries)
+        self.metrics = tuple(metrics)
+        self.units = dict(units)
+        self.values = values
+        self.ranks = _rank_descending(values)
+        for array in (self.values, self.ranks):
+            array.setflags(write=False)
+        self._year_index = {year: i for i, year in enumerate(self.years)}
+        self._country_index = {country.lower(): i for i, country in enumerate(self.countries)}
+        self._metric_index = {metric: i for i, metric in enumerate(self.metrics)}
+        # Per-instance memo: a rebuilt cube starts with an empty cache
+        self.query = lru_cache(maxsize=memo_size)(self._query)
+
+    @classmethod
+    def build(cls, years: Sequence[int], series: Mapping[str, Tuple[Mapping[str, Sequence[float]], str]],
+              snapshots: Optional[Mapping[int, Tuple[Mapping[str, Mapping[str, float]], Mapping[str, str]]]] = None,
+              memo_size: int = 256) -> "CompareCube":
+        """
+        Args:
+            years: Years covered by every series
+            series: {metric: ({country: [value per year]}, unit)}; needs "gdp" (trillion USD)
+                and "population" (billion) for the derived metrics
+            snapshots: {year: ({country: {metric: value}}, {metric: unit})} for point-in-time tables
+        """
+        snapshots = snapshots or {}
+        countries = []
+        for table, _ in series.values():
+            countries.extend(c for c in table if c not in countries)
+        for table, _ in snapshots.values():
+            countries.extend(c for c in table if c not in countries)
+
+        units = {metric: unit for metric, (_, unit) in series.items()}
+        for _, snapshot_units in snapshots.values():
+            units.update((metric, unit) for metric, unit in snapshot_units.items() if metric not in units)
+        units.update((metric, unit) for metric, unit in DERIVED_UNITS.items() if metric not in units)
+        metrics = list(units)
+
+        year_index = {year: i for i, year in enumerate(years)}
+        country_index = {country: i for i, country in enumerate(countries)}
+        metric_index = {metric: i for i, metric in enumerate(metrics)}
+        values = np.full((len(years), len(countries), len(metrics)), np.nan)
+
+        for metric, (table, _) in series.items():
+            for country, row in table.items():
+                values[:len(row), country_index[country], metric_index[metric]] = row
+        for year, (table, _) in snapshots.items():
+            if year not in year_index:
+                continue
+            for country, row in table.items():
+                for metric, value in row.items():
+                    if metric in metric_index and isinstance(value, (int, float)):
+                        values[year_index[year], country_index[country], metric_index[metric]] = value
+
+        gdp = values[:, :, metric_index["gdp"]]
+        population = values[:, :, metric_index["population"]]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # trillion USD / billion people -> USD per person
+            values[:, :, metric_index["gdp_per_capita"]] = gdp / population * 1000.0
+            values[1:, :, metric_index["gdp_growth"]] = (gdp[1:] / gdp[:-1] - 1.0) * 100.0
+            values[1:, :, metric_index["population_growth"]] = (population[1:] / population[:-1] - 1.0) * 100.0
+            values[:, :, metric_index["gdp_share"]] = gdp / np.nansum(gdp, axis=1, keepdims=True) * 100.0
+        return cls(years, countries, metrics, values, units, memo_size)
+
+    # ---------- lookups (raise ValueError with the valid choices) ----------
+
+    def country_indices(self, countries: Sequence[str]) -> list:
+        unknown = [c for c in countries if c.lower() not in self._country_index]
+        if unknown:
+            raise _unknown("country", unknown, self.countries)
+        return [self._country_index[c.lower()] for c in countries]
+
+    def metric_indices(self, metrics: Sequence[str]) -> list:
+        unknown = [m for m in metrics if m not in self._metric_index]
+        if unknown:
+            raise _unknown("metric", unknown, self.metrics)
+        return [self._metric_index[m] for m in metrics]
+
+    def year_indices(self, years: Sequence[int]) -> list:
+        unknown = [str(y) for y in years if y not in self._year_index]
+        if unknown:
+            raise _unknown("year", unknown, [str(y) for y in self.years])
+        return [self._year_index[y] for y in years]
+
+    # ---------- queries ----------
+
+    def _query(self, countries: Tuple[str, ...], metrics: Tuple[str, ...], years: Tuple[int, ...],
+               sort: Optional[str] = None) -> dict:
+        """
+        Slice (all when a selector is empty) and optionally sort by a metric in the last selected
+        year ('-metric' for descending). Memoized through self.query: treat the result as read-only.
+        """
+        c_idx = self.country_indices(countries) if countries else list(range(len(self.countries)))
+        m_idx = self.metric_indices(metrics) if metrics else list(range(len(self.metrics)))
+        y_idx = self.year_indices(years) if years else list(range(len(self.years)))
+
+        if sort:
+            descending = sort.startswith("-")
+            sort_metric = self.metric_indices([sort.lstrip("-+")])[0]
+            keys = self.values[y_idx[-1], c_idx, sort_metric]
+            # NaN last in either direction
+            order = sorted(range(len(c_idx)), key=lambda i: (
+                np.isnan(keys[i]), -keys[i] if descending else keys[i]))
+            c_idx = [c_idx[i] for i in order]
+
+        block = self.values[np.ix_(y_idx, c_idx, m_idx)]          # (Y, C, M)
+        ranks = self.ranks[np.ix_(y_idx, c_idx, m_idx)]
+
+        def column(array, c, m, digits):
+            return [None if np.isnan(v) else round(float(v), digits) for v in array[:, c, m]]
+
+        return {
+            "years": [self.years[i] for i in y_idx],
+            "metrics": [self.metrics[i] for i in m_idx],
+            "units": {self.metrics[i]: self.units.get(self.metrics[i]) for i in m_idx},
+            "sort": sort,
+            "countries": [
+                {
+                    "country": self.countries[ci],
+                    "values": {self.metrics[mi]: column(block, c, m, 4) for m, mi in enumerate(m_idx)},
+                    "ranks": {self.metrics[mi]: [None if v is None else int(v) for v in column(ranks, c, m, 0)]
+                              for m, mi in enumerate(m_idx)},
+                }
+                for c, ci in enumerate(c_idx)
+            ],
+            "ranked_out_of": len(self.countries),
+        }
+
+    def memo_stats(self) -> Dict[str, int]:
+        info = self.query.cache_info()
+        return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "max_size": info.maxsize}
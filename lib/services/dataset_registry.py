@@ -0,0 +1,245 @@
+"""
+File-backed Dataset Registry
+Reference tables loaded from versioned binary data files, with lazy load and hot reload
+
+FEATURES:
+- Compact ".zds" files: magic + JSON header (name, version, sha256) + zlib-compressed body
+- Record tables ({key: {field: value}} with uniform fields) are stored column-wise,
+  so field names are written once per table instead of once per record
+- Datasets load on first access; the file's mtime is re-checked at most every
+  check_interval seconds and a changed file is reloaded and swapped in atomically
+- A missing or corrupt file falls back to the built-in table (or keeps the last good load)
+
+File layout:
+    b"ZDS1" | uint32 header length | header JSON | zlib(body JSON)
+
+Usage:
+    registry = DatasetRegistry("data/datasets", builtin=lambda name: BUILTIN_TABLES[name],
+                               names=("FALLBACK_BUDGET_DATA",))
+    budget = registry.get("FALLBACK_BUDGET_DATA")
+    write_dataset("data/datasets", "FALLBACK_BUDGET_DATA", budget)   # bumps the version
+"""
+
+import hashlib
+import json
+import logging
+import os
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"ZDS1"
+FILE_SUFFIX = ".zds"
+COLUMNAR_MARKER = "__columns__"
+
+
+# ==================== ENCODING ====================
+
+def _to_columnar(value: Any) -> Any:
+    """Recursively rewrite uniform record tables as {"__columns__": {...}}"""
+    if isinstance(value, dict):
+        records = list(value.values())
+        if (len(records) > 1 and all(isinstance(r, dict) for r in records)
+                and all(r.keys() == records[0].keys() for r in records)
+                and all(not isinstance(v, (dict, list)) for r in records for v in r.values())):
+            fields = list(records[0].keys())
+            return {COLUMNAR_MARKER: {
+                "keys": list(value.keys()),
+                "columns": {f: [r[f] for r in records] for f in fields},
+            }}
+        return {k: _to_columnar(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_to_columnar(v) for v in value]
+    return value
+
+
+def _from_columnar(value: Any) -> Any:
+    if isinstance(value, dict):
+        table = value.get(COLUMNAR_MARKER) if len(value) == 1 else None
+        if table is not None:
+            columns = table["columns"]
+            return {
+                key: {field: column[i] for field, column in columns.items()}
+                for i, key in enumerate(table["keys"])
+            }
+        return {k: _from_columnar(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_from_columnar(v) for v in value]
+    return value
+
+
+def encode_dataset(name: str, data: Any, version: int = 1) -> bytes:
+    body = zlib.compress(
+        json.dumps(_to_columnar(data), separators=(",", ":"), ensure_ascii=False).encode("utf-8"), 9
+    )
+    header = json.dumps({
+        "name": name,
+        "version": version,
+        "created_at": datetime.now().isoformat(),
+        "sha256": hashlib.sha256(body).hexdigest(),
+        "encoding": "json+columnar/zlib",
+    }).encode("utf-8")
+    return MAGIC + struct.pack(">I", len(header)) + header + body
+
+
+def decode_dataset(blob: bytes) -> Tuple[dict, Any]:
+    """Returns (header, data); raises ValueError on a malformed or corrupted file"""
+    if blob[:4] != MAGIC or len(blob) < 8:
+        raise ValueError("not a dataset file (bad magic)")
+    (header_length,) = struct.unpack(">I", blob[4:8])
+    header = json.loads(blob[8:8 + header_length].decode("utf-8"))
+    if not isinstance(header, dict):
+        raise ValueError("malformed header")
+    body = blob[8 + header_length:]
+    if hashlib.sha256(body).hexdigest() != header.get("sha256"):
+        raise ValueError("checksum mismatch")
+    return header, _from_columnar(json.loads(zlib.decompress(body).decode("utf-8")))
+
+
+def dataset_path(directory: str, name: str) -> str:
+    return os.path.join(directory, name + FILE_SUFFIX)
+
+
+def read_header(path: str) -> Optional[dict]:
+    try:
+        with open(path, "rb") as f:
+            prefix = f.read(8)
+            if prefix[:4] != MAGIC:
+                return None
+            (header_length,) = struct.unpack(">I", prefix[4:8])
+            header = json.loads(f.read(header_length).decode("utf-8"))
+            return header if isinstance(header, dict) else None
+    except (OSError, ValueError, struct.error):
+        return None
+
+
+def write_dataset(directory: str, name: str, data: Any) -> dict:
+    """Write `data` atomically (temp file + rename), bumping the version if it changed"""
+    os.makedirs(directory, exist_ok=True)
+    path = dataset_path(directory, name)
+    previous = read_header(path)
+    version = (previous or {}).get("version", 0) + 1
+    blob = encode_dataset(name, data, version)
+    header, decoded = decode_dataset(blob)
+    if decoded != data:
+        # e.g. non-string dict keys or tuples, which JSON can't round-trip
+        raise ValueError(f"dataset {name} does not survive a JSON round trip")
+    if previous and previous.get("sha256") == header["sha256"]:
+        return {**previous, "path": path, "unchanged": True}
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(blob)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return {**header, "path": path, "bytes": len(blob), "unchanged": False}
+
+
+# ==================== REGISTRY ====================
+
+class LoadedDataset(NamedTuple):
+    data: Any
+    source: str                 # "file" or "builtin"
+    version: Optional[int]
+    mtime: Optional[float]
+    loaded_at: datetime
+
+
+class DatasetRegistry:
+    """Thread-safe lazy loader with mtime-polled hot reload"""
+
+    def __init__(self, directory: str, builtin: Callable[[str], Any],
+                 names: Iterable[str] = (), check_interval: float = 2.0,
+                 transform: Optional[Callable[[Any], Any]] = None):
+        """
+        Args:
+            directory: Folder holding <NAME>.zds files
+            builtin: Returns the bundled table for a name (used when no file exists)
+            names: Dataset names that may be requested
+            check_interval: Minimum seconds between mtime checks per dataset
+            transform: Applied to data loaded from files (e.g. a compact in-memory form);
+                built-in tables are served as-is since the module already holds them
+        """
+        self.directory = directory
+        self.names = tuple(names)
+        self.check_interval = check_interval
+        self._builtin = builtin
+        self._transform = transform
+        self._loaded: Dict[str, LoadedDataset] = {}
+        self._next_check: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _load(self, name: str, mtime: Optional[float]) -> LoadedDataset:
+        if mtime is not None:
+            try:
+                with open(dataset_path(self.directory, name), "rb") as f:
+                    header, data = decode_dataset(f.read())
+                if self._transform is not None:
+                    data = self._transform(data)
+                logger.info(f"📂 Loaded dataset {name} v{header.get('version')} from file")
+                return LoadedDataset(data, "file", header.get("version"), mtime, datetime.now())
+            except Exception as e:
+                # Truncated or malformed file, or a transform that choked on its contents
+                previous = self._loaded.get(name)
+                logger.error(f"❌ Could not load dataset file for {name}: {type(e).__name__}: {e}")
+                if previous is not None:
+                    # Keep serving the last good version; retry when the file changes again
+                    return previous._replace(mtime=mtime)
+        return LoadedDataset(self._builtin(name), "builtin", None, mtime, datetime.now())
+
+    def _mtime(self, name: str) -> Optional[float]:
+        try:
+            return os.stat(dataset_path(self.directory, name)).st_mtime
+        except OSError:
+            return None
+
+    def get(self, name: str) -> Any:
+        """Current data for `name` (loads on first use, reloads when the file changed)"""
+        loaded = self._loaded.get(name)
+        now = time.monotonic()
+        if loaded is not None and now < self._next_check.get(name, 0):
+            return loaded.data
+
+        if name not in self.names:
+            raise KeyError(f"Unknown dataset '{name}'")
+        with self._lock:
+            loaded = self._loaded.get(name)
+            if loaded is None or now >= self._next_check.get(name, 0):
+                mtime = self._mtime(name)
+                if loaded is None or mtime != loaded.mtime:
+                    if loaded is not None:
+                        logger.info(f"🔄 Dataset {name} changed on disk, reloading")
+                    loaded = self._load(name, mtime)
+                    self._loaded[name] = loaded      # the atomic swap
+                self._next_check[name] = now + self.check_interval
+        return loaded.data
+
+    def reload(self, name: Optional[str] = None) -> None:
+        """Force the next get() to re-check the file(s)"""
+        with self._lock:
+            for key in ([name] if name else list(self._next_check)):
+                self._next_check[key] = 0
+
+    def status(self) -> Dict[str, dict]:
+        result = {}
+        for name in self.names:
+            loaded = self._loaded.get(name)
+            header = read_header(dataset_path(self.directory, name))
+            result[name] = {
+                "loaded": loaded is not None,
+                "source": loaded.source if loaded else None,
+                "version": loaded.version if loaded else None,
+                "loaded_at": loaded.loaded_at.isoformat() if loaded else None,
+                "file_version": header.get("version") if header else None,
+            }
+        return result
@@ -0,0 +1,85 @@
+"""
+Request Deadlines
+End-to-end latency budget for one request, visible to every upstream call it makes
+
+FEATURES:
+- The budget is set once per request and read through a ContextVar, so it follows
+  the request into FastAPI's threadpool without changing function signatures
+- Upstream calls cap their timeout at the time remaining and fail fast once it is spent
+- Handlers record why fallback data was served, for the response header
+- bind() carries the deadline (and the rest of the request context: trace span, log route)
+  into worker threads of a ThreadPoolExecutor
+- detach() does the opposite for work that outlives the request (BackgroundTasks): it runs
+  in a fresh context, so it is not cut short by the finished request's budget
+
+Usage:
+    deadline = Deadline(4.0)
+    with deadline_scope(deadline):
+        timeout = current_deadline().cap(5)     # <= 4s, shrinking as time passes
+    if deadline.fallback_reason:
+        response.headers["X-Data-Fallback"] = deadline.fallback_reason
+"""
+
+import contextvars
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, Optional
+
+
+class DeadlineExceeded(Exception):
+    """The request's latency budget is spent; skip remaining upstream calls"""
+
+
+class Deadline:
+    def __init__(self, budget_seconds: float):
+        self.budget_seconds = budget_seconds
+        self.expires_at = time.monotonic() + budget_seconds
+        # Set when the response was built from fallback data ("deadline" / "upstream")
+        self.fallback_reason: Optional[str] = None
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def cap(self, timeout: float) -> float:
+        """The smaller of `timeout` and the time left; raises once nothing is left"""
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded(f"{self.budget_seconds}s request budget exhausted")
+        return min(timeout, remaining)
+
+
+_current_deadline: ContextVar[Optional[Deadline]] = ContextVar("request_deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[Deadline]) -> Iterator[Optional[Deadline]]:
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def bind(func: Callable) -> Callable:
+    """Wrap `func` so it runs under the caller's deadline (and other context variables) in another thread"""
+    context = contextvars.copy_context()
+
+    def wrapper(*args, **kwargs):
+        # One copy per call: a Context can't be entered by two worker threads at once
+        return context.copy().run(func, *args, **kwargs)
+    return wrapper
+
+
+def detach(func: Callable) -> Callable:
+    """Wrap `func` so it runs in a fresh, empty context: no deadline, trace span or log route"""
+    def wrapper(*args, **kwargs):
+        return contextvars.Context().run(func, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,112 @@
+"""
+Server-Sent Events Broadcaster
+Fan-out of data refresh notifications to many idle SSE connections
+
+FEATURES:
+- publish() can be called from any thread (e.g. FastAPI threadpool handlers)
+- Each event is serialized once, not once per subscriber
+- Idle subscribers all wait on one shared future, so a publish is a single wake-up
+- Bounded replay buffer: reconnecting clients resume from Last-Event-ID
+- Periodic keep-alive comments so proxies don't drop idle streams
+
+Usage:
+    broadcaster = EventBroadcaster()
+    broadcaster.publish("refresh", {"dataset": "budget", "year": "2026", "version": 7})
+
+    @app.get("/events")
+    async def events(request: Request):
+        return StreamingResponse(broadcaster.stream(request.headers.get("last-event-id")),
+                                 media_type="text/event-stream")
+"""
+
+import asyncio
+import json
+import threading
+from collections import deque
+from typing import AsyncIterator, Optional
+
+
+class EventBroadcaster:
+    """Thread-safe publisher with a shared-wakeup asyncio fan-out"""
+
+    def __init__(self, buffer_size: int = 1000, heartbeat_seconds: float = 15.0,
+                 retry_ms: int = 5000, max_subscribers: int = 10000):
+        self.heartbeat_seconds = heartbeat_seconds
+        self.retry_ms = retry_ms
+        self.max_subscribers = max_subscribers
+        self.subscribers = 0
+        self._seq = 0
+        self._buffer: deque = deque(maxlen=buffer_size)   # (seq, encoded frame)
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._waiter: Optional[asyncio.Future] = None
+
+    def publish(self, event: str, data: dict) -> int:
+        """Queue an event for every subscriber. Safe to call from any thread."""
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+            frame = f"id: {seq}\nevent: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+            self._buffer.append((seq, frame))
+            loop = self._loop
+
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._wake)
+        return seq
+
+    def _wake(self) -> None:
+        """Resolve the shared waiter (runs on the event loop)"""
+        waiter, self._waiter = self._waiter, None
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    def _current_waiter(self) -> asyncio.Future:
+        if self._waiter is None or self._waiter.done():
+            self._waiter = self._loop.create_future()
+        return self._waiter
+
+    def _frames_after(self, seq: int) -> list:
+        with self._lock:
+            if not self._buffer or self._buffer[-1][0] <= seq:
+                return []
+            return [(s, frame) for s, frame in self._buffer if s > seq]
+
+    def is_full(self) -> bool:
+        return self.subscribers >= self.max_subscribers
+
+    async def stream(self, last_event_id: Optional[str] = None,
+                     hello: Optional[dict] = None) -> AsyncIterator[str]:
+        """
+        Async generator of SSE frames for one client.
+
+        Args:
+            last_event_id: Value of the Last-Event-ID header; replays newer buffered events
+            hello: Optional payload sent first as a 'hello' event (e.g. current versions)
+        """
+        self._loop = asyncio.get_running_loop()
+        try:
+            last_seq = int(last_event_id) if last_event_id else self._seq
+        except ValueError:
+            last_seq = self._seq
+
+        self.subscribers += 1
+        try:
+            yield f"retry: {self.retry_ms}\n\n"
+            if hello is not None:
+                yield f"event: hello\ndata: {json.dumps(hello, separators=(',', ':'))}\n\n"
+
+            while True:
+                # Take the waiter before reading, so a publish in between still wakes us
+                waiter = self._current_waiter()
+                frames = self._frames_after(last_seq)
+                if frames:
+                    for seq, frame in frames:
+                        yield frame
+                        last_seq = seq
+                    continue
+                try:
+                    await asyncio.wait_for(asyncio.shield(waiter), self.heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+        finally:
+            self.subscribers -= 1
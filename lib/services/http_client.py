@@ -0,0 +1,217 @@
+"""
+Shared HTTP Client for Upstream Government APIs
+One pooled keep-alive session for data.gov.in, CKAN, indiabudget.gov.in and OGD
+
+FEATURES:
+- Connection pooling + keep-alive (one TCP/TLS handshake per host, not per call)
+- Retry with exponential backoff on connection errors and 429/5xx responses;
+  retries_within() sizes the retry count to what a request deadline can still afford
+- Per-URL validator storage (ETag / Last-Modified) for conditional requests
+- 304 Not Modified responses are replayed from the stored body
+
+Usage:
+    from lib.services.http_client import http_get
+
+    response = http_get(url, params=params, timeout=5)
+    response.raise_for_status()
+    data = response.json()
+    if getattr(response, "from_cache", False):
+        ...  # upstream answered 304, body replayed from the validator store
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.util.retry import Retry
+
+from lib.services.structured_logging import HOT
+
+logger = logging.getLogger(__name__)
+
+# Pool settings - sized for the FastAPI threadpool plus background refreshes
+POOL_CONNECTIONS = 10      # number of distinct hosts kept alive
+POOL_MAXSIZE = 20          # concurrent connections per host
+RETRY_TOTAL = 2
+RETRY_BACKOFF = 0.3        # 0.3s, 0.6s ...
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Validator store settings
+VALIDATOR_MAX_ENTRIES = 256
+VALIDATOR_MAX_BODY_BYTES = 5 * 1024 * 1024   # bodies larger than this are not replayable
+
+USER_AGENT = "Zintel-DataFetcher/1.0 (+https://zintel.in)"
+
+
+class ValidatorStore:
+    """Thread-safe LRU of {url: (etag, last_modified, headers, body)} for conditional GETs"""
+
+    def __init__(self, max_entries: int = VALIDATOR_MAX_ENTRIES,
+                 max_body_bytes: int = VALIDATOR_MAX_BODY_BYTES):
+        self.max_entries = max_entries
+        self.max_body_bytes = max_body_bytes
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None:
+                self._entries.move_to_end(url)
+            return entry
+
+    def save(self, url: str, response: requests.Response) -> None:
+        """Remember the validators and body of a 200 response (if it has any validators)"""
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+        body = response.content
+        if len(body) > self.max_body_bytes:
+            return
+
+        with self._lock:
+            self._entries[url] = {
+                "etag": etag,
+                "last_modified": last_modified,
+                "headers": dict(response.headers),
+                "body": body,
+                "encoding": response.encoding,
+            }
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def forget(self, url: str) -> None:
+        with self._lock:
+            self._entries.pop(url, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# retry count -> session; all share the pool settings
+_sessions: Dict[int, requests.Session] = {}
+_session_lock = threading.Lock()
+validator_store = ValidatorStore()
+
+
+def _retry_count(retries: Union[bool, int]) -> int:
+    """True -> RETRY_TOTAL, False -> 0, an int is used as is (capped at RETRY_TOTAL)"""
+    if isinstance(retries, bool):
+        return RETRY_TOTAL if retries else 0
+    return max(0, min(int(retries), RETRY_TOTAL))
+
+
+def retries_within(budget: float, timeout: float) -> int:
+    """
+    Most retries (up to RETRY_TOTAL) whose worst case - every attempt hitting `timeout`
+    plus the backoff sleeps between them - still fits in `budget` seconds
+    """
+    for retries in range(RETRY_TOTAL, 0, -1):
+        backoff = sum(RETRY_BACKOFF * 2 ** i for i in range(retries))
+        if (retries + 1) * timeout + backoff <= budget:
+            return retries
+    return 0
+
+
+def _build_session(retries: int = RETRY_TOTAL) -> requests.Session:
+    retry = Retry(
+        total=retries,
+        backoff_factor=RETRY_BACKOFF,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=POOL_MAXSIZE,
+        max_retries=retry if retries else 0,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"User-Agent": USER_AGENT})
+    return session
+
+
+def get_session(retries: Union[bool, int] = True) -> requests.Session:
+    """Return the process-wide pooled session for a retry count (created lazily)"""
+    retries = _retry_count(retries)
+    session = _sessions.get(retries)
+    if session is None:
+        with _session_lock:
+            session = _sessions.get(retries)
+            if session is None:
+                session = _sessions[retries] = _build_session(retries)
+    return session
+
+
+def _replay(entry: dict, url: str) -> requests.Response:
+    """Build a 200 response from a stored validator entry"""
+    response = requests.Response()
+    response.status_code = 200
+    response._content = entry["body"]
+    response.headers = CaseInsensitiveDict(entry["headers"])
+    response.encoding = entry["encoding"]
+    response.url = url
+    response.from_cache = True
+    return response
+
+
+def http_get(url: str, params: dict = None, timeout: float = 10,
+             conditional: bool = True, headers: Dict[str, str] = None,
+             retries: Union[bool, int] = True, **kwargs) -> requests.Response:
+    """
+    GET through the shared pooled session.
+
+    Args:
+        url: Upstream URL
+        params: Query parameters
+        timeout: Seconds (or (connect, read) tuple) per attempt
+        conditional: Send If-None-Match / If-Modified-Since from the validator store
+        headers: Extra request headers
+        retries: Retry connection errors / 429 / 5xx with backoff: True for RETRY_TOTAL
+            retries, False for none, or a count. Callers working to a deadline pass
+            retries_within(remaining, timeout) and fail over once that is 0.
+        **kwargs: Passed through to requests (verify, stream, ...)
+
+    Returns:
+        requests.Response. A 304 from upstream is returned as a 200 replay of the
+        stored body with ``response.from_cache = True``.
+    """
+    session = get_session(retries)
+    request_headers = dict(headers or {})
+
+    # Streaming responses are consumed by the caller, so they can't be stored or replayed
+    use_validators = conditional and not kwargs.get("stream")
+    key = requests.Request("GET", url, params=params).prepare().url
+    entry = validator_store.get(key) if use_validators else None
+    if entry:
+        if entry["etag"]:
+            request_headers.setdefault("If-None-Match", entry["etag"])
+        if entry["last_modified"]:
+            request_headers.setdefault("If-Modified-Since", entry["last_modified"])
+
+    response = session.get(url, params=params, timeout=timeout, headers=request_headers, **kwargs)
+
+    if response.status_code == 304 and entry:
+        logger.info("♻️ 304 Not Modified: %s", key, extra=HOT)
+        response.close()
+        replayed = _replay(entry, key)
+        replayed.elapsed = response.elapsed     # the revalidation round trip
+        return replayed
+
+    response.from_cache = False
+    if use_validators and response.status_code == 200:
+        validator_store.save(key, response)
+    return response
@@ -0,0 +1,153 @@
+"""
+Memory Profiling Helpers
+tracemalloc snapshots with call-to-call diffs, plus deep sizes of cached/fallback datasets
+
+FEATURES:
+- deep_sizeof() walks dicts, lists, tuples, sets, dataclasses and __slots__ objects,
+  counting shared objects (interned strings, small ints) once
+- MemoryProfiler keeps the previous tracemalloc snapshot so each call reports what grew
+- Process RSS from /proc (Linux) or getrusage peak elsewhere
+
+Usage:
+    profiler = MemoryProfiler()
+    profiler.start(frames=1)
+    report = profiler.snapshot(limit=20)     # top allocations + diff vs last call
+    size = deep_sizeof(cache_store.current.entries["budget_2026"])
+"""
+
+import gc
+import sys
+import threading
+import tracemalloc
+from typing import Any, Dict, Optional
+
+GROUP_BY = ("lineno", "filename", "traceback")
+
+
+def deep_sizeof(obj: Any, seen: Optional[set] = None) -> int:
+    """Approximate bytes reachable from `obj` (each object counted once)"""
+    seen = set() if seen is None else seen
+    total = 0
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current)
+
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+        elif isinstance(current, (str, bytes, int, float, bool, type(None))):
+            continue
+        else:
+            if hasattr(current, "__dict__"):
+                stack.append(current.__dict__)
+            for slot in getattr(type(current), "__slots__", ()):
+                if hasattr(current, slot):
+                    stack.append(getattr(current, slot))
+    return total
+
+
+def process_rss_bytes() -> Dict[str, Optional[int]]:
+    """Current and peak resident set size of this worker"""
+    current = peak = None
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    current = int(line.split()[1]) * 1024
+                elif line.startswith("VmHWM:"):
+                    peak = int(line.split()[1]) * 1024
+    except OSError:
+        try:
+            import resource
+            usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            # ru_maxrss is KiB on Linux, bytes on macOS
+            peak = usage if sys.platform == "darwin" else usage * 1024
+        except ImportError:     # Windows
+            pass
+    return {"rss": current, "peak_rss": peak}
+
+
+def _stat_dict(stat) -> dict:
+    frame = stat.traceback[0]
+    item = {
+        "location": f"{frame.filename}:{frame.lineno}",
+        "size_bytes": stat.size,
+        "count": stat.count,
+    }
+    if hasattr(stat, "size_diff"):
+        item["size_diff_bytes"] = stat.size_diff
+        item["count_diff"] = stat.count_diff
+    if len(stat.traceback) > 1:
+        item["traceback"] = [f"{f.filename}:{f.lineno}" for f in stat.traceback]
+    return item
+
+
+class MemoryProfiler:
+    """tracemalloc control with a remembered baseline for diffs"""
+
+    def __init__(self):
+        self._previous: Optional[tracemalloc.Snapshot] = None
+        self._lock = threading.Lock()
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = 1) -> None:
+        """Begin tracing (allocations made before this are invisible to tracemalloc)"""
+        with self._lock:
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+            tracemalloc.start(frames)
+            self._previous = None
+
+    def stop(self) -> None:
+        with self._lock:
+            tracemalloc.stop()
+            self._previous = None
+
+    def snapshot(self, limit: int = 20, group_by: str = "lineno") -> dict:
+        """Top allocation sites now, and the sites that grew most since the last call"""
+        if group_by not in GROUP_BY:
+            raise ValueError(f"group_by must be one of: {', '.join(GROUP_BY)}")
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc is not running; start it first")
+
+        gc.collect()
+        with self._lock:
+            snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+                tracemalloc.Filter(False, "<unknown>"),
+            ))
+            previous, self._previous = self._previous, snapshot
+
+        traced, peak = tracemalloc.get_traced_memory()
+        report = {
+            "traced_bytes": traced,
+            "traced_peak_bytes": peak,
+            "group_by": group_by,
+            "top": [_stat_dict(s) for s in snapshot.statistics(group_by)[:limit]],
+            "diff": None,
+        }
+        if previous is not None:
+            growth = [s for s in snapshot.compare_to(previous, group_by) if s.size_diff]
+            report["diff"] = [_stat_dict(s) for s in growth[:limit]]
+        return report
+
+    def status(self) -> dict:
+        traced, peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+        return {
+            "tracing": tracemalloc.is_tracing(),
+            "frames": tracemalloc.get_traceback_limit() if tracemalloc.is_tracing() else 0,
+            "traced_bytes": traced,
+            "traced_peak_bytes": peak,
+            "has_baseline": self._previous is not None,
+        }
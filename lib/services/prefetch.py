@@ -0,0 +1,241 @@
+"""
+Speculative Prefetch
+Learns which route a client asks for next and warms that cache key in the background
+
+FEATURES:
+- Per-client sessions feed a first-order transition model: route -> (next route, year delta),
+  so "overview 2026 -> ministries 2026 -> overview 2025" generalizes to every year
+- Predictions need a minimum number of observations and a minimum probability
+- Background warming on a small dedicated pool, never on the request path
+- Budget cap: warm-up time is charged against a token bucket of seconds per window;
+  when it is empty, predictions are dropped instead of queued
+- Keys that just failed to warm are cooled down, and in-flight keys are not scheduled twice
+- Bounded memory: only years the server has data for are learned or predicted, each route
+  keeps at most max_transitions next-steps, and the cooldown/warmed key sets are capped
+
+Usage:
+    model = TransitionModel(session_ttl=600, years=("2025", "2026"))
+    prefetcher = Prefetcher(warm=warm_key, budget_seconds=10, window_seconds=60)
+    model.observe("ip:1.2.3.4", "/budget/overview", "2026")
+    for route, year, probability in model.predict("/budget/overview", "2026"):
+        prefetcher.schedule(f"budget_{year}")
+"""
+
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Collection, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _year_delta(year: str, next_year: str) -> Optional[int]:
+    if year.isdigit() and next_year.isdigit():
+        return int(next_year) - int(year)
+    return 0 if year == next_year else None
+
+
+class TransitionModel:
+    """Thread-safe route transition counts, built from consecutive requests of one client"""
+
+    def __init__(self, session_ttl: float = 600.0, max_sessions: int = 10000,
+                 min_samples: int = 3, years: Optional[Collection[str]] = None,
+                 max_transitions: int = 64):
+        """
+        Args:
+            session_ttl: Seconds after which a client's next request starts a new session
+            max_sessions: Clients remembered at once (least recently seen are evicted)
+            min_samples: Transitions seen from a route before it is used for predictions
+            years: Years with data; requests for other years are ignored and never predicted
+                (the year comes from the client, so it is otherwise unbounded)
+            max_transitions: Distinct (next route, year delta) counts kept per route; the
+                least frequent is evicted to make room
+        """
+        self.session_ttl = session_ttl
+        self.max_sessions = max_sessions
+        self.min_samples = min_samples
+        self.years = frozenset(years) if years is not None else None
+        self.max_transitions = max_transitions
+        self._sessions: "OrderedDict[str, Tuple[str, str, float]]" = OrderedDict()
+        self._transitions: Dict[str, Counter] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, client: str, route: str, year: str) -> None:
+        """Record that `client` requested `route` for `year`"""
+        if self.years is not None and year not in self.years:
+            return
+        now = time.monotonic()
+        with self._lock:
+            previous = self._sessions.pop(client, None)
+            if previous is not None and now - previous[2] <= self.session_ttl:
+                prev_route, prev_year, _ = previous
+                delta = _year_delta(prev_year, year)
+                if delta is not None and (prev_route, delta) != (route, 0):
+                    counts = self._transitions.setdefault(prev_route, Counter())
+                    transition = (route, delta)
+                    if transition not in counts and len(counts) >= self.max_transitions:
+                        del counts[min(counts, key=counts.get)]
+                    counts[transition] += 1
+            self._sessions[client] = (route, year, now)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def predict(self, route: str, year: str, limit: int = 3,
+                min_probability: float = 0.2) -> List[Tuple[str, str, float]]:
+        """Most likely (next route, next year, probability) after `route` for `year`"""
+        with self._lock:
+            counts = self._transitions.get(route)
+            if not counts:
+                return []
+            total = sum(counts.values())
+            ranked = counts.most_common()
+        if total < self.min_samples:
+            return []
+
+        predictions = []
+        for (next_route, delta), count in ranked:
+            probability = count / total
+            if probability < min_probability or len(predictions) >= limit:
+                break
+            if delta and not year.isdigit():
+                continue
+            next_year = str(int(year) + delta) if delta else year
+            if self.years is not None and next_year not in self.years:
+                continue
+            predictions.append((next_route, next_year, round(probability, 3)))
+        return predictions
+
+    def snapshot(self, top: int = 5) -> dict:
+        with self._lock:
+            routes = {route: (sum(counts.values()), counts.most_common(top))
+                      for route, counts in self._transitions.items()}
+            sessions = len(self._sessions)
+        return {
+            "sessions": sessions,
+            "routes": {
+                route: {
+                    "samples": total,
+                    "next": [
+                        {"route": next_route, "year_delta": delta, "probability": round(count / total, 3)}
+                        for (next_route, delta), count in common
+                    ]
+                }
+                for route, (total, common) in sorted(routes.items())
+            }
+        }
+
+
+class Prefetcher:
+    """Runs warm(key) in the background within a seconds-per-window budget"""
+
+    def __init__(self, warm: Callable[[str], bool], max_workers: int = 2,
+                 budget_seconds: float = 10.0, window_seconds: float = 60.0,
+                 failure_cooldown: float = 60.0, max_keys: int = 1024):
+        """
+        Args:
+            warm: Refreshes one cache key; returns False when it could not (e.g. fallback data)
+            max_workers: Background threads (also the number of keys warmed at once)
+            budget_seconds: Warm-up time (CPU + I/O wait) allowed per window
+            window_seconds: Budget refill period
+            failure_cooldown: Seconds before a key that failed to warm is tried again
+            max_keys: Cooled-down keys and warmed-but-unused keys remembered (each set)
+        """
+        self.max_workers = max_workers
+        self.budget_seconds = budget_seconds
+        self.window_seconds = window_seconds
+        self.failure_cooldown = failure_cooldown
+        self.max_keys = max_keys
+        self._warm = warm
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self._budget = budget_seconds
+        self._refilled_at = time.monotonic()
+        self._in_flight: set = set()
+        self._cooldown: Dict[str, float] = {}
+        # Warmed keys not yet served (insertion ordered, so the oldest are dropped first)
+        self._prefetched: "OrderedDict[str, None]" = OrderedDict()
+        self._stats = Counter()
+        self._wall_seconds = 0.0
+        self._cpu_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        rate = self.budget_seconds / self.window_seconds
+        self._budget = min(self.budget_seconds, self._budget + (now - self._refilled_at) * rate)
+        self._refilled_at = now
+
+    def schedule(self, key: str) -> bool:
+        """Queue a background warm-up of `key`; False when skipped"""
+        now = time.monotonic()
+        with self._lock:
+            if key in self._in_flight:
+                self._stats["skipped_in_flight"] += 1
+                return False
+            if self._cooldown.get(key, 0) > now:
+                self._stats["skipped_cooldown"] += 1
+                return False
+            self._refill(now)
+            # Never queue behind busy workers: a prediction is only worth warming right away
+            if self._budget <= 0 or len(self._in_flight) >= self.max_workers:
+                self._stats["skipped_budget"] += 1
+                return False
+            self._in_flight.add(key)
+            self._stats["scheduled"] += 1
+        self._pool.submit(self._run, key)
+        return True
+
+    def _run(self, key: str) -> None:
+        started, cpu_started = time.perf_counter(), time.thread_time()
+        try:
+            warmed = self._warm(key)
+        except Exception as e:
+            logger.error(f"❌ Prefetch of {key} failed: {str(e)}")
+            warmed = False
+        elapsed = time.perf_counter() - started
+        cpu = time.thread_time() - cpu_started
+
+        with self._lock:
+            self._in_flight.discard(key)
+            self._refill(time.monotonic())
+            self._budget -= elapsed
+            self._wall_seconds += elapsed
+            self._cpu_seconds += cpu
+            if warmed:
+                self._stats["warmed"] += 1
+                self._prefetched[key] = None
+                self._prefetched.move_to_end(key)
+                while len(self._prefetched) > self.max_keys:
+                    self._prefetched.popitem(last=False)
+                self._cooldown.pop(key, None)
+            else:
+                self._stats["failed"] += 1
+                now = time.monotonic()
+                if len(self._cooldown) >= self.max_keys:
+                    self._cooldown = {k: until for k, until in self._cooldown.items() if until > now}
+                    while len(self._cooldown) >= self.max_keys:
+                        del self._cooldown[min(self._cooldown, key=self._cooldown.get)]
+                self._cooldown[key] = now + self.failure_cooldown
+
+    def record_hit(self, key: str) -> None:
+        """A request was answered from a key this prefetcher warmed"""
+        with self._lock:
+            if self._prefetched.pop(key, 0) is None:
+                self._stats["useful"] += 1
+
+    def status(self) -> dict:
+        with self._lock:
+            self._refill(time.monotonic())
+            warmed = self._stats["warmed"]
+            return {
+                **{name: self._stats[name] for name in (
+                    "scheduled", "warmed", "failed", "useful",
+                    "skipped_budget", "skipped_in_flight", "skipped_cooldown")},
+                "hit_ratio": round(self._stats["useful"] / warmed, 3) if warmed else None,
+                "in_flight": sorted(self._in_flight),
+                "budget_seconds": self.budget_seconds,
+                "window_seconds": self.window_seconds,
+                "budget_remaining": round(max(0.0, self._budget), 3),
+                "wall_seconds": round(self._wall_seconds, 3),
+                "cpu_seconds": round(self._cpu_seconds, 3),
+            }
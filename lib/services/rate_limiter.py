@@ -0,0 +1,82 @@
+"""
+In-process Token-Bucket Rate Limiter
+Per-client request quotas for the public finance API
+
+FEATURES:
+- One bucket per client key (IP address or API key), refilled lazily on access
+- O(1) per request: a dict lookup, a little arithmetic and an LRU move
+- Bounded memory: least-recently-seen clients are evicted beyond max_clients
+- Weighted costs so expensive requests drain the bucket faster
+
+Usage:
+    limiter = TokenBucketLimiter(rate=1.0, capacity=60)
+    decision = limiter.consume("ip:1.2.3.4", cost=3)
+    if not decision.allowed:
+        ...  # respond 429 with Retry-After: decision.retry_after
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+
+class RateLimitDecision(NamedTuple):
+    allowed: bool
+    limit: int            # bucket capacity
+    remaining: int        # whole tokens left after this request
+    reset: int            # seconds until the bucket is full again
+    retry_after: int      # seconds until `cost` tokens are available (0 when allowed)
+
+
+class TokenBucketLimiter:
+    """Thread-safe token buckets keyed by client, with LRU eviction"""
+
+    def __init__(self, rate: float, capacity: int, max_clients: int = 10000):
+        """
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum burst size (tokens)
+            max_clients: Buckets kept in memory before the least recent is evicted
+        """
+        self.rate = float(rate)
+        self.capacity = int(capacity)
+        self.max_clients = max_clients
+        # key -> [tokens, last_refill_monotonic]
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, cost: float = 1) -> RateLimitDecision:
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = [float(self.capacity), now]
+                self._buckets[key] = bucket
+                if len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(self.capacity, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+
+            allowed = bucket[0] >= cost
+            if allowed:
+                bucket[0] -= cost
+            tokens = bucket[0]
+
+        retry_after = 0 if allowed else math.ceil((cost - tokens) / self.rate)
+        reset = math.ceil((self.capacity - tokens) / self.rate)
+        return RateLimitDecision(allowed, self.capacity, int(tokens), reset, retry_after)
+
+    def reset(self, key: str = None) -> None:
+        """Forget one client's bucket, or all of them"""
+        with self._lock:
+            if key is None:
+                self._buckets.clear()
+            else:
+                self._buckets.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
@@ -0,0 +1,152 @@
+"""
+Immutable Versioned Cache Snapshots
+Copy-on-write cache with one atomic reference swap per refresh
+
+FEATURES:
+- Refreshes build a new, deeply frozen snapshot off to the side
+- Publishing is a single reference assignment, so readers never take a lock
+  and never observe a half-applied refresh
+- Writers are serialized, so concurrent refreshes of different keys can't lose updates
+- The previous N snapshots are kept for rollback
+
+Usage:
+    store = SnapshotStore(history=5)
+    store.publish("budget_2026", CacheEntry(data=freeze(data), source="LIVE_API", ...))
+    entry = store.current.entries.get("budget_2026")    # lock-free read
+    store.rollback()
+"""
+
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Collection, Dict, List, Optional
+
+
+class FrozenDict(dict):
+    """A dict that refuses mutation. Still a dict, so it JSON-encodes like one."""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("cache snapshots are immutable")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __hash__(self):
+        return id(self)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+def freeze(value: Any) -> Any:
+    """Recursively convert dicts to FrozenDicts and lists to tuples"""
+    if isinstance(value, FrozenDict):
+        return value
+    if isinstance(value, dict):
+        return FrozenDict((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    data: Any                       # frozen raw dataset
+    source: str                     # LIVE_API / FALLBACK
+    fetched_at: datetime
+    version: int = 0
+    aggregates: Any = field(default_factory=FrozenDict)   # frozen precomputed views
+
+    def as_dict(self) -> dict:
+        return {
+            "data": self.data,
+            "source": self.source,
+            "fetched_at": self.fetched_at.isoformat(),
+            "version": self.version
+        }
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    generation: int
+    entries: FrozenDict             # cache_key -> CacheEntry
+    created_at: datetime
+
+
+class SnapshotStore:
+    """Holds the current snapshot plus a bounded history for rollback"""
+
+    def __init__(self, history: int = 5):
+        self.current = Snapshot(0, FrozenDict(), datetime.now())
+        self._history: deque = deque(maxlen=history)
+        self._write_lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        return self.current.entries.get(key)
+
+    def _swap(self, entries: dict) -> Snapshot:
+        previous = self.current
+        self._history.append(previous)
+        snapshot = Snapshot(previous.generation + 1, FrozenDict(entries), datetime.now())
+        self.current = snapshot     # the atomic publish
+        return snapshot
+
+    def publish(self, key: str, build_entry: Callable[[Optional[CacheEntry]], CacheEntry]) -> CacheEntry:
+        """
+        Publish a new entry for `key`.
+
+        `build_entry` receives the entry currently published for `key` (or None) and returns
+        the replacement; it runs under the writer lock so it sees the latest state.
+        """
+        with self._write_lock:
+            entry = build_entry(self.current.entries.get(key))
+            entries = dict(self.current.entries)
+            entries[key] = entry
+            self._swap(entries)
+            return entry
+
+    def publish_many(self, builders: Dict[str, Callable[[Optional[CacheEntry]], CacheEntry]],
+                     remove: Collection[str] = ()) -> Dict[str, CacheEntry]:
+        """Publish several keys, and drop `remove`, in a single snapshot swap (same contract as publish())"""
+        with self._write_lock:
+            entries = dict(self.current.entries)
+            published = {key: build(entries.get(key)) for key, build in builders.items()}
+            entries.update(published)
+            for key in remove:
+                entries.pop(key, None)
+            self._swap(entries)
+            return published
+
+    def remove(self, keys: List[str]) -> int:
+        """Drop keys from the cache (one swap for all of them). Returns how many were removed."""
+        with self._write_lock:
+            entries = {k: v for k, v in self.current.entries.items() if k not in set(keys)}
+            removed = len(self.current.entries) - len(entries)
+            if removed:
+                self._swap(entries)
+            return removed
+
+    def previous(self, steps: int = 1) -> Snapshot:
+        """The snapshot that was current `steps` publishes ago"""
+        history = list(self._history)
+        if steps < 1 or steps > len(history):
+            raise ValueError(f"can look back 1-{len(history)} steps")
+        return history[-steps]
+
+    def rollback(self, steps: int = 1) -> Snapshot:
+        """Re-publish the snapshot from `steps` refreshes ago (as a new generation)"""
+        with self._write_lock:
+            if steps < 1 or steps > len(self._history):
+                raise ValueError(f"can roll back 1-{len(self._history)} steps")
+            target = self._history[-steps]
+            return self._swap(dict(target.entries))
+
+    def history(self) -> List[Dict[str, Any]]:
+        return [
+            {"generation": s.generation, "created_at": s.created_at.isoformat(), "keys": len(s.entries)}
+            for s in list(self._history)
+        ]
@@ -0,0 +1,249 @@
+"""
+Static API Snapshot Export
+Renders GET routes of an ASGI app to pre-compressed JSON files for CDN/static hosting
+
+FEATURES:
+- Pages are rendered in-process through the full ASGI stack (middleware included), so the
+  files hold exactly the bytes the live server would send; no HTTP client needed
+- Directory tree mirrors the URL space: /budget/overview?year=2025 -> budget/overview/2025/index.json.gz
+- Deterministic gzip (mtime=0) and content ETags: unchanged pages are not rewritten,
+  so a rebuild after a refresh only touches what changed. Render-time stamps
+  (top-level "updated", "timestamp", ...) are left out of the ETag hash, and pages can be
+  rendered with `random` seeded per URL so demo routes with jittered figures are stable
+- Every file is written atomically; pages that disappeared are removed
+- manifest.json (written last) maps each URL to its file, ETag and sizes
+
+Usage:
+    pages = asyncio.run(render_pages(app, ["/budget/overview", "/budget/overview?year=2025"]))
+    manifest = write_static_tree("public/static-api", pages)
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import random
+import tempfile
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional
+from urllib.parse import unquote, urlsplit
+
+MANIFEST_NAME = "manifest.json"
+INDEX_NAME = "index.json.gz"
+# Top-level response fields that hold the render time, not data (datetime.now() in the handlers)
+VOLATILE_FIELDS = ("updated", "timestamp", "last_updated", "generated_at")
+
+
+class RenderedPage(NamedTuple):
+    url: str
+    status: int
+    body: bytes
+    content_type: Optional[str]
+
+
+async def asgi_get(app, url: str) -> RenderedPage:
+    """Run one GET request through an ASGI app and collect the response"""
+    parts = urlsplit(url)
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": unquote(parts.path),
+        "raw_path": parts.path.encode("latin-1"),
+        "query_string": parts.query.encode("latin-1"),
+        "root_path": "",
+        "headers": [(b"host", b"static-export"), (b"accept", b"application/json")],
+        "client": ("127.0.0.1", 0),
+        "server": ("static-export", 80),
+    }
+    received = False
+    finished = asyncio.Event()
+
+    async def receive():
+        nonlocal received
+        if received:
+            # Middleware listening for a disconnect must not see one before the response is done
+            await finished.wait()
+            return {"type": "http.disconnect"}
+        received = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    status, content_type, chunks = 500, None, []
+
+    async def send(message):
+        nonlocal status, content_type
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            for name, value in message.get("headers", []):
+                if name.lower() == b"content-type":
+                    content_type = value.decode("latin-1")
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                finished.set()
+
+    try:
+        await app(scope, receive, send)
+    except Exception:
+        # Servers re-raise unhandled errors after sending the 500; the page is simply not exported
+        status = 500
+    return RenderedPage(url, status, b"".join(chunks), content_type)
+
+
+async def render_pages(app, urls: Iterable[str], seed_random: bool = False) -> List[RenderedPage]:
+    """
+    Render URLs one at a time. seed_random seeds the `random` module with each URL first
+    (and restores its state afterwards), so handlers that jitter values render the same bytes
+    on every export instead of a new ETag each run.
+    """
+    if not seed_random:
+        return [await asgi_get(app, url) for url in urls]
+    state = random.getstate()
+    try:
+        pages = []
+        for url in urls:
+            random.seed(url)
+            pages.append(await asgi_get(app, url))
+        return pages
+    finally:
+        random.setstate(state)
+
+
+def page_file(url: str) -> str:
+    """Relative file for a URL: the path as directories, then each query value, then index.json.gz"""
+    parts = urlsplit(url)
+    segments = [unquote(s) for s in parts.path.strip("/").split("/") if s]
+    for pair in filter(None, parts.query.split("&")):
+        segments.append(unquote(pair.partition("=")[2]))
+    for segment in segments:
+        if segment in ("", ".", "..") or "/" in segment or "\\" in segment:
+            raise ValueError(f"cannot map '{url}' to a file path")
+    return "/".join(segments + [INDEX_NAME])
+
+
+def content_etag(body: bytes, volatile: Iterable[str] = VOLATILE_FIELDS) -> str:
+    """ETag of a page's content: for a JSON object, the `volatile` top-level fields are ignored"""
+    volatile = tuple(volatile)
+    if volatile:
+        try:
+            document = json.loads(body)
+        except ValueError:
+            document = None
+        if isinstance(document, dict) and any(key in document for key in volatile):
+            stable = {key: value for key, value in document.items() if key not in volatile}
+            body = json.dumps(stable, sort_keys=True, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def _atomic_write(path: str, blob: bytes) -> None:
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".export.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(blob)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def read_manifest(directory: str) -> Optional[dict]:
+    try:
+        with open(os.path.join(directory, MANIFEST_NAME), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _remove_page(directory: str, relative: str) -> bool:
+    """Delete a page file and any directories it leaves empty"""
+    path = os.path.join(directory, relative)
+    try:
+        os.unlink(path)
+    except OSError:
+        return False
+    parent = os.path.dirname(path)
+    while os.path.abspath(parent) != os.path.abspath(directory):
+        try:
+            os.rmdir(parent)
+        except OSError:
+            break
+        parent = os.path.dirname(parent)
+    return True
+
+
+def write_static_tree(directory: str, pages: List[RenderedPage], prune: bool = True,
+                      volatile: Iterable[str] = VOLATILE_FIELDS) -> dict:
+    """
+    Write the 200 responses under `directory` and return the manifest.
+    Pages whose ETag (ignoring the `volatile` fields) matches the previous manifest are left
+    untouched, render time included. With prune=False (a partial render, e.g. one year)
+    pages that were not rendered this time are kept.
+    """
+    volatile = tuple(volatile)
+    previous = (read_manifest(directory) or {}).get("pages", {})
+    entries: Dict[str, dict] = {}
+    skipped = []
+    written = unchanged = 0
+
+    for page in pages:
+        if page.status != 200:
+            skipped.append({"url": page.url, "status": page.status})
+            continue
+        relative = page_file(page.url)
+        etag = content_etag(page.body, volatile)
+        path = os.path.join(directory, relative)
+        old = previous.get(page.url)
+        if old and old["etag"] == etag and old["file"] == relative and os.path.exists(path):
+            entries[page.url] = old
+            unchanged += 1
+            continue
+
+        blob = gzip.compress(page.body, compresslevel=9, mtime=0)
+        _atomic_write(path, blob)
+        entries[page.url] = {
+            "file": relative,
+            "etag": etag,
+            "content_type": page.content_type or "application/json",
+            "content_encoding": "gzip",
+            "bytes": len(page.body),
+            "compressed_bytes": len(blob),
+            "rendered_at": datetime.now().isoformat(),
+        }
+        written += 1
+
+    rendered = {page.url for page in pages}
+    if not prune:
+        for url, entry in previous.items():
+            if url not in rendered and url not in entries:
+                entries[url] = entry
+
+    # Files of pages that no longer render (or moved) are removed after the new ones exist
+    current_files = {entry["file"] for entry in entries.values()}
+    removed = sum(
+        _remove_page(directory, entry["file"])
+        for entry in previous.values() if entry["file"] not in current_files
+    )
+
+    manifest = {
+        "generated_at": datetime.now().isoformat(),
+        "pages": dict(sorted(entries.items())),
+        "skipped": skipped,
+        "stats": {
+            "pages": len(entries),
+            "written": written,
+            "unchanged": unchanged,
+            "removed": removed,
+            "skipped": len(skipped),
+            "bytes": sum(e["bytes"] for e in entries.values()),
+            "compressed_bytes": sum(e["compressed_bytes"] for e in entries.values()),
+        },
+    }
+    _atomic_write(os.path.join(directory, MANIFEST_NAME),
+                  json.dumps(manifest, indent=2, ensure_ascii=False).encode("utf-8"))
+    return manifest
@@ -0,0 +1,106 @@
+"""
+Streaming CSV / JSON Parsers
+Yield records one at a time from a chunked HTTP body, without buffering the whole payload
+
+Both parsers take an iterator of text chunks, e.g. ``response.iter_content(decode_unicode=True)``
+from a ``stream=True`` request, so memory stays bounded by the largest single record.
+
+Usage:
+    response = http_get(url, stream=True, timeout=5)
+    for row in iter_csv_rows(response.iter_lines(decode_unicode=True)):
+        ...
+    for item in iter_json_array_items(response.iter_content(65536, decode_unicode=True)):
+        ...
+"""
+
+import codecs
+import csv
+import json
+import re
+from typing import Dict, Iterable, Iterator, Tuple
+
+# Keys whose array holds the records in common government API payloads
+JSON_RECORD_KEYS = ("records", "data", "result")
+
+
+def _text_chunks(chunks: Iterable) -> Iterator[str]:
+    """Decode byte chunks incrementally (multi-byte characters may straddle chunks)"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    for chunk in chunks:
+        yield decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def iter_csv_rows(lines: Iterable[str]) -> Iterator[Dict[str, str]]:
+    """Yield each CSV row as {header: value}, reading lines lazily"""
+    lines = (line.decode("utf-8-sig") if isinstance(line, bytes) else line for line in lines)
+    reader = csv.reader(lines)
+    header = None
+    for row in reader:
+        if not row or not any(cell.strip() for cell in row):
+            continue
+        if header is None:
+            header = [cell.strip().lstrip("\ufeff") for cell in row]
+            continue
+        yield dict(zip(header, row))
+
+
+def iter_json_array_items(chunks: Iterable[str], keys: Tuple[str, ...] = JSON_RECORD_KEYS) -> Iterator:
+    """
+    Yield the elements of the record array in a JSON body as they are decoded.
+
+    The array is either the top-level value or the value of the first of `keys` found
+    (e.g. {"records": [...]}). Anything after the array is ignored.
+    """
+    decoder = json.JSONDecoder()
+    key_pattern = re.compile(r'"(?:%s)"\s*:\s*\[' % "|".join(re.escape(k) for k in keys))
+    chunks = _text_chunks(chunks)
+    buffer = ""
+    pos = None
+
+    # Locate the opening bracket of the record array
+    for chunk in chunks:
+        buffer += chunk
+        stripped = buffer.lstrip()
+        if stripped.startswith("["):
+            pos = len(buffer) - len(stripped) + 1
+            break
+        match = key_pattern.search(buffer)
+        if match:
+            pos = match.end()
+            break
+    if pos is None:
+        return
+
+    while True:
+        # Skip separators between elements
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buffer):
+                break
+            chunk = next(chunks, None)
+            if chunk is None:
+                return
+            buffer, pos = chunk, 0
+
+        if buffer[pos] == "]":
+            return
+
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+            if end == len(buffer) and not isinstance(item, (dict, list)):
+                # A bare scalar at the end of the buffer may be cut short (e.g. 12 of 1234)
+                raise json.JSONDecodeError("incomplete scalar", buffer, pos)
+        except json.JSONDecodeError:
+            # Element is incomplete: read more, dropping what was already consumed
+            chunk = next(chunks, None)
+            if chunk is None:
+                return
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+
+        yield item
+        pos = end
@@ -0,0 +1,176 @@
+"""
+Non-blocking Structured Logging
+JSON log lines written by a background QueueListener, so request threads never wait on I/O
+
+FEATURES:
+- setup_logging() routes the root logger through a bounded QueueHandler; a QueueListener
+  thread formats and writes. A full queue drops the record (counted) instead of blocking
+- JsonFormatter: one JSON object per line with ts, level, logger, msg, the current route,
+  any `extra=` fields and the formatted exception (formatted in the listener thread)
+- Hot-path sampling: records logged with extra=HOT are kept with a per-route probability
+  (e.g. 1% of cache-hit lines on /budget/overview), decided before anything is queued
+- request_route ContextVar: set once per request, follows the request into the threadpool
+
+Usage:
+    pipeline = setup_logging(level="INFO", fmt="json", sample_rates=parse_sample_rates("/budget/overview=0.1"))
+    logger.info("📦 Using cached data for %s", cache_key, extra=HOT)
+    with route_scope("/budget/overview"):
+        ...
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Dict, Iterator, Optional
+
+# Mark a log call as hot-path: logger.info("...", extra=HOT)
+HOT = {"hot": True}
+
+_request_route: ContextVar[Optional[str]] = ContextVar("request_route", default=None)
+
+# Attributes every LogRecord has; anything else came from extra= and is emitted as a field
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "hot", "route"}
+
+
+def current_route() -> Optional[str]:
+    return _request_route.get()
+
+
+@contextmanager
+def route_scope(route: Optional[str]) -> Iterator[None]:
+    token = _request_route.set(route)
+    try:
+        yield
+    finally:
+        _request_route.reset(token)
+
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    """'0.01' or 'default=0.01,/budget/overview=0.1' -> {route or 'default': rate}"""
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        route, _, rate = item.rpartition("=")
+        rates[route or "default"] = min(1.0, max(0.0, float(rate)))
+    return rates
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        route = getattr(record, "route", None)
+        if route:
+            entry["route"] = route
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class HotPathSampler(logging.Filter):
+    """Keeps hot-path records with the current route's probability; everything else passes"""
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = dict(rates)
+        self.default = self.rates.pop("default", 1.0)
+        # Own generator: sampling must not perturb the global random module
+        self._random = random.Random()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.route = _request_route.get()
+        if not getattr(record, "hot", False):
+            return True
+        rate = self.rates.get(record.route, self.default)
+        return rate >= 1.0 or (rate > 0.0 and self._random.random() < rate)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops instead of blocking or raising when the queue is full"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge args now (they may be mutated later) but leave exc_info for the listener to format
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _DrainingListener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # Shutdown may find the queue full: wait for room instead of failing to stop
+        self.queue.put(self._sentinel)
+
+
+class LogPipeline:
+    """Handle on the installed queue handler and listener (status, shutdown)"""
+
+    def __init__(self, handler: NonBlockingQueueHandler, listener: logging.handlers.QueueListener,
+                 sampler: HotPathSampler):
+        self.handler = handler
+        self.listener = listener
+        self.sampler = sampler
+        self._stopped = threading.Event()
+
+    def stop(self) -> None:
+        """Flush what is queued and stop the listener thread"""
+        if not self._stopped.is_set():
+            self._stopped.set()
+            self.listener.stop()
+
+    def status(self) -> dict:
+        return {
+            "queued": self.handler.queue.qsize(),
+            "capacity": self.handler.queue.maxsize,
+            "dropped": self.handler.dropped,
+            "hot_path_sample_rates": {"default": self.sampler.default, **self.sampler.rates},
+        }
+
+
+def setup_logging(level: str = "INFO", fmt: str = "json", sample_rates: Optional[Dict[str, float]] = None,
+                  queue_size: int = 10000, stream=None) -> LogPipeline:
+    """Replace the root logger's handlers with the queue pipeline; returns its handle"""
+    formatter = JsonFormatter() if fmt == "json" else logging.Formatter(
+        "%(asctime)s %(levelname)s %(name)s: %(message)s")
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(formatter)
+
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    handler = NonBlockingQueueHandler(log_queue)
+    sampler = HotPathSampler(sample_rates or {})
+    handler.addFilter(sampler)
+    listener = _DrainingListener(log_queue, output, respect_handler_level=True)
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level.upper())
+    listener.start()
+
+    pipeline = LogPipeline(handler, listener, sampler)
+    atexit.register(pipeline.stop)
+    return pipeline
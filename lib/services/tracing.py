@@ -0,0 +1,417 @@
+"""
+Request Tracing
+Lightweight spans with W3C traceparent propagation, exported as OTLP/JSON
+
+FEATURES:
+- The current span lives in a ContextVar, so child spans opened in FastAPI's threadpool or in
+  bind()-wrapped workers attach to the request that caused them
+- Incoming traceparent headers are continued; the sampling decision stays local (sample_rate)
+  unless trust_incoming is set for callers whose sampled flag may decide, so a public
+  client can't force every request to be traced. inject() adds traceparent upstream
+- Outside a sampled trace every span() is a no-op, so untraced requests and background jobs
+  pay one ContextVar lookup
+- endpoint() / route_handler() wrap a route so one trace separates the wait before the
+  handler runs (threadpool queueing), the handler itself and the response encoding
+- Finished spans are batched by a background thread and written as OTLP/JSON: one
+  ExportTraceServiceRequest per line to a file, or POSTed to a collector's /v1/traces.
+  A full queue drops spans (counted) instead of blocking
+
+Usage:
+    tracer = Tracer(exporter_from_spec("file:logs/traces.jsonl", service_name="finance-api"), sample_rate=0.1)
+    with tracer.request_span("GET /budget/overview", traceparent_header) as root:
+        with tracer.span("get_cached_or_fetch", data_type="budget") as span:
+            span.set("cache.hit", True)
+        headers = tracer.inject({})
+"""
+
+import abc
+import atexit
+import functools
+import inspect
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# OTLP span kinds
+INTERNAL, SERVER, CLIENT = 1, 2, 3
+STATUS_OK, STATUS_ERROR = 1, 2
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+_QUERY_STRING = re.compile(r"\?[^\s'\"()]+")
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "kind", "start_ns", "end_ns",
+                 "attributes", "status", "error")
+
+    def __init__(self, trace_id: str, span_id: str, parent_id: Optional[str], name: str, kind: int,
+                 attributes: Dict, start_ns: Optional[int] = None):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = start_ns or time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes
+        self.status = STATUS_OK
+        self.error: Optional[str] = None
+
+    def set(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def record_error(self, exc: BaseException) -> None:
+        self.status = STATUS_ERROR
+        # URLs in upstream errors carry query strings (data.gov.in api-key): drop them
+        self.error = _QUERY_STRING.sub("?…", f"{type(exc).__name__}: {exc}")
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": [_attribute(k, v) for k, v in self.attributes.items() if v is not None],
+            "status": {"code": self.status, **({"message": self.error} if self.error else {})},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+class _NoopSpan:
+    """Stands in for a span outside a sampled trace; every call does nothing"""
+    __slots__ = ()
+    traceparent = None
+
+    def set(self, key: str, value) -> None:
+        pass
+
+    def record_error(self, exc: BaseException) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+# Per-request timestamps shared between route_handler() and endpoint() (see below)
+_route_timing: ContextVar[Optional[dict]] = ContextVar("route_timing", default=None)
+
+
+def _attribute(key: str, value) -> dict:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def parse_traceparent(header: Optional[str]):
+    """'00-<trace>-<span>-<flags>' -> (trace_id, parent span_id, sampled) or None if invalid"""
+    match = _TRACEPARENT.match((header or "").strip().lower())
+    if not match or match.group(1) == "0" * 32 or match.group(2) == "0" * 16:
+        return None
+    return match.group(1), match.group(2), bool(int(match.group(3), 16) & 1)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+# ==================== EXPORTERS ====================
+
+class BatchExporter(abc.ABC):
+    """Queues finished spans; a background thread exports them in batches"""
+
+    def __init__(self, service_name: str = "finance-api", max_queue: int = 20000,
+                 batch_size: int = 512, flush_interval: float = 2.0):
+        self.service_name = service_name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.exported = 0
+        self.dropped = 0
+        self.failed = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._worker = threading.Thread(target=self._run, name="trace-export", daemon=True)
+        self._worker.start()
+        atexit.register(self.shutdown)
+
+    def submit(self, span: Span) -> None:
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def _drain(self, block: bool) -> List[Span]:
+        batch = []
+        try:
+            if block:
+                batch.append(self._queue.get(timeout=self.flush_interval))
+            while len(batch) < self.batch_size:
+                batch.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._flush(self._drain(block=True))
+        while True:
+            batch = self._drain(block=False)
+            if not batch:
+                return
+            self._flush(batch)
+
+    def _flush(self, batch: List[Span]) -> None:
+        if not batch:
+            return
+        try:
+            self.export(self.payload(batch))
+            self.exported += len(batch)
+        except Exception as e:
+            self.failed += len(batch)
+            logger.warning(f"⚠️ Trace export of {len(batch)} spans failed: {str(e)}")
+
+    def payload(self, batch: List[Span]) -> dict:
+        """OTLP/JSON ExportTraceServiceRequest"""
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [_attribute("service.name", self.service_name)]},
+                "scopeSpans": [{
+                    "scope": {"name": __name__},
+                    "spans": [span.to_otlp() for span in batch],
+                }],
+            }]
+        }
+
+    @abc.abstractmethod
+    def export(self, payload: dict) -> None:
+        """Send one OTLP/JSON payload; raising counts the batch as failed"""
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Export what is queued and stop the worker"""
+        self._stop.set()
+        self._worker.join(timeout)
+
+    def status(self) -> dict:
+        return {"exported": self.exported, "dropped": self.dropped, "failed": self.failed,
+                "queued": self._queue.qsize()}
+
+
+class FileExporter(BatchExporter):
+    """OTLP/JSON lines (the format of the collector's file exporter and otlpjsonfile receiver)"""
+
+    def __init__(self, path: str, **kwargs):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        super().__init__(**kwargs)
+
+    def export(self, payload: dict) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(payload, separators=(",", ":")) + "\n")
+
+
+class OtlpHttpExporter(BatchExporter):
+    """POSTs OTLP/JSON to a collector (e.g. http://localhost:4318/v1/traces)"""
+
+    def __init__(self, endpoint: str, timeout: float = 5.0, headers: Optional[Dict[str, str]] = None,
+                 **kwargs):
+        self.endpoint = endpoint
+        self.timeout = timeout
+        self._session = requests.Session()
+        self._session.headers.update({"Content-Type": "application/json", **(headers or {})})
+        super().__init__(**kwargs)
+
+    def export(self, payload: dict) -> None:
+        response = self._session.post(self.endpoint, data=json.dumps(payload), timeout=self.timeout)
+        response.raise_for_status()
+
+
+def exporter_from_spec(spec: str, **kwargs) -> Optional[BatchExporter]:
+    """'' -> None, 'file:<path>' -> FileExporter, 'otlp:<url>' or 'http(s)://...' -> OtlpHttpExporter"""
+    spec = spec.strip()
+    if not spec:
+        return None
+    if spec.startswith("file:"):
+        return FileExporter(spec[len("file:"):], **kwargs)
+    if spec.startswith("otlp:"):
+        spec = spec[len("otlp:"):]
+    if spec.startswith(("http://", "https://")):
+        if not spec.rstrip("/").endswith("/v1/traces"):
+            spec = spec.rstrip("/") + "/v1/traces"
+        return OtlpHttpExporter(spec, **kwargs)
+    raise ValueError(f"Invalid trace exporter '{spec}'. Use file:<path> or otlp:<collector url>")
+
+
+# ==================== TRACER ====================
+
+class Tracer:
+    def __init__(self, exporter: Optional[BatchExporter] = None, sample_rate: float = 1.0,
+                 trust_incoming: bool = False):
+        """
+        Args:
+            exporter: Where finished spans go; None disables tracing
+            sample_rate: Fraction of requests traced (0-1)
+            trust_incoming: Let an incoming traceparent's sampled flag decide instead of
+                sample_rate. Only for deployments where every caller is trusted.
+        """
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.trust_incoming = trust_incoming
+        # Own generator: ids and sampling must not perturb the global random module
+        self._random = random.Random()
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def _new_id(self, bits: int) -> str:
+        return f"{self._random.getrandbits(bits) or 1:0{bits // 4}x}"
+
+    def _finish(self, span: Span) -> None:
+        span.end_ns = time.time_ns()
+        self.exporter.submit(span)
+
+    @contextmanager
+    def request_span(self, name: str, traceparent: Optional[str] = None, **attributes) -> Iterator:
+        """Root span of a request: continues an incoming trace or starts a new one"""
+        incoming = parse_traceparent(traceparent) if self.enabled else None
+        if incoming:
+            trace_id, parent_id, incoming_sampled = incoming
+        else:
+            trace_id, parent_id, incoming_sampled = self._new_id(128), None, False
+        if incoming and self.trust_incoming:
+            sampled = incoming_sampled
+        else:
+            sampled = self.enabled and self._random.random() < self.sample_rate
+        if not sampled:
+            yield NOOP_SPAN
+            return
+        yield from self._run_span(Span(trace_id, self._new_id(64), parent_id, name, SERVER, attributes))
+
+    @contextmanager
+    def span(self, name: str, kind: int = INTERNAL, **attributes) -> Iterator:
+        """Child of the current span; a no-op outside a sampled trace"""
+        parent = _current_span.get()
+        if parent is None:
+            yield NOOP_SPAN
+            return
+        yield from self._run_span(Span(parent.trace_id, self._new_id(64), parent.span_id, name, kind, attributes))
+
+    def _run_span(self, span: Span):
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_error(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            self._finish(span)
+
+    def record(self, name: str, start_ns: int, end_ns: int, **attributes) -> None:
+        """Add an already finished child span of the current span (e.g. timed elsewhere)"""
+        parent = _current_span.get()
+        if parent is None:
+            return
+        span = Span(parent.trace_id, self._new_id(64), parent.span_id, name, INTERNAL, attributes, start_ns)
+        span.end_ns = end_ns
+        self.exporter.submit(span)
+
+    def inject(self, headers: Dict[str, str]) -> Dict[str, str]:
+        """Add the current span's traceparent to outgoing request headers"""
+        span = _current_span.get()
+        if span is not None:
+            headers["traceparent"] = span.traceparent
+        return headers
+
+    # ---------- route instrumentation ----------
+
+    def endpoint(self, func: Callable, name: str) -> Callable:
+        """Wrap a route endpoint (sync or async) in a 'handler' span, keeping its signature"""
+        def start(timing: Optional[dict]):
+            span = self.span(f"handler {name}")
+            if timing is not None:
+                timing["handler_start_ns"] = time.time_ns()
+            return span
+
+        def done(timing: Optional[dict]) -> None:
+            if timing is not None:
+                timing["handler_end_ns"] = time.time_ns()
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def traced(*args, **kwargs):
+                timing = _route_timing.get()
+                with start(timing) as span:
+                    _set_wait(span, timing)
+                    try:
+                        return await func(*args, **kwargs)
+                    finally:
+                        done(timing)
+        else:
+            @functools.wraps(func)
+            def traced(*args, **kwargs):
+                timing = _route_timing.get()
+                with start(timing) as span:
+                    _set_wait(span, timing)
+                    try:
+                        return func(*args, **kwargs)
+                    finally:
+                        done(timing)
+        return traced
+
+    def route_handler(self, handle: Callable) -> Callable:
+        """Wrap a route's request handler: records 'encode response' after the endpoint returns"""
+        async def traced(request):
+            if _current_span.get() is None:
+                return await handle(request)
+            timing = {"route_start_ns": time.time_ns()}
+            token = _route_timing.set(timing)
+            try:
+                response = await handle(request)
+            finally:
+                _route_timing.reset(token)
+            if "handler_end_ns" in timing:
+                self.record("encode response", timing["handler_end_ns"], time.time_ns(),
+                            **{"http.response.bytes": len(getattr(response, "body", b"") or b"")})
+            return response
+        return traced
+
+    def status(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "sample_rate": self.sample_rate,
+            "trust_incoming": self.trust_incoming,
+            "exporter": type(self.exporter).__name__ if self.exporter else None,
+            **(self.exporter.status() if self.exporter else {}),
+        }
+
+
+def _set_wait(span, timing: Optional[dict]) -> None:
+    # Time from routing to the handler running: request parsing plus threadpool queueing
+    if timing is not None and "route_start_ns" in timing:
+        span.set("wait_before_handler_ms", round((timing["handler_start_ns"] - timing["route_start_ns"]) / 1e6, 3))
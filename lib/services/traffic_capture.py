@@ -0,0 +1,153 @@
+"""
+Traffic Capture
+Compact append-only log of served requests (arrival time, method, path, query, status, latency)
+
+FEATURES:
+- One tab-separated line per request: "<epoch>\t<client>\t<method>\t<path>\t<query>\t<status>\t<ms>"
+- Writes happen on a background thread; a full queue drops the record (counted), so capture
+  never adds I/O to a request
+- Clients are stored as a short HMAC of the address keyed with a random per-recorder salt
+  that is never written out, so ids can't be reversed by hashing the IPv4 space; they are
+  still distinct per client, which is all replay needs (rate limits, prefetch sessions)
+- Size cap: recording stops once the file reaches max_bytes
+- read_capture() parses a file back for replay_traffic.py
+
+Usage:
+    recorder = TrafficRecorder("logs/traffic.tsv", max_bytes=100_000_000)
+    recorder.record(time.time(), "1.2.3.4", "GET", "/budget/overview", "year=2025", 200, 12.5)
+    for request in read_capture("logs/traffic.tsv"):
+        ...
+"""
+
+import atexit
+import hashlib
+import hmac
+import logging
+import os
+import queue
+import secrets
+import threading
+from typing import Iterator, NamedTuple, Optional
+from urllib.parse import quote
+
+logger = logging.getLogger(__name__)
+
+HEADER = "#traffic-capture v1\tepoch\tclient\tmethod\tpath\tquery\tstatus\tms\n"
+_STOP = object()
+
+
+class CapturedRequest(NamedTuple):
+    arrived: float          # epoch seconds
+    client: str             # hashed client id
+    method: str
+    path: str
+    query: str              # raw (still URL-encoded) query string
+    status: int
+    duration_ms: float
+
+    @property
+    def url(self) -> str:
+        return f"{self.path}?{self.query}" if self.query else self.path
+
+
+def client_id(address: str, salt: bytes) -> str:
+    return hmac.new(salt, address.encode("utf-8"), hashlib.sha256).hexdigest()[:10]
+
+
+class TrafficRecorder:
+    """Appends captured requests to a file from one writer thread"""
+
+    def __init__(self, path: str, max_bytes: int = 100_000_000, queue_size: int = 10000,
+                 flush_interval: float = 1.0):
+        """
+        Args:
+            path: Capture file (appended to; created with a header line)
+            max_bytes: Stop recording once the file is this large
+            queue_size: Records buffered for the writer before new ones are dropped
+            flush_interval: Seconds between flushes while traffic keeps arriving
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+        self.recorded = 0
+        self.dropped = 0
+        self.full = False
+        # Lives only in memory: ids from one capture can't be linked to addresses or to other captures
+        self._salt = secrets.token_bytes(16)
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._writer = threading.Thread(target=self._run, name="traffic-capture", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def record(self, arrived: float, client: str, method: str, path: str, query: str,
+               status: int, duration_ms: float) -> None:
+        if self.full:
+            return
+        try:
+            self._queue.put_nowait((arrived, client, method, path, query, status, duration_ms))
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8", newline="\n") as f:
+            if f.tell() == 0:
+                f.write(HEADER)
+            size = f.tell()
+            while True:
+                try:
+                    item = self._queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    f.flush()
+                    continue
+                if item is _STOP:
+                    f.flush()
+                    return
+                if self.full:
+                    continue
+                arrived, client, method, path, query, status, duration_ms = item
+                # Paths arrive decoded: re-quote so a tab or newline can't break the line format
+                line = (f"{arrived:.3f}\t{client_id(client, self._salt)}\t{method}\t{quote(path)}\t{query}"
+                        f"\t{status}\t{duration_ms:.1f}\n")
+                f.write(line)
+                size += len(line.encode("utf-8"))
+                self.recorded += 1
+                if size >= self.max_bytes:
+                    self.full = True
+                    f.flush()
+                    logger.warning(f"⚠️ Traffic capture {self.path} reached {self.max_bytes:,} bytes, recording stopped")
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        """Write what is queued and stop the writer thread"""
+        if not self._writer.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._writer.join(timeout)
+
+    def status(self) -> dict:
+        return {
+            "path": self.path,
+            "recorded": self.recorded,
+            "dropped": self.dropped,
+            "queued": self._queue.qsize(),
+            "max_bytes": self.max_bytes,
+            "stopped_at_size_cap": self.full,
+        }
+
+
+def read_capture(path: str) -> Iterator[CapturedRequest]:
+    """Parse a capture file; malformed lines (e.g. a torn last line) are skipped"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("#"):
+                continue
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) != 7:
+                continue
+            try:
+                yield CapturedRequest(float(fields[0]), fields[1], fields[2], fields[3], fields[4],
+                                      int(fields[5]), float(fields[6]))
+            except ValueError:
+                continue
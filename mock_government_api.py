@@ -0,0 +1,268 @@
+"""
+Mock Government API Server
+Local stand-in for data.gov.in, the CKAN India Data Portal and indiabudget.gov.in
+
+Serves responses in the shapes government_finance_server.py parses
+(parse_datagov_budget_response / parse_ckan_budget_response), with configurable
+latency, error rate, timeouts and payload size, so the cache-miss and fallback
+paths can be benchmarked without the real (flaky) upstreams.
+
+ENDPOINTS:
+- GET /resource/{resource_id}               data.gov.in style {"records": [...]}
+- GET /api/3/action/package_search          CKAN package search with CSV/JSON resources
+- GET /files/budget_{year}.{csv|json}       CKAN resource downloads
+- GET /budget{yy}/ub{yy}/ubmain.htm         indiabudget.gov.in landing page
+- GET/PUT /_mock/profiles                   inspect or change profiles at runtime
+- GET /_mock/stats                          request/error/timeout counters per upstream
+
+PROFILES (per upstream: datagov, ckan, indiabudget):
+- latency: "fixed:50", "uniform:20-200", "normal:100,30" or "lognormal:4.5,0.5" (milliseconds)
+- error_rate: fraction of requests answered with a 500/502/503
+- timeout_rate: fraction of requests that stall for timeout_seconds (past the client timeout)
+- records: records per response (payload size)
+
+Usage:
+    python mock_government_api.py --port 8010 --latency uniform:20-200 --error-rate 0.05
+
+    # then point the finance server at it
+    INDIA_BUDGET_BASE=http://localhost:8010 \\
+    INDIA_DATA_PORTAL_BASE=http://localhost:8010/resource \\
+    CKAN_API_BASE=http://localhost:8010/api/3 \\
+    python government_finance_server.py
+"""
+
+from fastapi import Body, FastAPI, HTTPException, Request
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse
+from typing import Dict
+import argparse
+import asyncio
+import csv
+import io
+import random
+import threading
+import uvicorn
+
+UPSTREAMS = ("datagov", "ckan", "indiabudget")
+
+DEFAULT_PROFILE = {
+    "latency": "fixed:0",
+    "error_rate": 0.0,
+    "timeout_rate": 0.0,
+    "timeout_seconds": 30.0,
+    "records": 25,
+}
+
+MINISTRIES = [
+    ("Ministry of Defence", "Defence"),
+    ("Ministry of Road Transport and Highways", "Infrastructure"),
+    ("Ministry of Railways", "Infrastructure"),
+    ("Ministry of Consumer Affairs, Food and Public Distribution", "Social Welfare"),
+    ("Ministry of Home Affairs", "Security"),
+    ("Ministry of Rural Development", "Rural Development"),
+    ("Ministry of Chemicals and Fertilizers", "Agriculture"),
+    ("Ministry of Agriculture and Farmers Welfare", "Agriculture"),
+    ("Ministry of Education", "Education"),
+    ("Ministry of Health and Family Welfare", "Health"),
+    ("Ministry of Jal Shakti", "Water Resources"),
+    ("Ministry of Housing and Urban Affairs", "Urban Development"),
+    ("Ministry of Petroleum and Natural Gas", "Energy"),
+    ("Ministry of Communications", "Communications"),
+    ("Ministry of External Affairs", "Foreign Affairs"),
+]
+
+app = FastAPI(title="Mock Government API", version="1.0.0")
+
+profiles: Dict[str, dict] = {name: dict(DEFAULT_PROFILE) for name in UPSTREAMS}
+stats: Dict[str, dict] = {name: {"requests": 0, "errors": 0, "timeouts": 0} for name in UPSTREAMS}
+stats_lock = threading.Lock()
+
+# ==================== PROFILE HANDLING ====================
+
+def parse_latency(spec: str):
+    """Turn a latency spec into a zero-argument sampler returning seconds"""
+    kind, _, args = spec.partition(":")
+    try:
+        if kind == "fixed":
+            value = float(args or 0)
+            return lambda: value / 1000
+        if kind == "uniform":
+            low, high = (float(x) for x in args.split("-"))
+            return lambda: random.uniform(low, high) / 1000
+        if kind == "normal":
+            mean, std = (float(x) for x in args.split(","))
+            return lambda: max(0.0, random.gauss(mean, std)) / 1000
+        if kind == "lognormal":
+            mu, sigma = (float(x) for x in args.split(","))
+            return lambda: random.lognormvariate(mu, sigma) / 1000
+    except ValueError:
+        pass
+    raise ValueError(f"Invalid latency spec '{spec}'. Use fixed:MS, uniform:LO-HI, normal:MEAN,STD or lognormal:MU,SIGMA")
+
+def validate_profile(profile: dict) -> dict:
+    unknown = set(profile) - set(DEFAULT_PROFILE)
+    if unknown:
+        raise ValueError(f"Unknown profile fields: {', '.join(sorted(unknown))}")
+    parse_latency(profile.get("latency", "fixed:0"))
+    for rate in ("error_rate", "timeout_rate"):
+        if not 0 <= float(profile.get(rate, 0)) <= 1:
+            raise ValueError(f"{rate} must be between 0 and 1")
+    if int(profile.get("records", 1)) < 0:
+        raise ValueError("records must be >= 0")
+    return profile
+
+async def simulate(upstream: str) -> None:
+    """Apply the upstream's latency / failure profile to the current request"""
+    profile = profiles[upstream]
+    with stats_lock:
+        stats[upstream]["requests"] += 1
+
+    roll = random.random()
+    if roll < profile["timeout_rate"]:
+        with stats_lock:
+            stats[upstream]["timeouts"] += 1
+        await asyncio.sleep(profile["timeout_seconds"])
+        raise HTTPException(status_code=504, detail="Mock upstream timed out")
+
+    await asyncio.sleep(parse_latency(profile["latency"])())
+
+    if roll < profile["timeout_rate"] + profile["error_rate"]:
+        with stats_lock:
+            stats[upstream]["errors"] += 1
+        raise HTTPException(status_code=random.choice([500, 502, 503]), detail="Mock upstream error")
+
+# ==================== DATA GENERATION ====================
+
+def financial_year(year: str) -> str:
+    return f"{int(year) - 1}-{year[2:]}"
+
+def generate_records(year: str, count: int) -> list:
+    """Deterministic per year, so repeated fetches look like an unchanged upstream"""
+    rng = random.Random(int(year))
+    records = []
+    for i in range(count):
+        name, sector = MINISTRIES[i] if i < len(MINISTRIES) else (f"Ministry of Mock Affairs {i + 1}", "Other")
+        allocation = round(rng.uniform(5000, 600000), 2)
+        records.append({
+            "ministry_name": name,
+            "budget_allocation": allocation,
+            "expenditure": round(allocation * rng.uniform(0.6, 0.95), 2),
+            "sector": sector,
+            "financial_year": financial_year(year),
+        })
+    return records
+
+# ==================== DATA.GOV.IN ====================
+
+@app.get("/resource/{resource_id}")
+async def datagov_resource(resource_id: str, request: Request):
+    await simulate("datagov")
+    fy = request.query_params.get("filters[financial_year]", "2025-26")
+    year = str(int(fy.split("-")[0]) + 1) if fy.split("-")[0].isdigit() else "2026"
+    records = generate_records(year, profiles["datagov"]["records"])
+    return {
+        "index_name": resource_id,
+        "title": "Union Budget - Ministry-wise Allocation (mock)",
+        "total": len(records),
+        "count": len(records),
+        "records": records,
+    }
+
+# ==================== CKAN ====================
+
+@app.get("/api/3/action/package_search")
+async def ckan_package_search(request: Request, q: str = "", rows: int = 20):
+    await simulate("ckan")
+    year = next((word for word in q.split() if word.isdigit() and len(word) == 4), "2026")
+    base = str(request.base_url).rstrip("/")
+    return {
+        "success": True,
+        "result": {
+            "count": 1,
+            "results": [{
+                "name": f"union-budget-{year}",
+                "title": f"Union Budget {year} (mock)",
+                "organization": {"name": "ministry-of-finance"},
+                "resources": [
+                    {"name": f"Budget allocation {year} (CSV)", "format": "CSV", "url": f"{base}/files/budget_{year}.csv"},
+                    {"name": f"Budget allocation {year} (JSON)", "format": "JSON", "url": f"{base}/files/budget_{year}.json"},
+                ],
+            }][:rows],
+        },
+    }
+
+@app.get("/files/budget_{year}.csv")
+async def ckan_resource_csv(year: str):
+    await simulate("ckan")
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["Ministry", "Budget Allocation", "Expenditure", "Sector"])
+    for record in generate_records(year, profiles["ckan"]["records"]):
+        writer.writerow([record["ministry_name"], record["budget_allocation"], record["expenditure"], record["sector"]])
+    return PlainTextResponse(buffer.getvalue(), media_type="text/csv")
+
+@app.get("/files/budget_{year}.json")
+async def ckan_resource_json(year: str):
+    await simulate("ckan")
+    return {"records": generate_records(year, profiles["ckan"]["records"])}
+
+# ==================== INDIABUDGET.GOV.IN ====================
+
+@app.get("/budget{fy}/{ub}/ubmain.htm")
+async def indiabudget_main(fy: str, ub: str):
+    await simulate("indiabudget")
+    return HTMLResponse(f"<html><head><title>Union Budget {fy} (mock)</title></head><body><h1>Union Budget {fy}</h1></body></html>")
+
+# ==================== CONTROL ====================
+
+@app.get("/_mock/profiles")
+async def get_profiles():
+    return profiles
+
+@app.put("/_mock/profiles/{upstream}")
+async def update_profile(upstream: str, changes: dict = Body(...)):
+    """Change one upstream's profile at runtime, e.g. {"error_rate": 0.5}"""
+    if upstream not in profiles:
+        raise HTTPException(status_code=404, detail=f"Unknown upstream '{upstream}'. Use one of: {', '.join(UPSTREAMS)}")
+    try:
+        profiles[upstream] = validate_profile({**profiles[upstream], **changes})
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return profiles[upstream]
+
+@app.get("/_mock/stats")
+async def get_stats():
+    with stats_lock:
+        return {name: dict(counters) for name, counters in stats.items()}
+
+@app.exception_handler(HTTPException)
+async def mock_error_handler(request: Request, exc: HTTPException):
+    return JSONResponse(status_code=exc.status_code, content={"error": exc.detail})
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mock government API upstreams for local benchmarking")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8010)
+    parser.add_argument("--latency", default=DEFAULT_PROFILE["latency"], help="fixed:MS | uniform:LO-HI | normal:MEAN,STD | lognormal:MU,SIGMA")
+    parser.add_argument("--error-rate", type=float, default=DEFAULT_PROFILE["error_rate"])
+    parser.add_argument("--timeout-rate", type=float, default=DEFAULT_PROFILE["timeout_rate"])
+    parser.add_argument("--timeout-seconds", type=float, default=DEFAULT_PROFILE["timeout_seconds"])
+    parser.add_argument("--records", type=int, default=DEFAULT_PROFILE["records"], help="Records per response")
+    args = parser.parse_args()
+
+    base_profile = validate_profile({
+        "latency": args.latency,
+        "error_rate": args.error_rate,
+        "timeout_rate": args.timeout_rate,
+        "timeout_seconds": args.timeout_seconds,
+        "records": args.records,
+    })
+    for name in UPSTREAMS:
+        profiles[name] = dict(base_profile)
+
+    print("=" * 80)
+    print("Starting Mock Government API Server")
+    print("=" * 80)
+    print(f"Listening on: http://{args.host}:{args.port}")
+    print(f"Profile: {base_profile}")
+    print("=" * 80)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
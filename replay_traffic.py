@@ -0,0 +1,186 @@
+"""
+Traffic Replay
+Re-issues a captured request log (TRAFFIC_CAPTURE_PATH) against a running finance server
+
+Keeps the original inter-arrival times, scaled by --speed (1 = real time, 10 = ten times
+faster, 0 = as fast as --concurrency allows), and reports latency percentiles per route
+next to the latencies originally recorded for the same requests.
+
+OPTIONS:
+- --speed N             time compression (default 1); 0 replays at max speed
+- --concurrency N       requests in flight at once (default 32)
+- --clients             send each captured client as its own X-Forwarded-For address, so
+                        per-client rate limits and prefetch sessions behave as in production
+                        (the target must run with TRUSTED_PROXY_HOPS=1 to use it)
+- --limit / --route     replay the first N requests / only paths starting with a prefix
+- --json FILE           also write the report as JSON
+
+Usage:
+    # capture on the server
+    TRAFFIC_CAPTURE_PATH=logs/traffic.tsv python government_finance_server.py
+
+    # replay at 5x against a local instance with rate limiting off...
+    RATE_LIMIT_ENABLED=false python government_finance_server.py
+    python replay_traffic.py logs/traffic.tsv --target http://localhost:8002 --speed 5
+
+    # ...or with per-client limits, trusting the replayed X-Forwarded-For
+    TRUSTED_PROXY_HOPS=1 python government_finance_server.py
+    python replay_traffic.py logs/traffic.tsv --target http://localhost:8002 --speed 5 --clients
+"""
+
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional
+import argparse
+import json
+import math
+import threading
+import time
+
+import requests
+
+from lib.services.traffic_capture import CapturedRequest, read_capture
+
+PERCENTILES = (50, 90, 99)
+
+
+class ReplayResult(NamedTuple):
+    request: CapturedRequest
+    status: Optional[int]       # None when the request failed (connection error, timeout)
+    duration_ms: float
+    lag_ms: float               # how late it was sent relative to its scheduled time
+
+
+def percentile(values: List[float], p: float) -> Optional[float]:
+    """Nearest-rank percentile"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def forwarded_for(client: str) -> str:
+    """Stable private address for a hashed client id"""
+    value = int(client, 16) if client else 0
+    return f"10.{(value >> 16) & 255}.{(value >> 8) & 255}.{value & 255}"
+
+
+def replay(captured: List[CapturedRequest], target: str, speed: float = 1.0, concurrency: int = 32,
+           timeout: float = 30.0, clients: bool = False) -> List[ReplayResult]:
+    """Send each request at (arrival - first arrival) / speed seconds after start"""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    results: List[ReplayResult] = []
+    results_lock = threading.Lock()
+    # Bounded in-flight requests: the dispatcher waits (and the lag shows it) instead of queueing
+    slots = threading.Semaphore(concurrency)
+
+    def send(request: CapturedRequest, lag_ms: float) -> None:
+        headers = {"X-Forwarded-For": forwarded_for(request.client)} if clients else {}
+        started = time.perf_counter()
+        try:
+            response = session.request(request.method, target + request.url, headers=headers, timeout=timeout)
+            status = response.status_code
+        except requests.RequestException:
+            status = None
+        finally:
+            slots.release()
+        duration_ms = (time.perf_counter() - started) * 1000
+        with results_lock:
+            results.append(ReplayResult(request, status, duration_ms, lag_ms))
+
+    if not captured:
+        return results
+    first = captured[0].arrived
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="replay") as pool:
+        started = time.perf_counter()
+        for request in captured:
+            due = (request.arrived - first) / speed if speed > 0 else 0.0
+            delay = due - (time.perf_counter() - started)
+            if delay > 0:
+                time.sleep(delay)
+            slots.acquire()
+            lag_ms = max(0.0, (time.perf_counter() - started - due) * 1000) if speed > 0 else 0.0
+            pool.submit(send, request, lag_ms)
+    return results
+
+
+def report(results: List[ReplayResult], wall_seconds: float) -> dict:
+    by_route: Dict[str, List[ReplayResult]] = defaultdict(list)
+    for result in results:
+        by_route[result.request.path].append(result)
+
+    def summary(items: List[ReplayResult]) -> dict:
+        ok = [r.duration_ms for r in items if r.status is not None]
+        original = [r.request.duration_ms for r in items]
+        return {
+            "requests": len(items),
+            "errors": sum(1 for r in items if r.status is None or r.status >= 500),
+            "status_changed": sum(1 for r in items if r.status != r.request.status),
+            **{f"p{p}_ms": _round(percentile(ok, p)) for p in PERCENTILES},
+            "max_ms": _round(max(ok) if ok else None),
+            **{f"original_p{p}_ms": _round(percentile(original, p)) for p in PERCENTILES},
+        }
+
+    lags = [r.lag_ms for r in results]
+    return {
+        "requests": len(results),
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput_rps": round(len(results) / wall_seconds, 2) if wall_seconds else None,
+        "max_send_lag_ms": _round(max(lags) if lags else None),
+        "overall": summary(results),
+        "routes": {route: summary(items) for route, items in
+                   sorted(by_route.items(), key=lambda item: -len(item[1]))},
+    }
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 1)
+
+
+def print_report(result: dict) -> None:
+    print(f"{result['requests']} requests in {result['wall_seconds']}s "
+          f"({result['throughput_rps']} req/s, max send lag {result['max_send_lag_ms']} ms)")
+    print(f"{'route':<40} {'n':>6} {'err':>5} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}   {'orig p50':>8} {'orig p99':>8}")
+    rows = [("ALL", result["overall"])] + list(result["routes"].items())
+    for route, s in rows:
+        cells = [s["p50_ms"], s["p90_ms"], s["p99_ms"], s["max_ms"], s["original_p50_ms"], s["original_p99_ms"]]
+        cells = ["-" if c is None else f"{c:.1f}" for c in cells]
+        print(f"{route[:40]:<40} {s['requests']:>6} {s['errors']:>5} "
+              f"{cells[0]:>8} {cells[1]:>8} {cells[2]:>8} {cells[3]:>8}   {cells[4]:>8} {cells[5]:>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay captured finance API traffic and report latency per route")
+    parser.add_argument("capture", help="Capture file written with TRAFFIC_CAPTURE_PATH")
+    parser.add_argument("--target", default="http://localhost:8002", help="Base URL of the instance to replay against")
+    parser.add_argument("--speed", type=float, default=1.0, help="Time compression: 1 = real time, N = N times faster, 0 = max speed")
+    parser.add_argument("--concurrency", type=int, default=32, help="Requests in flight at once")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    parser.add_argument("--clients", action="store_true", help="Replay each captured client as its own X-Forwarded-For address")
+    parser.add_argument("--route", help="Only replay paths starting with this prefix")
+    parser.add_argument("--limit", type=int, help="Replay at most this many requests")
+    parser.add_argument("--json", metavar="FILE", help="Also write the report as JSON")
+    args = parser.parse_args()
+
+    captured = sorted(read_capture(args.capture), key=lambda r: r.arrived)
+    if args.route:
+        captured = [r for r in captured if r.path.startswith(args.route)]
+    if args.limit:
+        captured = captured[:args.limit]
+    if not captured:
+        raise SystemExit(f"No requests to replay in {args.capture}")
+
+    span = captured[-1].arrived - captured[0].arrived
+    mode = "max speed" if args.speed <= 0 else f"{args.speed:g}x ({span / args.speed:.1f}s)"
+    print(f"Replaying {len(captured)} requests spanning {span:.1f}s against {args.target} at {mode}")
+    started = time.perf_counter()
+    results = replay(captured, args.target.rstrip("/"), speed=args.speed, concurrency=args.concurrency,
+                     timeout=args.timeout, clients=args.clients)
+    summary = report(results, time.perf_counter() - started)
+    print_report(summary)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
@@ -0,0 +1,63 @@
+"""Tests for lib/services/adaptive_timeout.py: rolling histograms and timeouts derived from them"""
+import pytest
+
+from lib.services.adaptive_timeout import AdaptiveTimeouts, LatencyHistogram
+
+
+def test_percentile_is_the_upper_bound_of_the_rank_bucket():
+    histogram = LatencyHistogram()
+    for seconds in [0.1] * 99 + [2.0]:
+        histogram.record(seconds, now=0)
+
+    assert histogram.count(now=0) == 100
+    assert histogram.percentile(0.5, now=0) == pytest.approx(0.1, rel=0.1)
+    assert histogram.percentile(0.995, now=0) == pytest.approx(2.0, rel=0.1)
+
+
+def test_old_slices_expire():
+    histogram = LatencyHistogram(slices=3, slice_seconds=10)
+    histogram.record(0.1, now=0)
+    histogram.record_timeout(1.0, now=0)
+    histogram.record(0.2, now=25)
+
+    assert histogram.count(now=25) == 3
+    assert histogram.count(now=30) == 1
+    assert histogram.timeouts(now=30) == 0
+
+
+def test_default_until_enough_samples_then_clamped():
+    timeouts = AdaptiveTimeouts(multiplier=2, min_timeout=0.5, max_timeout=4, min_samples=5)
+    for _ in range(4):
+        timeouts.observe("datagov", 0.01)
+    assert timeouts.timeout("datagov", default=5) == 5
+
+    timeouts.observe("datagov", 0.01)
+    assert timeouts.timeout("datagov", default=5) == 0.5
+
+
+def test_censored_samples_rank_above_the_timeout_they_hit():
+    histogram = LatencyHistogram()
+    histogram.record_timeout(1.0, now=0)
+
+    assert histogram.timeouts(now=0) == 1
+    assert histogram.percentile(0.5, now=0) > 1.0
+
+
+def test_repeated_timeouts_raise_the_timeout_up_to_max():
+    timeouts = AdaptiveTimeouts(percentile=0.9, multiplier=1.5, max_timeout=10, min_samples=20)
+    for _ in range(20):
+        timeouts.observe("datagov", 1.0)
+    timeout = timeouts.timeout("datagov", default=5)
+    assert timeout == pytest.approx(1.5, rel=0.1)
+
+    seen = [timeout]
+    for _ in range(10):
+        # The upstream slowed down: every request now hits the current timeout
+        for _ in range(10):
+            timeouts.observe_timeout("datagov", seen[-1])
+        seen.append(timeouts.timeout("datagov", default=5))
+
+    assert seen[1] > seen[0]
+    assert seen == sorted(seen)
+    assert seen[-1] == 10
+    assert timeouts.snapshot()["datagov"]["timeouts"] == 100
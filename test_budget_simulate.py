@@ -0,0 +1,44 @@
+"""Tests for the /budget/simulate endpoints of government_finance_server.py"""
+import os
+
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+import pytest
+from fastapi.testclient import TestClient
+
+import government_finance_server as server
+
+
+@pytest.fixture
+def client():
+    return TestClient(server.app, raise_server_exceptions=False)
+
+
+def simulate(client, **payload):
+    return client.post("/budget/simulate", json={"scenarios": [{"name": "a", "shifts": ["Defence:+10%"]}], **payload})
+
+
+@pytest.mark.parametrize("fixed_total", [True, False])
+def test_fixed_total_accepts_booleans(client, fixed_total):
+    response = simulate(client, fixed_total=fixed_total)
+
+    assert response.status_code == 200
+    assert response.json()["fixed_total"] is fixed_total
+
+
+@pytest.mark.parametrize("fixed_total", ["false", 0, None, [False]])
+def test_fixed_total_rejects_anything_else(client, fixed_total):
+    assert simulate(client, fixed_total=fixed_total).status_code == 400
+
+
+@pytest.mark.parametrize("shift", ["Defence:nan%", {"ministry": "Defence", "percent": 5, "sd": "inf"}])
+def test_non_finite_shifts_are_rejected(client, shift):
+    response = client.post("/budget/simulate", json={"scenarios": [{"shifts": [shift]}], "samples": 10})
+
+    assert response.status_code == 400
+
+
+def test_non_finite_default_sd_is_rejected(client):
+    response = client.get("/budget/simulate", params={"shift": "Defence:+10%", "samples": 10, "sd": "nan"})
+
+    assert response.status_code == 400
@@ -0,0 +1,126 @@
+"""Tests for lib/services/budget_simulator.py: shift parsing and vectorized scenarios"""
+import numpy as np
+import pytest
+
+from lib.services.budget_simulator import BudgetVector, Shift, parse_shift, shift_from_spec, simulate, summarize
+
+BUDGET = {
+    "Defence": {"allocation": 100.0, "spent": 90.0, "category": "Defence"},
+    "Railways": {"allocation": 200.0, "spent": 150.0, "category": "Infrastructure"},
+    "Road Transport": {"allocation": 300.0, "spent": 300.0, "category": "Infrastructure"},
+    "Health": {"allocation": 400.0, "spent": 200.0, "category": "Healthcare"},
+}
+
+
+@pytest.fixture
+def vector():
+    return BudgetVector.from_records(BUDGET)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Defence:+10%", Shift("Defence", False, True, 10.0, None)),
+    ("Railways:-5000", Shift("Railways", False, False, -5000.0, None)),
+    ("category:Healthcare:+5%", Shift("Healthcare", True, True, 5.0, None)),
+    ("Defence:+10%±3", Shift("Defence", False, True, 10.0, 3.0)),
+    ("Defence:+10%+/-3%", Shift("Defence", False, True, 10.0, 3.0)),
+    ("Road Transport:2.5%", Shift("Road Transport", False, True, 2.5, None)),
+])
+def test_parse_shift(text, expected):
+    assert parse_shift(text) == expected
+
+
+@pytest.mark.parametrize("text", ["Defence", "Defence:", ":10%", "Defence:ten%", "Defence:+10%±x"])
+def test_parse_shift_rejects_malformed_input(text):
+    with pytest.raises(ValueError):
+        parse_shift(text)
+
+
+def test_shift_from_spec_accepts_strings_and_objects():
+    assert shift_from_spec({"category": "Healthcare", "amount": -50, "sd": 5}) == Shift("Healthcare", True, False, -50.0, 5.0)
+    assert shift_from_spec("Defence:+10%") == Shift("Defence", False, True, 10.0, None)
+    with pytest.raises(ValueError):
+        shift_from_spec({"ministry": "Defence"})
+
+
+def test_fixed_total_is_absorbed_by_untouched_ministries(vector):
+    result = simulate(vector, [[parse_shift("Defence:+50%")]], fixed_total=True)
+    allocation = result["allocation"][0, 0]
+
+    assert allocation[0] == pytest.approx(150.0)
+    assert allocation.sum() == pytest.approx(1000.0)
+    # The others give up the 50 in proportion to their size
+    assert allocation[1:] == pytest.approx(np.array([200.0, 300.0, 400.0]) * 850 / 900)
+    assert result["feasible"][0, 0]
+    assert result["touched"][0].tolist() == [True, False, False, False]
+
+
+def test_without_fixed_total_the_total_moves(vector):
+    result = simulate(vector, [[parse_shift("Defence:+50%")]], fixed_total=False)
+
+    assert result["total"][0, 0] == pytest.approx(1050.0)
+    assert result["allocation"][0, 0, 1:].tolist() == [200.0, 300.0, 400.0]
+
+
+def test_increase_larger_than_the_rest_is_infeasible(vector):
+    result = simulate(vector, [[parse_shift("Defence:+2000")]], fixed_total=True)
+
+    assert not result["feasible"][0, 0]
+    assert result["allocation"][0, 0, 1:].tolist() == [0.0, 0.0, 0.0]
+
+
+def test_absolute_category_shift_is_split_by_weight(vector):
+    result = simulate(vector, [[parse_shift("category:Infrastructure:+100")]], fixed_total=False)
+
+    assert result["allocation"][0, 0, 1:3] == pytest.approx([240.0, 360.0])
+
+
+def test_scenarios_are_independent(vector):
+    result = simulate(vector, [[parse_shift("Defence:+10%")], [parse_shift("Health:-25%")]], fixed_total=False)
+
+    assert result["total"][:, 0] == pytest.approx([1010.0, 900.0])
+    assert result["category_share"].shape == (2, 1, len(vector.categories))
+    assert result["utilization"][1, 0, 3] == pytest.approx(200.0 / 300.0 * 100)
+
+
+def test_monte_carlo_samples_are_seeded(vector):
+    scenarios = [[parse_shift("Defence:+10%±5")]]
+    first = simulate(vector, scenarios, samples=200, seed=7)
+    second = simulate(vector, scenarios, samples=200, seed=7)
+
+    assert first["allocation"].shape == (1, 200, 4)
+    assert np.array_equal(first["allocation"], second["allocation"])
+    assert first["allocation"][0, :, 0].std() > 0
+    assert np.allclose(first["total"], 1000.0)
+
+    summary = summarize(vector, first, ["Defence +10%"], samples=200)[0]
+    defence = summary["ministries"][0]
+    assert defence["p5"] < defence["p50"] < defence["p95"]
+    assert summary["feasible_ratio"] == 1.0
+
+
+def test_errors(vector):
+    with pytest.raises(ValueError, match="Unknown ministry"):
+        simulate(vector, [[parse_shift("Space:+10%")]])
+    with pytest.raises(ValueError, match="Unknown category"):
+        simulate(vector, [[parse_shift("category:Space:+10%")]])
+    with pytest.raises(ValueError, match="too large"):
+        simulate(vector, [[parse_shift("Defence:+10%")]], samples=1000, max_cells=100)
+    with pytest.raises(ValueError):
+        simulate(vector, [])
+
+
+def test_ministry_names_match_loosely(vector):
+    result = simulate(vector, [[parse_shift("road-transport:+10%")]], fixed_total=False)
+
+    assert result["allocation"][0, 0, 2] == pytest.approx(330.0)
+
+
+@pytest.mark.parametrize("spec", [
+    "Defence:nan%", "Defence:+inf", "Defence:+10%±inf",
+    {"ministry": "Defence", "percent": float("nan")},
+    {"ministry": "Defence", "amount": 10 ** 400},
+    {"ministry": "Defence", "percent": 10, "sd": float("inf")},
+])
+def test_non_finite_shifts_are_rejected(spec):
+    with pytest.raises(ValueError, match="Invalid shift value"):
+        shift_from_spec(spec)
@@ -0,0 +1,75 @@
+"""Tests for the /admin/cache endpoints of government_finance_server.py"""
+import os
+
+os.environ.setdefault("ADMIN_API_KEY", "test-admin-key")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+import pytest
+from fastapi.testclient import TestClient
+
+import government_finance_server as server
+
+ADMIN = {"X-Admin-Key": os.environ["ADMIN_API_KEY"]}
+BUDGET = {"Defence": {"allocation": 100, "spent": 90, "category": "Defence"},
+          "Railways": {"allocation": 50, "spent": 40, "category": "Infrastructure"}}
+
+
+@pytest.fixture
+def client():
+    return TestClient(server.app, raise_server_exceptions=False)
+
+
+def import_entries(client, entries):
+    return client.post("/admin/cache/import", json={"entries": entries}, headers=ADMIN)
+
+
+def test_import_publishes_valid_entries(client):
+    response = import_entries(client, {"budget_2031": {"data": BUDGET, "fetched_at": "2026-01-01T00:00:00"}})
+
+    assert response.status_code == 200
+    assert response.json() == {"imported": ["budget_2031"]}
+    assert server.cache_store.get("budget_2031").aggregates["total_allocation"] == 150
+
+
+@pytest.mark.parametrize("data", [
+    {"Defence": {"spent": 1}},       # record without allocation
+    [1, 2],                          # not an object
+    {"Defence": 5},                  # record that isn't an object
+])
+def test_import_rejects_malformed_data_before_publishing(client, data):
+    generation = server.cache_store.current.generation
+
+    response = import_entries(client, {
+        "budget_2032": {"data": BUDGET, "fetched_at": "2026-01-01T00:00:00"},
+        "budget_2033": {"data": data, "fetched_at": "2026-01-01T00:00:00"},
+    })
+
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Invalid entry 'budget_2033'")
+    # Nothing was published, not even the valid entry before it
+    assert server.cache_store.current.generation == generation
+    assert server.cache_store.get("budget_2032") is None
+
+
+def test_import_requires_the_admin_key(client):
+    response = client.post("/admin/cache/import", json={"entries": {}})
+
+    assert response.status_code == 401
+
+
+def test_background_warm_runs_without_the_request_deadline(client, monkeypatch):
+    seen = []
+
+    def refresh(jobs):
+        seen.append(server.current_deadline())
+        return {f"{data_type}_{year}": server.cache_store.current.entries.get("budget_2031") for data_type, year, _ in jobs}
+
+    monkeypatch.setattr(server, "refresh_cache_entries", refresh)
+    import_entries(client, {"budget_2031": {"data": BUDGET, "fetched_at": "2026-01-01T00:00:00"}})
+
+    response = client.post("/admin/cache/warm", params={"keys": "budget_2031", "background": "true"},
+                           headers={**ADMIN, "X-Request-Budget": "0.5"})
+
+    assert response.json() == {"status": "scheduled", "keys": ["budget_2031"]}
+    # The task runs after the response, so the request's budget must not follow it
+    assert seen == [None]
@@ -0,0 +1,78 @@
+"""Tests for lib/services/change_feed.py: record-level diffs, versions and since= paging"""
+from lib.services.change_feed import ChangeFeed, diff_records
+
+
+def test_diff_records_reports_added_changed_and_removed():
+    old = {"Defence": {"allocation": 100, "spent": 90}, "Railways": {"allocation": 50, "spent": 40}, "Total": 150}
+    new = {"Defence": {"allocation": 110, "spent": 90}, "Education": {"allocation": 30, "spent": 10}, "Total": 140}
+
+    changes = {c["key"]: c for c in diff_records(old, new)}
+
+    assert changes["Defence"] == {"op": "changed", "key": "Defence", "fields": {"allocation": [100, 110]}}
+    assert changes["Education"]["op"] == "added"
+    assert changes["Railways"] == {"op": "removed", "key": "Railways"}
+    assert changes["Total"] == {"op": "changed", "key": "Total", "before": 150, "after": 140}
+
+
+def test_version_only_moves_when_records_change():
+    feed = ChangeFeed()
+    first = feed.record("budget_2026", "budget", "2026", None, {"A": {"x": 1}})
+    same = feed.record("budget_2026", "budget", "2026", {"A": {"x": 1}}, {"A": {"x": 1}})
+    changed = feed.record("budget_2026", "budget", "2026", {"A": {"x": 1}}, {"A": {"x": 2}})
+
+    assert first == same == 1
+    assert changed == 2
+    assert feed.dataset_versions == {"budget_2026": 2}
+    # A first load is logged as one event, not one per record
+    assert [c["op"] for c in feed.since(0)["changes"]] == ["loaded", "changed"]
+
+
+def test_since_filters_by_version_and_dataset():
+    feed = ChangeFeed()
+    feed.record("budget_2026", "budget", "2026", None, {"A": {"x": 1}})
+    feed.record("states_2026", "states", "2026", None, {"Goa": {"x": 1}})
+    feed.record("budget_2026", "budget", "2026", {"A": {"x": 1}}, {"A": {"x": 2}})
+
+    result = feed.since(1, dataset="budget")
+
+    assert [c["version"] for c in result["changes"]] == [3]
+    assert result["current_version"] == 3
+    assert result["has_more"] is False
+    assert result["next_since"] == 3
+    assert result["reset"] is False
+
+
+def test_since_pages_on_version_boundaries():
+    feed = ChangeFeed()
+    feed.record("budget_2026", "budget", "2026", None, {"A": 1})
+    # Version 2 logs three changes at once
+    feed.record("budget_2026", "budget", "2026", {"A": 1}, {"A": 2, "B": 1, "C": 1})
+    feed.record("budget_2026", "budget", "2026", {"A": 2, "B": 1, "C": 1}, {"A": 3, "B": 1, "C": 1})
+
+    page = feed.since(0, limit=2)
+    # The page stops before version 2 instead of splitting it
+    assert [c["version"] for c in page["changes"]] == [1]
+    assert page["has_more"] is True
+    assert page["next_since"] == 1
+
+    page = feed.since(page["next_since"], limit=2)
+    # A single version larger than the limit is returned whole
+    assert [c["version"] for c in page["changes"]] == [2, 2, 2]
+    assert page["next_since"] == 2
+
+    page = feed.since(page["next_since"], limit=2)
+    assert [c["version"] for c in page["changes"]] == [3]
+    assert page["has_more"] is False
+
+
+def test_since_signals_reset_once_the_log_was_truncated():
+    feed = ChangeFeed(max_changes=3)
+    data = None
+    for value in range(5):
+        new = {"A": value}
+        feed.record("budget_2026", "budget", "2026", data, new)
+        data = new
+
+    assert feed.since(0)["reset"] is True
+    assert feed.since(2)["reset"] is False
+    assert [c["version"] for c in feed.since(2)["changes"]] == [3, 4, 5]
@@ -0,0 +1,78 @@
+"""Tests for lib/services/compact_records.py: column storage that behaves like the dicts it replaces"""
+import copy
+import json
+from array import array
+
+import pytest
+
+from lib.services.compact_records import RecordTable, compact, is_record_table, to_plain
+from lib.services.snapshot_store import FrozenDict
+
+BUDGET = {
+    "Defence": {"allocation": 621541, "spent": 590464, "category": "Defence"},
+    "Railways": {"allocation": 255393, "spent": 240000, "category": "Infrastructure"},
+    "Road Transport": {"allocation": 278000, "spent": 265000, "category": "Infrastructure"},
+}
+
+
+def test_uniform_tables_become_record_tables():
+    table = compact(BUDGET)
+
+    assert isinstance(table, RecordTable)
+    assert table == BUDGET
+    assert len(table) == 3
+    assert list(table) == list(BUDGET)
+    assert "Defence" in table and "Health" not in table
+    assert table["Railways"]["spent"] == 240000
+    assert table.get("Health") is None
+    assert dict(table["Defence"]) == BUDGET["Defence"]
+
+
+def test_columns_are_packed_and_strings_shared():
+    table = compact(BUDGET)
+    allocation, _, category = table._columns
+
+    assert isinstance(allocation, array) and allocation.typecode == "q"
+    assert table["Railways"]["category"] is table["Road Transport"]["category"]
+    assert isinstance(category, tuple)
+
+
+def test_mixed_values_stay_frozen_dicts():
+    data = {"total": 100, "items": [{"a": 1}], "ministries": BUDGET}
+    compacted = compact(data)
+
+    assert isinstance(compacted, FrozenDict)
+    assert isinstance(compacted["ministries"], RecordTable)
+    assert compacted["items"] == ({"a": 1},)
+    with pytest.raises(TypeError):
+        compacted["total"] = 1
+
+
+@pytest.mark.parametrize("value", [
+    {"only": {"a": 1}},                                   # a single record
+    {"a": {"x": 1}, "b": {"y": 1}},                       # different fields
+    {"a": {"x": 1, "y": 2}, "b": {"y": 2, "x": 1}},       # different field order
+    {"a": {"x": [1]}, "b": {"x": [2]}},                   # nested values
+    {"a": {"x": 1}, "b": 2},                              # not all records
+])
+def test_non_uniform_tables_are_not_compacted(value):
+    assert not is_record_table(value)
+    assert not isinstance(compact(value), RecordTable)
+
+
+def test_to_plain_round_trips_through_json():
+    compacted = compact({"ministries": BUDGET, "years": [2025, 2026]})
+
+    plain = to_plain(compacted)
+
+    assert plain == {"ministries": BUDGET, "years": [2025, 2026]}
+    assert type(plain["ministries"]["Defence"]) is dict
+    assert json.loads(json.dumps(plain)) == plain
+
+
+def test_copies_share_the_immutable_table():
+    table = compact(BUDGET)
+
+    assert copy.copy(table) is table
+    assert copy.deepcopy(table) is table
+    assert compact(table) is table
@@ -0,0 +1,101 @@
+"""Tests for lib/services/compare_cube.py: derived metrics, ranks, sorting and selector errors"""
+import pytest
+
+from lib.services.compare_cube import CompareCube
+
+YEARS = [2024, 2025, 2026]
+GDP = {"India": [3.5, 3.9, 4.3], "China": [17.8, 18.5, 19.4], "Brazil": [2.1, 2.2, None]}
+POPULATION = {"India": [1.43, 1.44, 1.45], "China": [1.41, 1.41, 1.40], "Brazil": [0.216, 0.217, 0.218]}
+
+
+@pytest.fixture
+def cube():
+    return CompareCube.build(
+        YEARS,
+        {"gdp": (GDP, "Trillion USD"), "population": (POPULATION, "Billion")},
+        snapshots={2026: ({"India": {"inflation_rate": 4.5}, "China": {"inflation_rate": 0.5}},
+                          {"inflation_rate": "Percentage"})},
+    )
+
+
+def values(result, country, metric):
+    return next(c for c in result["countries"] if c["country"] == country)["values"][metric]
+
+
+def ranks(result, country, metric):
+    return next(c for c in result["countries"] if c["country"] == country)["ranks"][metric]
+
+
+def test_derived_metrics(cube):
+    result = cube.query(("India",), ("gdp_per_capita", "gdp_growth", "gdp_share"), (2025, 2026))
+
+    assert values(result, "India", "gdp_per_capita") == [pytest.approx(3.9 / 1.44 * 1000, abs=1e-3),
+                                                         pytest.approx(4.3 / 1.45 * 1000, abs=1e-3)]
+    assert values(result, "India", "gdp_growth") == [pytest.approx((3.9 / 3.5 - 1) * 100, abs=1e-3),
+                                                     pytest.approx((4.3 / 3.9 - 1) * 100, abs=1e-3)]
+    assert values(result, "India", "gdp_share")[0] == pytest.approx(3.9 / (3.9 + 18.5 + 2.2) * 100, abs=1e-3)
+    assert result["units"]["gdp_per_capita"] == "USD"
+
+
+def test_first_year_growth_and_missing_values_are_none(cube):
+    result = cube.query(("Brazil",), ("gdp", "gdp_growth"), ())
+
+    assert values(result, "Brazil", "gdp_growth")[0] is None
+    assert values(result, "Brazil", "gdp")[2] is None
+    assert ranks(result, "Brazil", "gdp")[2] is None
+
+
+def test_ranks_are_per_year_across_all_countries(cube):
+    result = cube.query(("India", "China"), ("gdp", "gdp_per_capita"), (2024,))
+
+    # Ranked against all three countries even though only two were selected
+    assert ranks(result, "China", "gdp") == [1]
+    assert ranks(result, "India", "gdp") == [2]
+    assert ranks(result, "India", "gdp_per_capita") == [3]
+    assert result["ranked_out_of"] == 3
+
+
+def test_snapshot_metrics_only_fill_their_year(cube):
+    result = cube.query(("India",), ("inflation_rate",), ())
+
+    assert values(result, "India", "inflation_rate") == [None, None, 4.5]
+
+
+def test_sort_uses_the_last_selected_year_with_missing_values_last(cube):
+    descending = cube.query((), ("gdp",), (2025, 2026), "-gdp")
+    ascending = cube.query((), ("gdp",), (2025, 2026), "gdp")
+
+    assert [c["country"] for c in descending["countries"]] == ["China", "India", "Brazil"]
+    assert [c["country"] for c in ascending["countries"]] == ["India", "China", "Brazil"]
+
+
+def test_selectors_default_to_everything(cube):
+    result = cube.query((), (), ())
+
+    assert result["years"] == YEARS
+    assert len(result["countries"]) == 3
+    assert {"gdp", "population", "inflation_rate", "gdp_per_capita"} <= set(result["metrics"])
+
+
+def test_queries_are_memoized(cube):
+    first = cube.query(("india",), ("gdp",), (2026,))
+    second = cube.query(("india",), ("gdp",), (2026,))
+
+    assert first is second
+    assert cube.memo_stats()["hits"] == 1
+    # Country names match case-insensitively
+    assert first["countries"][0]["country"] == "India"
+
+
+def test_unknown_selectors_raise_value_errors(cube):
+    with pytest.raises(ValueError, match="Unknown country 'Atlantis'"):
+        cube.query(("Atlantis",), (), ())
+    with pytest.raises(ValueError, match="Unknown metric"):
+        cube.query((), ("happiness",), ())
+    with pytest.raises(ValueError, match=r"Unknown year '1, 2, 3, 4, 5, 6, 7, 8, 9, 10 \(\+5 more\)'"):
+        cube.query((), (), tuple(range(1, 16)))
+
+
+def test_cube_is_read_only(cube):
+    with pytest.raises(ValueError):
+        cube.values[0, 0, 0] = 1.0
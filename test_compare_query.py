@@ -0,0 +1,28 @@
+"""Tests for the /compare/query endpoint of government_finance_server.py"""
+import os
+
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+import pytest
+from fastapi.testclient import TestClient
+
+import government_finance_server as server
+
+
+@pytest.fixture
+def client():
+    return TestClient(server.app, raise_server_exceptions=False)
+
+
+def test_year_ranges_and_lists(client):
+    response = client.get("/compare/query", params={"countries": "India", "metrics": "gdp", "years": "2022-2023,2025"})
+
+    assert response.status_code == 200
+    assert response.json()["years"] == [2022, 2023, 2025]
+
+
+@pytest.mark.parametrize("years", ["2022-", "2025-2022", "-2022", "2022-x", "0-30000000"])
+def test_malformed_year_selectors_are_rejected(client, years):
+    response = client.get("/compare/query", params={"years": years})
+
+    assert response.status_code == 400
@@ -0,0 +1,70 @@
+"""Tests for lib/services/dataset_registry.py: file format, hot reload and fallbacks"""
+import os
+
+import pytest
+
+from lib.services.dataset_registry import (DatasetRegistry, MAGIC, dataset_path, decode_dataset, encode_dataset,
+                                           write_dataset)
+
+BUDGET = {"Defence": {"allocation": 100, "spent": 90}, "Railways": {"allocation": 50, "spent": 40}}
+BUILTIN = {"BUDGET": {"Builtin": {"allocation": 1, "spent": 1}}}
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return DatasetRegistry(str(tmp_path), builtin=BUILTIN.__getitem__, names=("BUDGET",), check_interval=0)
+
+
+def overwrite(directory, blob, bump):
+    path = dataset_path(str(directory), "BUDGET")
+    with open(path, "wb") as f:
+        f.write(blob)
+    # mtime resolution can be coarse; make sure the reload is noticed
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + bump))
+
+
+def test_round_trip_and_version_bumps(tmp_path):
+    first = write_dataset(str(tmp_path), "BUDGET", BUDGET)
+    same = write_dataset(str(tmp_path), "BUDGET", BUDGET)
+    changed = write_dataset(str(tmp_path), "BUDGET", {**BUDGET, "Health": {"allocation": 1, "spent": 0}})
+
+    assert first["version"] == 1 and same["unchanged"] and changed["version"] == 2
+    with open(dataset_path(str(tmp_path), "BUDGET"), "rb") as f:
+        assert decode_dataset(f.read())[1]["Health"] == {"allocation": 1, "spent": 0}
+
+
+def test_missing_file_serves_the_builtin_table(registry):
+    assert registry.get("BUDGET") == BUILTIN["BUDGET"]
+    assert registry.status()["BUDGET"]["source"] == "builtin"
+    with pytest.raises(KeyError):
+        registry.get("OTHER")
+
+
+@pytest.mark.parametrize("blob", [
+    MAGIC + b"\x00\x00",                                   # truncated length
+    MAGIC + b"\x00\x00\x00\x02[]",                         # header that isn't an object
+    encode_dataset("BUDGET", BUDGET)[:-5],                 # truncated body
+    b"ZDS0" + encode_dataset("BUDGET", BUDGET)[4:],        # bad magic
+])
+def test_corrupt_file_keeps_the_last_good_version(tmp_path, registry, blob):
+    write_dataset(str(tmp_path), "BUDGET", BUDGET)
+    assert registry.get("BUDGET") == BUDGET
+
+    overwrite(tmp_path, blob, bump=10)
+
+    assert registry.get("BUDGET") == BUDGET
+
+
+def test_corrupt_file_on_first_load_falls_back_to_builtin(tmp_path, registry):
+    overwrite(tmp_path, MAGIC + b"\x00\x00", bump=0)
+
+    assert registry.get("BUDGET") == BUILTIN["BUDGET"]
+
+
+def test_failing_transform_falls_back_to_builtin(tmp_path):
+    write_dataset(str(tmp_path), "BUDGET", BUDGET)
+    registry = DatasetRegistry(str(tmp_path), builtin=BUILTIN.__getitem__, names=("BUDGET",),
+                               transform=lambda data: data["missing"])
+
+    assert registry.get("BUDGET") == BUILTIN["BUDGET"]
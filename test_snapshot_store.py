@@ -0,0 +1,82 @@
+"""Tests for lib/services/snapshot_store.py: frozen data, atomic publishes, history and rollback"""
+from datetime import datetime
+
+import pytest
+
+from lib.services.snapshot_store import CacheEntry, FrozenDict, SnapshotStore, freeze
+
+
+def entry(value, version=0):
+    return CacheEntry(data=freeze({"value": value}), source="FALLBACK", fetched_at=datetime(2026, 1, 1), version=version)
+
+
+def test_freeze_makes_nested_data_read_only():
+    frozen = freeze({"a": {"b": [1, {"c": 2}]}})
+
+    assert frozen == {"a": {"b": (1, {"c": 2})}}
+    assert isinstance(frozen["a"]["b"][1], FrozenDict)
+    with pytest.raises(TypeError):
+        frozen["a"]["x"] = 1
+    with pytest.raises(TypeError):
+        frozen["a"]["b"][1].update(c=3)
+
+
+def test_publish_swaps_in_a_new_generation():
+    store = SnapshotStore()
+    before = store.current
+
+    published = store.publish("budget_2026", lambda previous: entry(1))
+
+    assert store.get("budget_2026") is published
+    assert store.current.generation == before.generation + 1
+    # Readers holding the old snapshot keep seeing it unchanged
+    assert "budget_2026" not in before.entries
+
+
+def test_publish_passes_the_current_entry_to_the_builder():
+    store = SnapshotStore()
+    store.publish("budget_2026", lambda previous: entry(1, version=1))
+
+    seen = []
+    store.publish("budget_2026", lambda previous: seen.append(previous) or entry(2, version=previous.version + 1))
+
+    assert seen[0].data["value"] == 1
+    assert store.get("budget_2026").version == 2
+
+
+def test_publish_many_and_remove_share_one_swap():
+    store = SnapshotStore()
+    store.publish_many({"a": lambda p: entry(1), "b": lambda p: entry(2)})
+    generation = store.current.generation
+
+    store.publish_many({"c": lambda p: entry(3)}, remove=["a"])
+
+    assert store.current.generation == generation + 1
+    assert sorted(store.current.entries) == ["b", "c"]
+
+
+def test_history_is_bounded():
+    store = SnapshotStore(history=3)
+    for value in range(5):
+        store.publish("k", lambda p, value=value: entry(value))
+
+    assert [s["generation"] for s in store.history()] == [2, 3, 4]
+    assert store.previous(1).entries["k"].data["value"] == 3
+    with pytest.raises(ValueError):
+        store.previous(4)
+
+
+def test_rollback_republishes_an_old_snapshot_as_a_new_generation():
+    store = SnapshotStore(history=5)
+    for value in range(3):
+        store.publish("k", lambda p, value=value: entry(value))
+
+    snapshot = store.rollback(2)
+
+    assert store.get("k").data["value"] == 0
+    assert snapshot.generation == 4
+    # Rolling back is itself a publish, so it can be undone the same way
+    store.rollback(1)
+    assert store.get("k").data["value"] == 2
+    with pytest.raises(ValueError):
+        store.rollback(0)